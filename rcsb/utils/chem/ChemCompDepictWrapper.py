@@ -6,6 +6,7 @@
 #
 # Updates:
 #  24-Jun-2020 jdw make api follow the style of ChemCompSearchWrapper()
+#  18-Oct-2026 jdw take SMILES and InChI molecules from the prepared query molecule cache of ChemCompSearchWrapper()
 ##
 """
 Wrapper for chemical component depiction operations.
@@ -25,7 +26,6 @@ import time
 from rcsb.utils.chem.ChemCompSearchWrapper import ChemCompSearchWrapper
 from rcsb.utils.chem.OeDepict import OeDepict
 from rcsb.utils.chem.OeDepictAlign import OeDepictMCSAlignPage
-from rcsb.utils.chem.OeIoUtils import OeIoUtils
 from rcsb.utils.io.MarshalUtil import MarshalUtil
 from rcsb.utils.io.SingletonClass import SingletonClass
 
@@ -137,13 +137,10 @@ class ChemCompDepictWrapper(SingletonClass):
         """Create depiction from InChI, SMILES descriptors or PDB identifier."""
         try:
             imagePath = imagePath if imagePath else self.__makeImagePath()
-            oeio = OeIoUtils()
-            if identifierType.lower() in ["smiles"]:
-                oeMol = oeio.smilesToMol(identifier)
-            elif identifierType.lower() in ["inchi"]:
-                oeMol = oeio.inchiToMol(identifier)
+            ccsw = ChemCompSearchWrapper()
+            if identifierType.lower() in ["smiles", "inchi"]:
+                oeMol = ccsw.getQueryMol(identifier, identifierType, copyMol=True)
             elif identifierType.lower() in ["identifierpdb"]:
-                ccsw = ChemCompSearchWrapper()
                 oesmP = ccsw.getSearchMoleculeProvider()
                 oeMol = oesmP.getMol(identifier)
             #
@@ -207,21 +204,16 @@ class ChemCompDepictWrapper(SingletonClass):
         """Create aligned depiction for a target molecule InChI, SMILES descriptors or PDB identifier."""
         try:
             imagePath = imagePath if imagePath else self.__makeImagePath()
-            oeio = OeIoUtils()
             ccsw = ChemCompSearchWrapper()
             oesmP = ccsw.getSearchMoleculeProvider()
             # ---
-            if refIdentifierType.lower() in ["smiles"]:
-                oeMolRef = oeio.smilesToMol(refIdentifier)
-            elif refIdentifierType.lower() in ["inchi"]:
-                oeMolRef = oeio.inchiToMol(refIdentifier)
+            if refIdentifierType.lower() in ["smiles", "inchi"]:
+                oeMolRef = ccsw.getQueryMol(refIdentifier, refIdentifierType, copyMol=True)
             elif refIdentifierType.lower() in ["identifierpdb"]:
                 oeMolRef = oesmP.getMol(refIdentifier)
             #
-            if fitIdentifierType.lower() in ["smiles"]:
-                oeMolFit = oeio.smilesToMol(fitIdentifier)
-            elif fitIdentifierType.lower() in ["inchi"]:
-                oeMolFit = oeio.inchiToMol(fitIdentifier)
+            if fitIdentifierType.lower() in ["smiles", "inchi"]:
+                oeMolFit = ccsw.getQueryMol(fitIdentifier, fitIdentifierType, copyMol=True)
             elif fitIdentifierType.lower() in ["identifierpdb"]:
                 oeMolFit = oesmP.getMol(fitIdentifier)
             # ---
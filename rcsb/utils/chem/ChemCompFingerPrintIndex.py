@@ -0,0 +1,396 @@
+##
+# File:    ChemCompFingerPrintIndex.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+#
+# Updates:
+#  18-Oct-2026 jdw Add blocked (query x database) batch scoring getSortedScoresBatch().
+#  18-Oct-2026 jdw Add persistence (write()/load()) as NumPy .npy files loaded memory-mapped.
+#  18-Oct-2026 jdw Add getIdList() and getFingerPrints() accessors used to build neighbor tables.
+#  18-Oct-2026 jdw Add folded fingerprint indices (getFoldedIndex()/foldFingerPrints()) and rescore() for two-stage screening.
+#  18-Oct-2026 jdw Add getChecksum() content checksum of the stored fingerprints.
+#  18-Oct-2026 jdw Size the stored fingerprint chunks of getSortedScoresBatch() from a temporary memory budget (maxChunkBytes).
+##
+"""
+Packed (NumPy) fingerprint index supporting Tanimoto similarity searches with popcount bound pruning.
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import hashlib
+import logging
+import math
+import os
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# byte popcount lookup table (used when numpy.bitwise_count() is not available)
+POPCOUNT_TABLE = np.array([bin(ii).count("1") for ii in range(256)], dtype=np.uint8)
+
+
+def popCount(wordA):
+    """Return the number of set bits in each row of the input uint64 word matrix (or in a single word vector)."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(wordA).sum(axis=-1, dtype=np.int32)
+    byteA = wordA.view(np.uint8)
+    return POPCOUNT_TABLE[byteA].sum(axis=-1, dtype=np.int32)
+
+
+def getIdxFilePath(filePath):
+    """Return the path of the file of external indices and popcounts companion to the packed fingerprint file."""
+    return os.path.splitext(filePath)[0] + "-idx.npy"
+
+
+class ChemCompFingerPrintIndex(object):
+    """Packed fingerprint index (definitions x uint64 words) ordered by fingerprint bit count (popcount).
+
+    Rows are grouped in bins of equal popcount.  For a query with popcount a, the Tanimoto score of
+    a target with popcount b is bounded by min(a, b) / max(a, b), so bins which cannot reach the
+    score cutoff (or the current k-th best score for limited searches) are skipped without scoring.
+    Surviving rows are scored with vectorized AND/popcount operations.
+    """
+
+    def __init__(self, fpA, idxList=None, fpType=None, blockSize=4096, countList=None):
+        """Build the packed fingerprint index.
+
+        Args:
+            fpA (numpy.ndarray): packed fingerprint matrix (definitions x uint64 words)
+            idxList (list, optional): external index (e.g. OE molecule database index) of each row. Defaults to row order.
+            fpType (str, optional): fingerprint type label (e.g. TREE, PATH, MACCS, CIRCULAR, LINGO). Defaults to None.
+            blockSize (int, optional): minimum number of rows scored in each vectorized step. Defaults to 4096.
+            countList (list, optional): popcount of each row for input rows already in popcount order
+                                        (e.g. a memory-mapped matrix from load()) which are used without copying. Defaults to None.
+        """
+        startTime = time.time()
+        fpA = np.ascontiguousarray(fpA, dtype=np.uint64)
+        idxA = np.asarray(idxList if idxList is not None else range(len(fpA)), dtype=np.int64)
+        self.__fpType = fpType
+        self.__blockSize = blockSize
+        if countList is not None:
+            self.__fpA = fpA
+            self.__countA = np.asarray(countList, dtype=np.int32)
+            self.__idxA = idxA
+        else:
+            countA = popCount(fpA) if len(fpA) else np.zeros(0, dtype=np.int32)
+            orderA = np.argsort(countA, kind="stable")
+            self.__fpA = fpA[orderA]
+            self.__countA = countA[orderA]
+            self.__idxA = idxA[orderA]
+        self.__rowD = {idx: row for row, idx in enumerate(self.__idxA.tolist())}
+        # popcount bins - bin ii holds rows [binStartA[ii], binStartA[ii + 1])
+        self.__binCountA, self.__binStartA = np.unique(self.__countA, return_index=True)
+        self.__binStartA = np.append(self.__binStartA, len(self.__countA))
+        logger.debug("Built %r packed fingerprint index with %d rows %d words %d bins (%.4f seconds)", fpType, *fpA.shape, len(self.__binCountA), time.time() - startTime)
+
+    def __len__(self):
+        return len(self.__idxA)
+
+    def getFpType(self):
+        return self.__fpType
+
+    def getNumWords(self):
+        return self.__fpA.shape[1]
+
+    def NumFingerPrints(self):  # pylint: disable=invalid-name
+        """Return the number of stored fingerprints (OEFPDatabase() compatible name)."""
+        return len(self.__idxA)
+
+    def getBitCounts(self):
+        """Return the popcount of each stored fingerprint (in external index order)."""
+        return self.__countA[np.argsort(self.__idxA, kind="stable")]
+
+    def getIdList(self):
+        """Return the external indices of the stored fingerprints (in popcount order)."""
+        return self.__idxA.tolist()
+
+    def getFingerPrints(self, idxList):
+        """Return the packed fingerprint matrix (uint64 words) for the input external indices."""
+        return self.__fpA[[self.__rowD[idx] for idx in idxList]]
+
+    def getChecksum(self):
+        """Return the checksum (sha256 hex digest) of the stored external indices and fingerprints."""
+        hashObj = hashlib.sha256()
+        hashObj.update(np.ascontiguousarray(self.__idxA, dtype=np.int64).tobytes())
+        hashObj.update(np.ascontiguousarray(self.__fpA).data)
+        return hashObj.hexdigest()
+
+    def write(self, filePath):
+        """Write the index as NumPy (.npy) files - the packed fingerprint matrix (in popcount order) in filePath
+        and the external indices and popcounts of each row in a companion (-idx.npy) file.
+
+        Args:
+            filePath (str): output file path (.npy)
+
+        Returns:
+            bool: True for success or False otherwise
+        """
+        try:
+            dirPath = os.path.dirname(filePath)
+            if dirPath and not os.path.isdir(dirPath):
+                os.makedirs(dirPath)
+            np.save(filePath, self.__fpA)
+            np.save(getIdxFilePath(filePath), np.vstack((self.__idxA, self.__countA.astype(np.int64))))
+            return True
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+        return False
+
+    @staticmethod
+    def load(filePath, fpType=None, mmapMode="r"):
+        """Return the index read from NumPy files written by write().
+
+        Args:
+            filePath (str): input file path (.npy)
+            fpType (str, optional): fingerprint type label. Defaults to None.
+            mmapMode (str, optional): numpy.load() memory map mode ("r" read-only memory-mapped or None to read into memory). Defaults to "r".
+
+        Returns:
+            (obj): ChemCompFingerPrintIndex() or None
+        """
+        try:
+            startTime = time.time()
+            fpA = np.load(filePath, mmap_mode=mmapMode)
+            idxCountA = np.load(getIdxFilePath(filePath))
+            fpIdx = ChemCompFingerPrintIndex(fpA, idxCountA[0], fpType=fpType, countList=idxCountA[1])
+            logger.info("Loaded %r packed fingerprint index %d rows (mmap %r) (%.4f seconds)", fpType, len(fpIdx), mmapMode, time.time() - startTime)
+            return fpIdx
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+        return None
+
+    @staticmethod
+    def packHexString(hexString, numWords, numChars=None):
+        """Return a fingerprint hexadecimal string as a packed uint64 word vector.
+
+        Args:
+            hexString (str): hexadecimal fingerprint representation
+            numWords (int): number of uint64 words in the packed vector
+            numChars (int, optional): number of significant leading characters (the remainder is ignored). Defaults to all.
+
+        Returns:
+            (numpy.ndarray): uint64 word vector
+        """
+        hS = hexString[:numChars] if numChars else hexString
+        hS = hS.ljust(numWords * 16, "0")[: numWords * 16]
+        return np.frombuffer(bytes.fromhex(hS), dtype=">u8").astype(np.uint64)
+
+    @staticmethod
+    def packBits(onBitList, numWords):
+        """Return the packed uint64 word vector with the input bit positions set."""
+        wordA = np.zeros(numWords, dtype=np.uint64)
+        for bit in onBitList:
+            wordA[bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+        return wordA
+
+    @staticmethod
+    def foldFingerPrints(fpA, numWords):
+        """Return packed fingerprints folded to numWords uint64 words (bitwise OR of consecutive segments of numWords words).
+
+        Args:
+            fpA (numpy.ndarray): packed fingerprint matrix (definitions x uint64 words) or a single word vector
+            numWords (int): number of words in the folded fingerprint (a divisor of the input word count)
+
+        Returns:
+            (numpy.ndarray): folded fingerprint matrix (or word vector)
+        """
+        fpA = np.asarray(fpA, dtype=np.uint64)
+        return np.bitwise_or.reduce(fpA.reshape(fpA.shape[:-1] + (-1, numWords)), axis=-2)
+
+    def getFoldedIndex(self, foldBits, chunkSize=65536):
+        """Return an index of the stored fingerprints folded to foldBits bits.
+
+        Folded Tanimoto scores approximate (and are generally higher than) full length scores, so a folded
+        index serves as a compact first stage screen for candidates which are rescored at full length.
+
+        Args:
+            foldBits (int): folded fingerprint length (a multiple of 64 dividing the stored fingerprint length)
+            chunkSize (int, optional): number of fingerprints folded in each step. Defaults to 65536.
+
+        Returns:
+            (obj): ChemCompFingerPrintIndex() or None if the fingerprints cannot be folded to this length
+        """
+        numWords = foldBits // 64
+        if foldBits % 64 or numWords <= 0 or numWords >= self.getNumWords() or self.getNumWords() % numWords:
+            logger.warning("Cannot fold %r %d bit fingerprints to %r bits", self.__fpType, self.getNumWords() * 64, foldBits)
+            return None
+        foldA = np.zeros((len(self.__idxA), numWords), dtype=np.uint64)
+        for lo in range(0, len(self.__idxA), chunkSize):
+            foldA[lo : lo + chunkSize] = ChemCompFingerPrintIndex.foldFingerPrints(self.__fpA[lo : lo + chunkSize], numWords)
+        return ChemCompFingerPrintIndex(foldA, self.__idxA, fpType=self.__fpType, blockSize=self.__blockSize)
+
+    def __getRowMask(self, idxList):
+        maskA = np.zeros(len(self.__idxA), dtype=bool)
+        rowL = [self.__rowD[idx] for idx in idxList if idx in self.__rowD]
+        maskA[rowL] = True
+        return maskA
+
+    def __scoreRows(self, qA, qCount, rowLo, rowHi, maskA):
+        rowA = np.arange(rowLo, rowHi)
+        if maskA is not None:
+            rowA = rowA[maskA[rowLo:rowHi]]
+        if not len(rowA):
+            return rowA, np.zeros(0, dtype=np.float64)
+        interA = popCount(self.__fpA[rowA] & qA)
+        unionA = qCount + self.__countA[rowA] - interA
+        scoreA = np.divide(interA, unionA, out=np.zeros(len(rowA), dtype=np.float64), where=unionA > 0)
+        return rowA, scoreA
+
+    def getSortedScores(self, queryFp, minScore=None, maxResults=0, idxList=None):
+        """Return the Tanimoto scores of the stored fingerprints with respect to the input query fingerprint.
+
+        Args:
+            queryFp (numpy.ndarray): packed query fingerprint (uint64 word vector)
+            minScore (float, optional): minimum Tanimoto score (0.0-1.0). Defaults to None (no cutoff).
+            maxResults (int, optional): maximum number of results (0 for all). Defaults to 0.
+            idxList (list, optional): restrict the search to these external indices. Defaults to None (all).
+
+        Returns:
+            (list): [(external index, score), ...] in order of decreasing score
+        """
+        rL = []
+        if not len(self.__idxA):
+            return rL
+        qA = np.asarray(queryFp, dtype=np.uint64)
+        qCount = int(popCount(qA))
+        minScore = minScore if minScore else 0.0
+        maskA = self.__getRowMask(idxList) if idxList is not None else None
+        # bins within the cutoff bound: ceil(minScore * a) <= b <= floor(a / minScore)
+        loCount = math.ceil(minScore * qCount - 1.0e-9)
+        hiCount = math.floor(qCount / minScore + 1.0e-9) if minScore > 0.0 else self.__binCountA[-1]
+        binLo = int(np.searchsorted(self.__binCountA, loCount, side="left"))
+        binHi = int(np.searchsorted(self.__binCountA, hiCount, side="right"))
+        if binLo >= binHi:
+            return rL
+        #
+        # Visit bins in order of decreasing score bound expanding outward from the query popcount.
+        #  Left bins (b < a) have bound b / a and right bins (b >= a) have bound a / b.
+        left = int(np.searchsorted(self.__binCountA, qCount, side="left")) - 1
+        right = left + 1
+        left = min(left, binHi - 1)
+        right = max(right, binLo)
+        rowLo = rowHi = int(self.__binStartA[right]) if right < binHi else int(self.__binStartA[left + 1])
+        rowA = np.zeros(0, dtype=np.int64)
+        scoreA = np.zeros(0, dtype=np.float64)
+        numScored = numBins = 0
+        while left >= binLo or right < binHi:
+            # extend the scanned row range by a block of the highest bound bins
+            newLo, newHi = rowLo, rowHi
+            bound = 0.0
+            while (left >= binLo or right < binHi) and (newHi - newLo) - (rowHi - rowLo) < self.__blockSize:
+                leftBound = self.__binCountA[left] / qCount if left >= binLo and qCount else -1.0
+                rightBound = qCount / self.__binCountA[right] if right < binHi and self.__binCountA[right] else (1.0 if right < binHi else -1.0)
+                if leftBound >= rightBound:
+                    newLo = int(self.__binStartA[left])
+                    bound = max(bound, leftBound)
+                    left -= 1
+                else:
+                    newHi = int(self.__binStartA[right + 1])
+                    bound = max(bound, rightBound)
+                    right += 1
+                numBins += 1
+            if maxResults and len(scoreA) >= maxResults and bound < scoreA.min():
+                break
+            for lo, hi in [(newLo, rowLo), (rowHi, newHi)]:
+                if hi > lo:
+                    tRowA, tScoreA = self.__scoreRows(qA, qCount, lo, hi, maskA)
+                    numScored += len(tRowA)
+                    keepA = tScoreA >= minScore
+                    rowA = np.concatenate((rowA, tRowA[keepA]))
+                    scoreA = np.concatenate((scoreA, tScoreA[keepA]))
+            rowLo, rowHi = newLo, newHi
+            rowA, scoreA = self.__trimResults(rowA, scoreA, maxResults)
+        #
+        rL = self.__sortResults(rowA, scoreA, maxResults)
+        logger.debug("Query popcount %d scored %d/%d rows (%d bins) returning %d", qCount, numScored, len(self.__idxA), numBins, len(rL))
+        return rL
+
+    def rescore(self, queryFp, idxList, minScore=None, maxResults=0):
+        """Return the Tanimoto scores of the input (candidate) external indices with respect to the query fingerprint.
+        Only the candidate rows are read (in storage order) which limits the access of memory-mapped fingerprints.
+
+        Args:
+            queryFp (numpy.ndarray): packed query fingerprint (uint64 word vector)
+            idxList (list): candidate external indices
+            minScore (float, optional): minimum Tanimoto score (0.0-1.0). Defaults to None (no cutoff).
+            maxResults (int, optional): maximum number of results (0 for all). Defaults to 0.
+
+        Returns:
+            (list): [(external index, score), ...] in order of decreasing score
+        """
+        rowA = np.asarray(sorted(self.__rowD[idx] for idx in idxList if idx in self.__rowD), dtype=np.int64)
+        if not len(rowA):
+            return []
+        qA = np.asarray(queryFp, dtype=np.uint64)
+        interA = popCount(self.__fpA[rowA] & qA)
+        unionA = int(popCount(qA)) + self.__countA[rowA] - interA
+        scoreA = np.divide(interA, unionA, out=np.zeros(len(rowA), dtype=np.float64), where=unionA > 0)
+        keepA = scoreA >= (minScore if minScore else 0.0)
+        return self.__sortResults(rowA[keepA], scoreA[keepA], maxResults)
+
+    def __trimResults(self, rowA, scoreA, maxResults):
+        """Retain the k best scores and any ties (ties are ordered by index in __sortResults())."""
+        if maxResults and len(scoreA) > maxResults:
+            kthScore = np.partition(scoreA, len(scoreA) - maxResults)[len(scoreA) - maxResults]
+            keepA = scoreA >= kthScore
+            rowA, scoreA = rowA[keepA], scoreA[keepA]
+        return rowA, scoreA
+
+    def __sortResults(self, rowA, scoreA, maxResults):
+        idxA = self.__idxA[rowA]
+        orderA = np.lexsort((idxA, -scoreA))
+        if maxResults:
+            orderA = orderA[:maxResults]
+        return list(zip(idxA[orderA].tolist(), scoreA[orderA].tolist()))
+
+    def getSortedScoresBatch(self, queryFpA, minScore=None, maxResults=0, idxList=None, chunkSize=None, maxChunkBytes=8 * 2**20):
+        """Return the Tanimoto scores of the stored fingerprints for each of a block of query fingerprints.
+
+        Queries are scored together against chunks of the stored fingerprints (query x database AND/popcount).
+        Only the rows within the popcount bounds of the block of queries are scored, so blocks of queries with
+        similar popcounts (see getBitCounts()) are evaluated most efficiently.
+
+        Args:
+            queryFpA (numpy.ndarray): packed query fingerprint matrix (queries x uint64 words)
+            minScore (float, optional): minimum Tanimoto score (0.0-1.0). Defaults to None (no cutoff).
+            maxResults (int, optional): maximum number of results per query (0 for all). Defaults to 0.
+            idxList (list, optional): restrict the search to these external indices. Defaults to None (all).
+            chunkSize (int, optional): number of stored fingerprints scored in each step. Defaults to None (the largest
+                                       chunk within maxChunkBytes).
+            maxChunkBytes (int, optional): size of the (queries x chunk x words) AND temporary of each step. Defaults to 8 MB.
+
+        Returns:
+            (list): [[(external index, score), ...], ...] in query order each in order of decreasing score
+        """
+        qA = np.asarray(queryFpA, dtype=np.uint64)
+        numQueries = len(qA)
+        if not len(self.__idxA) or not numQueries:
+            return [[] for _ in range(numQueries)]
+        qCountA = popCount(qA)
+        minScore = minScore if minScore else 0.0
+        chunkSize = chunkSize if chunkSize else max(1, maxChunkBytes // (numQueries * max(1, qA.shape[1]) * qA.itemsize))
+        maskA = self.__getRowMask(idxList) if idxList is not None else None
+        # rows within the cutoff bounds of any query in the block
+        rowLo, rowHi = 0, len(self.__countA)
+        if minScore > 0.0:
+            rowLo = int(np.searchsorted(self.__countA, math.ceil(minScore * int(qCountA.min()) - 1.0e-9), side="left"))
+            rowHi = int(np.searchsorted(self.__countA, math.floor(int(qCountA.max()) / minScore + 1.0e-9), side="right"))
+        rowL = [np.zeros(0, dtype=np.int64)] * numQueries
+        scoreL = [np.zeros(0, dtype=np.float64)] * numQueries
+        for lo in range(rowLo, rowHi, chunkSize):
+            rowA = np.arange(lo, min(lo + chunkSize, rowHi))
+            if maskA is not None:
+                rowA = rowA[maskA[rowA]]
+            if not len(rowA):
+                continue
+            interA = popCount(qA[:, None, :] & self.__fpA[rowA][None, :, :])
+            unionA = qCountA[:, None] + self.__countA[rowA][None, :] - interA
+            scoreA = np.divide(interA, unionA, out=np.zeros(interA.shape, dtype=np.float64), where=unionA > 0)
+            keepA = scoreA >= minScore
+            for ii in np.nonzero(keepA.any(axis=1))[0]:
+                rowL[ii], scoreL[ii] = self.__trimResults(np.concatenate((rowL[ii], rowA[keepA[ii]])), np.concatenate((scoreL[ii], scoreA[ii][keepA[ii]])), maxResults)
+        return [self.__sortResults(rowL[ii], scoreL[ii], maxResults) for ii in range(numQueries)]
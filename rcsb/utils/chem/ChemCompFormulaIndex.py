@@ -0,0 +1,384 @@
+##
+# File:    ChemCompFormulaIndex.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+#
+# Updates:
+#  18-Oct-2026 jdw Add feature count columns for vectorized formula+feature prefiltering.
+#  18-Oct-2026 jdw Build from binary index store count columns and add element set grouping.
+#  18-Oct-2026 jdw Add packed structural key (ss-keys) bitset column for substructure screening.
+#  18-Oct-2026 jdw Add partition columns (source, type, status) and partition filters for all queries.
+#  18-Oct-2026 jdw Add heavy atom counts for ordering substructure search candidates.
+#  18-Oct-2026 jdw Add column statistics (count histograms and key bit density) and selectivity estimates estimateMinimum().
+##
+"""
+Columnar (NumPy) index of element and feature counts supporting vectorized formula queries.
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import logging
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class ChemCompFormulaIndex(object):
+    """Columnar index of element counts for chemical component (or search index) definitions.
+
+    Element counts are stored as a single integer matrix (definitions x elements) with a packed
+    bitmask (uint64 words) recording the element types present in each definition.  Simple feature
+    counts (e.g. rings, rings_ar, at_ar, at_ch, bnd_*) are stored as a second integer matrix and
+    structural key bitsets (hexadecimal strings) are unpacked into a uint64 word matrix.  Partition
+    attributes (e.g. source CCD/BIRD, chem_comp type and release status) are stored as integer coded
+    columns.  Range, subset, minimum composition and key subset queries are evaluated as vectorized
+    comparisons over these arrays, optionally restricted to a partition, and return row indices in
+    index order.
+    """
+
+    PARTITION_KEYS = ("source", "type", "status")
+
+    def __init__(self, idxD=None, typeCountKey="type-counts", featureCountKey="feature-counts", indexStore=None, ssKeysKey="ss-keys"):
+        """Build the columnar element and feature count index.
+
+        Args:
+            idxD (dict): index dictionary {<id>: {<typeCountKey>: {<element>: <count>, ...}, ...}, ...}
+            typeCountKey (str, optional): key of the element count dictionary in each index entry. Defaults to "type-counts".
+            featureCountKey (str, optional): key of the feature count dictionary in each index entry. Defaults to "feature-counts".
+            indexStore (obj, optional): instance of ChemCompIndexStore() used in place of idxD to build the index
+                                        directly from stored count columns. Defaults to None.
+            ssKeysKey (str, optional): key of the structural key bitset in each index entry. Defaults to "ss-keys".
+        """
+        startTime = time.time()
+        if indexStore is not None:
+            self.__idL = indexStore.getIdList()
+            self.__elementL, countA = self.__fromStore(indexStore, typeCountKey)
+            self.__featureL, featureA = self.__fromStore(indexStore, featureCountKey)
+            ssKeysL = indexStore.getStringColumn(ssKeysKey)
+            partValueD = {ky: indexStore.getStringColumn(ky) for ky in self.PARTITION_KEYS}
+        else:
+            idxD = idxD if idxD else {}
+            self.__idL = list(idxD.keys())
+            self.__elementL, countA = self.__fromDict(idxD, typeCountKey)
+            self.__featureL, featureA = self.__fromDict(idxD, featureCountKey)
+            ssKeysL = [vD.get(ssKeysKey, None) for vD in idxD.values()]
+            partValueD = {ky: [vD.get(ky, None) for vD in idxD.values()] for ky in self.PARTITION_KEYS}
+        self.__elementColD = {el: ii for ii, el in enumerate(self.__elementL)}
+        self.__featureColD = {ft: ii for ii, ft in enumerate(self.__featureL)}
+        #
+        numRows = len(self.__idL)
+        self.__numWords = max(1, (len(self.__elementL) + 63) // 64)
+        self.__countA = np.maximum(countA, 0).astype(np.int32)
+        self.__maskA = np.zeros((numRows, self.__numWords), dtype=np.uint64)
+        for col in range(len(self.__elementL)):
+            self.__maskA[:, col // 64] |= (countA[:, col] >= 0).astype(np.uint64) << np.uint64(col % 64)
+        # absent features have zero counts
+        self.__featureA = np.maximum(featureA, 0).astype(np.int32)
+        self.__ssKeysA = self.__unpackKeys(ssKeysL) if ssKeysL else None
+        # {<partition key>: (<value list>, <int32 value codes> (-1 absent))}
+        self.__partitionD = {}
+        for ky, valueL in partValueD.items():
+            if valueL and any(valueL):
+                labelL = sorted({v for v in valueL if v})
+                codeD = {label: ii for ii, label in enumerate(labelL)}
+                self.__partitionD[ky] = (labelL, np.array([codeD[v] if v else -1 for v in valueL], dtype=np.int32))
+        # column statistics for selectivity estimates (see getColumnStatistics())
+        self.__statsD = None
+        logger.debug(
+            "Built formula index for %d definitions with %d element and %d feature types (%.4f seconds)", numRows, len(self.__elementL), len(self.__featureL), time.time() - startTime
+        )
+
+    def __unpackKeys(self, ssKeysL):
+        """Return the uint64 word matrix (rows x words) for the input hexadecimal key bitsets or None if no keys are present.
+
+        Rows lacking keys (or with a bitset length differing from the most common length) have all bits set
+        and therefore pass any key subset test.
+        """
+        lenD = {}
+        for ssKeys in ssKeysL:
+            if ssKeys:
+                lenD[len(ssKeys)] = lenD.get(len(ssKeys), 0) + 1
+        if not lenD:
+            return None
+        keyLen = max(lenD, key=lenD.get)
+        if keyLen % 16:
+            logger.warning("Unexpected structural key length %d", keyLen)
+            return None
+        allSet = "f" * keyLen
+        keysB = bytes.fromhex("".join(ssKeys if ssKeys and len(ssKeys) == keyLen else allSet for ssKeys in ssKeysL))
+        return np.frombuffer(keysB, dtype=np.uint64).reshape(len(ssKeysL), keyLen // 16)
+
+    def getKeyWords(self, ssKeys):
+        """Return the uint64 words for the input hexadecimal key bitset (or None if not compatible with the index)."""
+        if self.__ssKeysA is None or not ssKeys or len(ssKeys) != 16 * self.__ssKeysA.shape[1]:
+            return None
+        return np.frombuffer(bytes.fromhex(ssKeys), dtype=np.uint64)
+
+    def __fromDict(self, idxD, countKey):
+        """Return the sorted labels and count matrix (rows x labels, -1 absent) for the input count dictionary key."""
+        labelS = set()
+        for cD in (vD.get(countKey, {}) for vD in idxD.values()):
+            labelS.update(cD.keys())
+        labelL = sorted(labelS)
+        labelColD = {label: ii for ii, label in enumerate(labelL)}
+        countA = np.full((len(idxD), len(labelL)), -1, dtype=np.int32)
+        for row, vD in enumerate(idxD.values()):
+            for label, count in vD.get(countKey, {}).items():
+                countA[row, labelColD[label]] = count
+        return labelL, countA
+
+    def __fromStore(self, indexStore, countKey):
+        labelL, countA = indexStore.getCountColumn(countKey)
+        if labelL is None:
+            return [], np.full((len(indexStore), 0), -1, dtype=np.int32)
+        return labelL, countA
+
+    def __len__(self):
+        return len(self.__idL)
+
+    def getIdList(self):
+        return self.__idL
+
+    def getIds(self, rowL):
+        """Return the identifiers corresponding to the input row indices."""
+        return [self.__idL[row] for row in rowL]
+
+    def getElementList(self):
+        return self.__elementL
+
+    def getFeatureList(self):
+        return self.__featureL
+
+    def getHeavyAtomCounts(self, rowL=None):
+        """Return the heavy (non-hydrogen) atom counts of the input rows.
+
+        Args:
+            rowL (list, optional): row indices. Defaults to None (all rows).
+
+        Returns:
+            (numpy.ndarray): int32 heavy atom counts in row order
+        """
+        colL = [ii for ii, el in enumerate(self.__elementL) if el not in ["H", "D", "T"]]
+        countA = self.__countA if rowL is None else self.__countA[np.asarray(rowL, dtype=np.int64)]
+        return countA[:, colL].sum(axis=1, dtype=np.int32)
+
+    def getColumnStatistics(self, maxCount=32):
+        """Return the (cached) column statistics used for selectivity estimates.
+
+        Args:
+            maxCount (int, optional): largest count resolved by the histograms (larger counts are pooled). Defaults to 32.
+
+        Returns:
+            (dict): {"elements": <float array (elements x maxCount + 1)>, "features": <float array (features x maxCount + 1)>,
+                     "keys": <float array (key bits)> or None} - fractions of definitions with count >= k for each
+                     element and feature column and the fraction of definitions setting each structural key bit
+        """
+        if self.__statsD is None or self.__statsD["maxCount"] != maxCount:
+            startTime = time.time()
+            numRows = max(1, len(self.__idL))
+
+            def survival(countA):
+                sA = np.zeros((countA.shape[1], maxCount + 1), dtype=np.float64)
+                for col in range(countA.shape[1]):
+                    hA = np.bincount(np.minimum(countA[:, col], maxCount), minlength=maxCount + 1)
+                    sA[col] = np.cumsum(hA[::-1])[::-1] / numRows
+                return sA
+
+            keyDensityA = None
+            if self.__ssKeysA is not None:
+                bitCountA = np.zeros(self.__ssKeysA.shape[1] * 64, dtype=np.int64)
+                for ii in range(0, len(self.__ssKeysA), 4096):
+                    bitCountA += np.unpackbits(np.ascontiguousarray(self.__ssKeysA[ii : ii + 4096]).view(np.uint8), axis=1, bitorder="little").sum(axis=0, dtype=np.int64)
+                keyDensityA = bitCountA / numRows
+            self.__statsD = {"maxCount": maxCount, "elements": survival(self.__countA), "features": survival(self.__featureA), "keys": keyDensityA}
+            logger.debug("Built column statistics for %d definitions (%.4f seconds)", len(self.__idL), time.time() - startTime)
+        return self.__statsD
+
+    def estimateMinimum(self, typeCountD, featureCountD=None, ssKeys=None, partitionD=None):
+        """Estimate the number of definitions selected by filterMinimum() from the column statistics.
+
+        Column selectivities (the fraction of definitions passing each element, feature and key bit test) are
+        combined with exponential backoff (s1 * s2^(1/2) * s3^(1/4) * s4^(1/8) for the four most selective tests
+        in increasing order) to temper the independence assumption for correlated columns, first within the element,
+        feature and key bit groups and then across the groups, and scaled by the size of the partition.  Single
+        column estimates are exact.
+
+        Args:
+            typeCountD (dict): dictionary of element minimum values {'<element_name>: #}
+            featureCountD (dict, optional): dictionary of feature minimum values {'<feature_name>: #}. Defaults to None.
+            ssKeys (str, optional): query structural key bitset (hexadecimal string). Defaults to None.
+            partitionD (dict, optional): partition filter (see getPartitionMask()). Defaults to None.
+
+        Returns:
+            (float): estimated number of selected definitions
+        """
+        statsD = self.getColumnStatistics()
+        maxCount = statsD["maxCount"]
+        numRows = float(np.count_nonzero(self.getPartitionMask(partitionD))) if partitionD else float(len(self.__idL))
+        elSelL = []
+        for el, minCount in (typeCountD or {}).items():
+            if el not in self.__elementColD:
+                return 0.0
+            elSelL.append(statsD["elements"][self.__elementColD[el], min(max(minCount, 1), maxCount)])
+        ftSelL = []
+        for ft, minCount in (featureCountD or {}).items():
+            if minCount <= 0:
+                continue
+            if ft not in self.__featureColD:
+                return 0.0
+            ftSelL.append(statsD["features"][self.__featureColD[ft], min(minCount, maxCount)])
+        keySelL = []
+        qWordA = self.getKeyWords(ssKeys) if ssKeys and statsD["keys"] is not None else None
+        if qWordA is not None:
+            bitL = np.flatnonzero(np.unpackbits(np.ascontiguousarray(qWordA).view(np.uint8), bitorder="little")).tolist()
+            keySelL = statsD["keys"][bitL].tolist()
+        return numRows * self.__backoff([self.__backoff(selL) for selL in [elSelL, ftSelL, keySelL] if selL])
+
+    @staticmethod
+    def __backoff(selL):
+        """Return the exponential backoff combination of the input selectivities (four most selective)."""
+        sel = 1.0
+        for ii, tSel in enumerate(sorted(selL)[:4]):
+            sel *= tSel ** (1.0 / 2**ii)
+        return sel
+
+    def getPartitionIndex(self):
+        """Return the partition summary of the index.
+
+        Returns:
+            (dict): {<partition key>: {<value>: <count>, ...}, ...} (e.g. {"source": {"BIRD": 10, "CCD": 200}, ...})
+        """
+        rD = {}
+        for ky, (labelL, codeA) in self.__partitionD.items():
+            countA = np.bincount(codeA[codeA >= 0], minlength=len(labelL))
+            rD[ky] = {label: int(count) for label, count in zip(labelL, countA)}
+        return rD
+
+    def getPartitionMask(self, partitionD):
+        """Return the row selection mask for the input partition filter.
+
+        Args:
+            partitionD (dict): partition filter {<partition key>: <value> or [<value>, ...], ...} (e.g. {"source": "CCD", "status": ["REL"]})
+                               values are matched case-insensitively, alternative values are combined with OR and
+                               partition keys with AND
+
+        Returns:
+            (numpy.ndarray): boolean row mask (all rows selected for an empty filter)
+        """
+        selA = np.ones(len(self.__idL), dtype=bool)
+        for ky, values in (partitionD or {}).items():
+            valueS = {str(v).upper() for v in ([values] if isinstance(values, str) else values)}
+            if ky not in self.__partitionD:
+                logger.warning("Partition %r is not indexed (rebuild the index to add partition attributes)", ky)
+                return np.zeros(len(self.__idL), dtype=bool)
+            labelL, codeA = self.__partitionD[ky]
+            codeL = [ii for ii, label in enumerate(labelL) if label in valueS]
+            selA &= np.isin(codeA, codeL)
+        return selA
+
+    def getPartitionRows(self, partitionD):
+        """Return the row indices for the input partition filter (see getPartitionMask())."""
+        return np.flatnonzero(self.getPartitionMask(partitionD))
+
+    def getElementSetIndex(self):
+        """Return the index of identifiers grouped by element set.
+
+        Returns:
+            (dict): {frozenset(<element>, ...): [<id>, ...], ...} (identifiers in index order)
+        """
+        rD = {}
+        if not self.__idL:
+            return rD
+        uniqA, invA = np.unique(self.__maskA, axis=0, return_inverse=True)
+        invA = invA.reshape(-1)
+        orderA = np.argsort(invA, kind="stable")
+        splitL = np.split(orderA, np.cumsum(np.bincount(invA, minlength=len(uniqA)))[:-1])
+        for maskRow, rowA in zip(uniqA, splitL):
+            elS = frozenset(el for col, el in enumerate(self.__elementL) if int(maskRow[col // 64]) >> (col % 64) & 1)
+            rD[elS] = self.getIds(rowA.tolist())
+        return rD
+
+    def __getQueryMask(self, elementL):
+        """Return the packed element mask for the input element list or None if any element is not indexed."""
+        qMask = np.zeros(self.__numWords, dtype=np.uint64)
+        for el in elementL:
+            if el not in self.__elementColD:
+                return None
+            col = self.__elementColD[el]
+            qMask[col // 64] |= np.uint64(1 << (col % 64))
+        return qMask
+
+    def matchRange(self, typeRangeD, matchSubset=False, partitionD=None):
+        """Find definitions with element counts within the input ranges (evaluates min <= count <= max).
+
+        Args:
+            typeRangeD (dict): dictionary of element ranges {'<element_name>: {'min': <int>, 'max': <int>}}
+            matchSubset (bool, optional): test for formula subset (default: False)
+            partitionD (dict, optional): partition filter (see getPartitionMask()). Defaults to None.
+
+        Returns:
+            (numpy.ndarray): row indices of matching definitions
+        """
+        if not typeRangeD:
+            return np.empty(0, dtype=np.intp)
+        qMask = self.__getQueryMask(typeRangeD.keys())
+        if qMask is None:
+            return np.empty(0, dtype=np.intp)
+        if matchSubset:
+            selA = np.all((self.__maskA & qMask) == qMask, axis=1)
+        else:
+            selA = np.all(self.__maskA == qMask, axis=1)
+        #
+        iInfo = np.iinfo(self.__countA.dtype)
+        colL = [self.__elementColD[el] for el in typeRangeD]
+        minA = np.array([rangeD.get("min", iInfo.min) for rangeD in typeRangeD.values()], dtype=np.int64)
+        maxA = np.array([rangeD.get("max", iInfo.max) for rangeD in typeRangeD.values()], dtype=np.int64)
+        subA = self.__countA[:, colL]
+        selA &= np.all((subA >= minA) & (subA <= maxA), axis=1)
+        if partitionD:
+            selA &= self.getPartitionMask(partitionD)
+        return np.flatnonzero(selA)
+
+    def filterMinimum(self, typeCountD, featureCountD=None, ssKeys=None, partitionD=None):
+        """Find definitions with at least the minimum element (and optionally feature) composition (evaluates min <= count)
+        and optionally containing all of the input structural keys (evaluates query bits & target bits == query bits).
+
+        Args:
+            typeCountD (dict): dictionary of element minimum values {'<element_name>: #}
+            featureCountD (dict, optional): dictionary of feature minimum values {'<feature_name>: #}. Defaults to None.
+            ssKeys (str, optional): query structural key bitset (hexadecimal string). Defaults to None.
+            partitionD (dict, optional): partition filter (see getPartitionMask()). Defaults to None.
+
+        Returns:
+            (numpy.ndarray): row indices of matching definitions
+        """
+        selA = self.getPartitionMask(partitionD)
+        if typeCountD:
+            qMask = self.__getQueryMask(typeCountD.keys())
+            if qMask is None:
+                return np.empty(0, dtype=np.intp)
+            selA &= np.all((self.__maskA & qMask) == qMask, axis=1)
+            colL = [self.__elementColD[el] for el in typeCountD]
+            minA = np.array(list(typeCountD.values()), dtype=np.int64)
+            selA &= np.all(self.__countA[:, colL] >= minA, axis=1)
+        if featureCountD:
+            # Features absent from the index have zero counts for every definition
+            fL = [(self.__featureColD.get(ft, None), minCount) for ft, minCount in featureCountD.items() if minCount > 0]
+            if any(col is None for col, _ in fL):
+                return np.empty(0, dtype=np.intp)
+            if fL:
+                colL = [col for col, _ in fL]
+                minA = np.array([minCount for _, minCount in fL], dtype=np.int64)
+                selA &= np.all(self.__featureA[:, colL] >= minA, axis=1)
+        if ssKeys:
+            qWordA = self.getKeyWords(ssKeys)
+            if qWordA is None:
+                logger.debug("Structural key screen skipped (incompatible or missing index keys)")
+            else:
+                nzL = np.flatnonzero(qWordA).tolist()
+                selA &= np.all((self.__ssKeysA[:, nzL] & qWordA[nzL]) == qWordA[nzL], axis=1)
+        return np.flatnonzero(selA)
@@ -4,7 +4,14 @@
 # Date:    16-Feb-2020
 #
 # Updates:
-#
+#  18-Oct-2026 jdw Add columnar (NumPy) element count index for formula searches.
+#  18-Oct-2026 jdw Add exact element set index for non-subset formula searches.
+#  18-Oct-2026 jdw Use columnar (NumPy) formula and feature index for minimum composition prefiltering.
+#  18-Oct-2026 jdw Store the index in a binary memory-mapped format (indexFormat="binary"|"json") and add exportIndex().
+#  18-Oct-2026 jdw Convert an existing JSON index to the binary index format rather than rebuilding it.
+#  18-Oct-2026 jdw Hold index entries as compact read-only records (compactIndex=True).
+#  18-Oct-2026 jdw Add optional structural key (ssKeys) screen to filterMinimumFormulaAndFeatures().
+#  18-Oct-2026 jdw Add partition attributes (source, type, status) and partition filters (partitionD).
 ##
 """
 Utilities to read and process an index of PDB chemical component definitions.
@@ -19,6 +26,9 @@ import os
 import time
 from collections import defaultdict, namedtuple
 
+from rcsb.utils.chem.ChemCompFormulaIndex import ChemCompFormulaIndex
+from rcsb.utils.chem.ChemCompIndexRecord import ChemCompIndexRecord, ChemCompIndexRecordFactory
+from rcsb.utils.chem.ChemCompIndexStore import ChemCompIndexStore
 from rcsb.utils.chem.ChemCompMoleculeProvider import ChemCompMoleculeProvider
 from rcsb.utils.chem.OeMoleculeFactory import OeMoleculeFactory
 from rcsb.utils.chem.PdbxChemComp import PdbxChemCompDescriptorIt
@@ -43,10 +53,28 @@ class ChemCompIndexProvider(object):
         self.__dirPath = os.path.join(self.__cachePath, "chem_comp")
         self.__mU = MarshalUtil(workPath=self.__dirPath)
         self.__ccFileNamePrefix = kwargs.get("ccFileNamePrefix", "cc")
+        self.__indexFormat = kwargs.get("indexFormat", "binary")
+        self.__idxStore = None
         self.__ccIdxD = self.__reload(**kwargs)
+        self.__formulaIdx = ChemCompFormulaIndex(indexStore=self.__idxStore) if self.__idxStore else ChemCompFormulaIndex(self.__ccIdxD)
+        self.__elementSetIdxD = self.__formulaIdx.getElementSetIndex()
 
     def getIndexFilePath(self):
-        return os.path.join(self.__dirPath, "%s-idx-chemical-components.json" % self.__ccFileNamePrefix)
+        fExt = "bin" if self.__indexFormat == "binary" else "json"
+        return os.path.join(self.__dirPath, "%s-idx-chemical-components.%s" % (self.__ccFileNamePrefix, fExt))
+
+    def exportIndex(self, filePath, fmt="json"):
+        """Export the current index (e.g. as JSON for debugging).
+
+        Args:
+            filePath (str): output file path
+            fmt (str, optional): export format (json|pickle). Defaults to "json".
+
+        Returns:
+            bool: True for success or False otherwise
+        """
+        idxD = {ky: vD.toDict() if isinstance(vD, ChemCompIndexRecord) else vD for ky, vD in self.__ccIdxD.items()}
+        return self.__mU.doExport(filePath, idxD, fmt=fmt)
 
     def testCache(self, minCount=None, logSizes=False):
         if logSizes and self.__ccIdxD:
@@ -54,12 +82,28 @@ class ChemCompIndexProvider(object):
         ok = self.__ccIdxD and len(self.__ccIdxD) >= minCount if minCount else self.__ccIdxD is not None
         return ok
 
-    def matchMolecularFormulaRange(self, typeRangeD, matchSubset=False):
+    def getPartitionIndex(self):
+        """Return the partition summary {<partition key>: {<value>: <count>, ...}, ...} (keys: source, type, status)."""
+        return self.__formulaIdx.getPartitionIndex()
+
+    def getPartitionIds(self, partitionD):
+        """Return the chemical component identifiers (in index order) within the input partition.
+
+        Args:
+            partitionD (dict): partition filter (e.g. {"source": "CCD", "type": ["NON-POLYMER"], "status": "REL"})
+
+        Returns:
+            (list):  chemical component identifiers
+        """
+        return self.__formulaIdx.getIds(self.__formulaIdx.getPartitionRows(partitionD))
+
+    def matchMolecularFormulaRange(self, typeRangeD, matchSubset=False, partitionD=None):
         """Find matching formula for the input atom type range query (evaluates min <= ff <= max).
 
         Args:
             typeRangeD (dict): dictionary of element ranges {'<element_name>: {'min': <int>, 'max': <int>}}
             matchSubset (bool, optional): test for formula subset (default: False)
+            partitionD (dict, optional): partition filter (e.g. {"source": "CCD", "status": "REL"}). Defaults to None.
 
         Returns:
             (list):  chemical component identifiers with matching formula (MatchResults)
@@ -69,117 +113,66 @@ class ChemCompIndexProvider(object):
             if not typeRangeD:
                 return rL
             myTypeRangeD = {k.upper(): v for k, v in typeRangeD.items()}
-            queryTypeS = set(myTypeRangeD.keys())
-            for ccId, idxD in self.__ccIdxD.items():
-                tD = idxD["type-counts"]
-                targetTypeS = set(tD.keys())
-                if not matchSubset and targetTypeS != queryTypeS:
-                    continue
-                #
-                if not queryTypeS.issubset(targetTypeS):
-                    continue
-                #
-                match = True
-                for atomType, rangeD in myTypeRangeD.items():
-                    if atomType in tD:
+            if matchSubset or partitionD:
+                ccIdL = self.__formulaIdx.getIds(self.__formulaIdx.matchRange(myTypeRangeD, matchSubset=matchSubset, partitionD=partitionD))
+            else:
+                # Exact composition - only definitions sharing the query element set are considered
+                ccIdL = []
+                for ccId in self.__elementSetIdxD.get(frozenset(myTypeRangeD), []):
+                    tD = self.__ccIdxD[ccId]["type-counts"]
+                    match = True
+                    for atomType, rangeD in myTypeRangeD.items():
                         # min <= ff <= max
                         if ("min" in rangeD and rangeD["min"] > tD[atomType]) or ("max" in rangeD and rangeD["max"] < tD[atomType]):
                             match = False
                             break
-                    else:
-                        match = False
-                        break
-                if match:
-                    # logger.info("%s formula %r query %r", ccId, idxD["type-counts"], typeRangeD)
-                    rL.append(MatchResults(ccId=ccId, searchType="formula", formula=idxD["formula"]))
+                    if match:
+                        ccIdL.append(ccId)
+            for ccId in ccIdL:
+                rL.append(MatchResults(ccId=ccId, searchType="formula", formula=self.__ccIdxD[ccId]["formula"]))
         except Exception as e:
             logger.exception("Failing for %r with %s", typeRangeD, str(e))
         return rL
 
-    def filterMinimumMolecularFormula(self, typeCountD):
+    def filterMinimumMolecularFormula(self, typeCountD, partitionD=None):
         """Find molecules with the minumum formula composition for the input atom type range query (evaluates min <= ff).
 
         Args:
             typeCountD (dict): dictionary of element minimum values {'<element_name>: #}
+            partitionD (dict, optional): partition filter (e.g. {"source": "CCD", "status": "REL"}). Defaults to None.
 
         Returns:
             (list):  chemical component identifiers
         """
         rL = []
         try:
-            if not typeCountD:
+            if not typeCountD and not partitionD:
                 return list(self.__ccIdxD.keys())
 
-            typeQueryS = set(typeCountD.keys())
-            for ccId, idxD in self.__ccIdxD.items():
-                tD = idxD["type-counts"]
-                #
-                if not typeQueryS.issubset(tD):
-                    continue
-                match = True
-                for atomType, minCount in typeCountD.items():
-                    try:
-                        if minCount > tD[atomType]:
-                            match = False
-                            break
-                    except Exception:
-                        match = False
-                        break
-                if match:
-                    rL.append(ccId)
+            rL = self.__formulaIdx.getIds(self.__formulaIdx.filterMinimum(typeCountD, partitionD=partitionD))
         except Exception as e:
             logger.exception("Failing for %r with %s", typeCountD, str(e))
         return rL
 
-    def filterMinimumFormulaAndFeatures(self, typeCountD, featureCountD):
-        """Find molecules with the minumum formula and feature composition.
+    def filterMinimumFormulaAndFeatures(self, typeCountD, featureCountD, ssKeys=None, partitionD=None):
+        """Find molecules with the minumum formula and feature composition (and optionally containing the input structural keys).
 
         Args:
             typeCountD (dict): dictionary of element minimum values {'<element_name>: #}
             featureCountD (dict): dictionary of feature minimum values {'<element_name>: #}
+            ssKeys (str, optional): structural key bitset (see OeMoleculeFactory.getSubStructKeys()). Defaults to None.
+            partitionD (dict, optional): partition filter (e.g. {"source": "CCD", "status": "REL"}). Defaults to None.
 
         Returns:
-            (list):  chemical component identifiers
+            (list):  chemical component identifiers (in index order)
         """
         rL = []
         try:
             if not typeCountD or not featureCountD:
-                return list(self.__ccIdxD.keys())
-            # ----
-            featureQueryS = set(featureCountD.keys())
-            typeQueryS = set(typeCountD.keys())
-            #
-            for ccId, idxD in self.__ccIdxD.items():
-                tD = idxD["type-counts"]
-                fD = idxD["feature-counts"]
-                #
-                if not typeQueryS.issubset(tD) or not featureQueryS.issubset(fD):
-                    continue
-
-                match = True
-                for atomType, minCount in typeCountD.items():
-                    try:
-                        if minCount > tD[atomType]:
-                            match = False
-                            break
-                    except Exception:
-                        match = False
-                        break
-
-                if not match:
-                    continue
-                #
-                for featureType, minCount in featureCountD.items():
-                    try:
-                        if minCount > fD[featureType]:
-                            match = False
-                            break
-                    except Exception:
-                        match = False
-                        break
-                #
-                if match:
-                    rL.append(ccId)
+                if not ssKeys and not partitionD:
+                    return list(self.__ccIdxD.keys())
+                typeCountD = featureCountD = None
+            rL = self.__formulaIdx.getIds(self.__formulaIdx.filterMinimum(typeCountD, featureCountD, ssKeys=ssKeys, partitionD=partitionD))
         except Exception as e:
             logger.exception("Failing for %r with %s", typeCountD, str(e))
         return rL
@@ -187,6 +180,10 @@ class ChemCompIndexProvider(object):
     def getIndex(self):
         return self.__ccIdxD
 
+    def getFormulaIndex(self):
+        """Return the columnar formula and feature count index (rows follow index order)."""
+        return self.__formulaIdx
+
     def getMol(self, ccId):
         try:
             return self.__ccIdxD[ccId]
@@ -210,13 +207,23 @@ class ChemCompIndexProvider(object):
         ccIdxD = {}
         useCache = kwargs.get("useCache", True)
         molLimit = kwargs.get("molLimit", 0)
+        compactIndex = kwargs.get("compactIndex", True)
 
+        recordFactory = ChemCompIndexRecordFactory() if compactIndex else None
         ccIdxFilePath = self.getIndexFilePath()
         #
+        if useCache and ccIdxFilePath.endswith(".bin") and not self.__mU.exists(ccIdxFilePath):
+            self.__convertJsonIndex(ccIdxFilePath)
+        #
         if useCache and self.__mU.exists(ccIdxFilePath):
             _, fExt = os.path.splitext(ccIdxFilePath)
-            ccIdxFormat = "json" if fExt == ".json" else "pickle"
-            rdCcIdxD = self.__mU.doImport(ccIdxFilePath, fmt=ccIdxFormat)
+            if fExt == ".bin":
+                idxStore = ChemCompIndexStore(ccIdxFilePath)
+                rdCcIdxD = idxStore.toDict(entryFactory=recordFactory.makeRecord if recordFactory else None) if idxStore.open() else {}
+                self.__idxStore = idxStore if rdCcIdxD and not molLimit else None
+            else:
+                ccIdxFormat = "json" if fExt == ".json" else "pickle"
+                rdCcIdxD = self.__mU.doImport(ccIdxFilePath, fmt=ccIdxFormat)
             ccIdxD = {k: rdCcIdxD[k] for k in sorted(rdCcIdxD.keys())[:molLimit]} if molLimit else rdCcIdxD
         else:
             cmpKwargs = {k: v for k, v in kwargs.items() if k not in ["cachePath", "useCache", "molLimit"]}
@@ -226,21 +233,44 @@ class ChemCompIndexProvider(object):
                 molBuildType = cmpKwargs.get("molBuildType", "model-xyz")
                 ccIdxD = self.__updateChemCompIndex(ccmP.getMolD(), ccIdxFilePath, molBuildType=molBuildType)
         #
-        for idxD in ccIdxD.values():
-            idxD["atom-types"] = set(idxD["type-counts"].keys()) if "type-counts" in idxD else set()
-            idxD["feature-types"] = set(idxD["feature-counts"].keys()) if "feature-counts" in idxD else set()
-        #
+        if recordFactory:
+            ccIdxD = recordFactory.makeRecords(ccIdxD)
         return ccIdxD
 
+    def __convertJsonIndex(self, filePath):
+        """Convert an existing JSON index (stored before the binary index format) to the binary index store.
+
+        Args:
+            filePath (str): binary index file path
+
+        Returns:
+            bool: True for success or False otherwise
+        """
+        jsonFilePath = os.path.splitext(filePath)[0] + ".json"
+        if not self.__mU.exists(jsonFilePath):
+            return False
+        try:
+            startTime = time.time()
+            idxD = self.__mU.doImport(jsonFilePath, fmt="json")
+            ok = bool(idxD) and ChemCompIndexStore(filePath).write(idxD)
+            logger.info("Converted %s to %s with %d indexed definitions (status=%r) (%.4f seconds)", jsonFilePath, filePath, len(idxD or {}), ok, time.time() - startTime)
+            return ok
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+        return False
+
     def __updateChemCompIndex(self, ccObjD, filePath, molBuildType="model-xyz"):
         idxD = {}
         try:
             # Serialized chemical component data index file
             startTime = time.time()
             _, fExt = os.path.splitext(filePath)
-            fileFormat = "json" if fExt == ".json" else "pickle"
+            fileFormat = "binary" if fExt == ".bin" else "json" if fExt == ".json" else "pickle"
             idxD = self.__buildChemCompIndex(ccObjD, molBuildType=molBuildType)
-            ok = self.__mU.doExport(filePath, idxD, fmt=fileFormat)
+            if fileFormat == "binary":
+                ok = ChemCompIndexStore(filePath).write(idxD)
+            else:
+                ok = self.__mU.doExport(filePath, idxD, fmt=fileFormat)
             endTime = time.time()
             logger.info("Storing %s with %d raw indexed definitions (status=%r) (%.4f seconds)", filePath, len(idxD), ok, endTime - startTime)
         #
@@ -276,6 +306,7 @@ class ChemCompIndexProvider(object):
                     typeCounts[aType] += 1
                 #
                 rD[ccId] = {"formula": formula, "type-counts": typeCounts, "ambiguous": ambiguousFlag, "feature-counts": {}}
+                rD[ccId].update(cc.getPartitionAttributes())
                 desIt = PdbxChemCompDescriptorIt(dataContainer)
                 for des in desIt:
                     desBuildType = des.getMolBuildType()
@@ -0,0 +1,131 @@
+##
+# File:    ChemCompIndexRecord.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+#
+# Updates:
+#
+##
+"""
+Compact read-only record types for chemical component and search index entries.
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import logging
+import sys
+from array import array
+from collections.abc import Mapping
+
+logger = logging.getLogger(__name__)
+
+
+class ChemCompIndexCounts(Mapping):
+    """Read-only count dictionary (e.g. type-counts, feature-counts) stored as a shared label tuple and a small-int array."""
+
+    __slots__ = ("__labels", "__counts")
+
+    def __init__(self, labels, counts):
+        self.__labels = labels
+        self.__counts = counts
+
+    def __getitem__(self, label):
+        try:
+            return self.__counts[self.__labels.index(label)]
+        except ValueError:
+            raise KeyError(label) from None
+
+    def __contains__(self, label):
+        return label in self.__labels
+
+    def __iter__(self):
+        return iter(self.__labels)
+
+    def __len__(self):
+        return len(self.__labels)
+
+    def __repr__(self):
+        return repr(self.toDict())
+
+    def __reduce__(self):
+        return (ChemCompIndexCounts, (self.__labels, self.__counts))
+
+    def toDict(self):
+        return dict(zip(self.__labels, self.__counts))
+
+
+class ChemCompIndexRecord(Mapping):
+    """Read-only index entry stored as a shared attribute name tuple and a value tuple."""
+
+    __slots__ = ("__keys", "__values")
+
+    def __init__(self, keys, values):
+        self.__keys = keys
+        self.__values = values
+
+    def __getitem__(self, ky):
+        try:
+            return self.__values[self.__keys.index(ky)]
+        except ValueError:
+            raise KeyError(ky) from None
+
+    def __contains__(self, ky):
+        return ky in self.__keys
+
+    def __iter__(self):
+        return iter(self.__keys)
+
+    def __len__(self):
+        return len(self.__keys)
+
+    def __repr__(self):
+        return repr(self.toDict())
+
+    def __reduce__(self):
+        return (ChemCompIndexRecord, (self.__keys, self.__values))
+
+    def toDict(self):
+        """Return the record as a plain (JSON serializable) dictionary."""
+        return {ky: v.toDict() if isinstance(v, ChemCompIndexCounts) else v for ky, v in zip(self.__keys, self.__values)}
+
+
+class ChemCompIndexRecordFactory(object):
+    """Build compact index records sharing attribute name and count label tuples and interned strings."""
+
+    def __init__(self):
+        self.__tupleD = {}
+
+    def __share(self, tT):
+        return self.__tupleD.setdefault(tT, tT)
+
+    def makeCounts(self, countD):
+        labels = self.__share(tuple(sys.intern(label) for label in countD))
+        countL = list(countD.values())
+        typeCode = "H" if all(0 <= count < 65536 for count in countL) else "l"
+        return ChemCompIndexCounts(labels, array(typeCode, countL))
+
+    def makeRecord(self, entryD):
+        """Return a compact record for the input index entry dictionary.
+
+        Args:
+            entryD (dict): index entry {<attribute>: <value>, ...}
+
+        Returns:
+            (obj): ChemCompIndexRecord()
+        """
+        if isinstance(entryD, ChemCompIndexRecord):
+            return entryD
+        valueL = []
+        for v in entryD.values():
+            if isinstance(v, str):
+                v = sys.intern(v)
+            elif isinstance(v, dict) and all(isinstance(count, int) for count in v.values()):
+                v = self.makeCounts(v)
+            valueL.append(v)
+        return ChemCompIndexRecord(self.__share(tuple(sys.intern(ky) for ky in entryD)), tuple(valueL))
+
+    def makeRecords(self, idxD):
+        """Return a dictionary of compact records for the input index dictionary."""
+        return {sys.intern(ky): self.makeRecord(entryD) for ky, entryD in idxD.items()}
@@ -0,0 +1,437 @@
+##
+# File:    ChemCompIndexStore.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+#
+# Updates:
+#  18-Oct-2026 jdw Add ChemCompIndexStoreMapping() for lazy (on-demand) decoding of index entries.
+#  18-Oct-2026 jdw Add entryFactory option to ChemCompIndexStoreMapping().
+#  18-Oct-2026 jdw Add getStringColumn() for bulk access to string attributes (e.g. ss-keys).
+#  18-Oct-2026 jdw Add entryFactory option to toDict() to decode rows directly into compact records.
+##
+"""
+Compact binary (memory-mappable) storage for chemical component and search index dictionaries.
+
+File layout (all sections 8-byte aligned):
+
+    magic (8 bytes) | header length (uint64) | JSON header | data sections ...
+
+The JSON header records the number of rows, the column schema and the offset, dtype and shape of
+each data section.  String values are stored once in an interned string table (utf-8 bytes + int64
+offset table) and referenced from fixed-width int32 columns (-1 absent).  Integer and boolean values
+are stored in fixed-width numeric columns, and count dictionaries (e.g. type-counts, feature-counts)
+are stored as int32 matrices (rows x labels) with -1 marking absent labels.  Values of any other type
+are stored as JSON text in the string table.  Derived set-valued attributes are not stored.
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import json
+import logging
+import os
+import struct
+import sys
+import time
+from collections.abc import Mapping
+
+import numpy as np
+from rcsb.utils.io.CacheUtils import CacheUtils
+
+logger = logging.getLogger(__name__)
+
+
+class _AbsentType(object):
+    """Marker for attributes absent from an index entry."""
+
+    __slots__ = ()
+
+
+_Absent = _AbsentType()
+
+
+class ChemCompIndexStore(object):
+    """Write and memory-map read access to a binary index store."""
+
+    MAGIC = b"RCSBIDX1"
+    FORMAT_VERSION = 1
+    INT_ABSENT = np.iinfo(np.int64).min
+
+    def __init__(self, filePath):
+        self.__filePath = filePath
+        self.__buf = None
+        self.__headerD = {}
+        self.__columnL = []
+        self.__sectionD = {}
+        self.__dataOffset = 0
+        self.__numRows = 0
+        self.__idRefA = None
+        self.__strOffsetA = None
+        self.__strBytesA = None
+        self.__strCacheL = None
+        self.__rowD = None
+
+    def getFilePath(self):
+        return self.__filePath
+
+    def exists(self):
+        return os.access(self.__filePath, os.R_OK)
+
+    # ------------------------------------------------------------------------------------
+    #  Writing
+    # ------------------------------------------------------------------------------------
+
+    def write(self, idxD):
+        """Serialize the input index dictionary to the binary store.
+
+        Args:
+            idxD (dict): index dictionary {<id>: {<attribute>: <value>, ...}, ...}
+
+        Returns:
+            bool: True for success or False otherwise
+        """
+        try:
+            startTime = time.time()
+            self.close()
+            strD = {}
+            idL = list(idxD.keys())
+            numRows = len(idL)
+            sectionL = []
+            columnL = []
+            #
+            sectionL.append(("ids", np.array([self.__internString(strD, tId) for tId in idL], dtype=np.int32)))
+            #
+            for name, kind in self.__getColumnSchema(idxD):
+                sectionName = "col%d" % len(columnL)
+                colD = {"name": name, "kind": kind, "section": sectionName}
+                valueL = [vD.get(name, _Absent) for vD in idxD.values()]
+                if kind == "str":
+                    tA = np.array([-1 if v is _Absent else self.__internString(strD, v) for v in valueL], dtype=np.int32)
+                elif kind == "json":
+                    tA = np.array([-1 if v is _Absent else self.__internString(strD, json.dumps(v)) for v in valueL], dtype=np.int32)
+                elif kind == "bool":
+                    tA = np.array([-1 if v is _Absent else int(v) for v in valueL], dtype=np.int8)
+                elif kind == "int":
+                    tA = np.array([self.INT_ABSENT if v is _Absent else v for v in valueL], dtype=np.int64)
+                elif kind == "float":
+                    tA = np.array([np.nan if v is _Absent else v for v in valueL], dtype=np.float64)
+                else:
+                    labelL = sorted({ky for v in valueL if v is not _Absent for ky in v})
+                    labelColD = {ky: ii for ii, ky in enumerate(labelL)}
+                    tA = np.full((numRows, len(labelL)), -1, dtype=np.int32)
+                    presentA = np.zeros(numRows, dtype=np.int8)
+                    for row, v in enumerate(valueL):
+                        if v is _Absent:
+                            continue
+                        presentA[row] = 1
+                        for ky, count in v.items():
+                            tA[row, labelColD[ky]] = count
+                    colD["labels"] = labelL
+                    colD["presentSection"] = sectionName + "p"
+                    sectionL.append((sectionName + "p", presentA))
+                columnL.append(colD)
+                sectionL.append((sectionName, tA))
+            #
+            strL = list(strD.keys())
+            encL = [tS.encode("utf-8") for tS in strL]
+            offsetA = np.zeros(len(encL) + 1, dtype=np.int64)
+            if encL:
+                offsetA[1:] = np.cumsum([len(tB) for tB in encL])
+            sectionL.append(("strOffsets", offsetA))
+            sectionL.append(("strBytes", np.frombuffer(b"".join(encL), dtype=np.uint8)))
+            #
+            sectionD = {}
+            offset = 0
+            for name, tA in sectionL:
+                sectionD[name] = {"offset": offset, "dtype": tA.dtype.str, "shape": list(tA.shape)}
+                offset += self.__align(tA.nbytes)
+            headerD = {"formatVersion": self.FORMAT_VERSION, "numRows": numRows, "columns": columnL, "sections": sectionD}
+            headerB = json.dumps(headerD).encode("utf-8")
+            headerB += b" " * (self.__align(len(headerB)) - len(headerB))
+            #
+            tmpPath = self.__filePath + ".tmp"
+            dirPath = os.path.dirname(self.__filePath)
+            if dirPath and not os.path.isdir(dirPath):
+                os.makedirs(dirPath)
+            with open(tmpPath, "wb") as ofh:
+                ofh.write(self.MAGIC)
+                ofh.write(struct.pack("<Q", len(headerB)))
+                ofh.write(headerB)
+                for _, tA in sectionL:
+                    tB = np.ascontiguousarray(tA).tobytes()
+                    ofh.write(tB)
+                    ofh.write(b"\0" * (self.__align(len(tB)) - len(tB)))
+            os.replace(tmpPath, self.__filePath)
+            logger.info("Stored %d index entries (%d strings) in %s (%.4f seconds)", numRows, len(strL), self.__filePath, time.time() - startTime)
+            return True
+        except Exception as e:
+            logger.exception("Failing for %s with %s", self.__filePath, str(e))
+        return False
+
+    def __getColumnSchema(self, idxD):
+        """Return the list of (attribute name, column kind) inferred from the values in the input index."""
+        typeD = {}
+        for vD in idxD.values():
+            for ky, v in vD.items():
+                typeD.setdefault(ky, set()).add(self.__getValueKind(v))
+        schemaL = []
+        for ky, kindS in typeD.items():
+            if "set" in kindS:
+                # derived attributes (e.g. atom-types, feature-types) are recomputed on load
+                continue
+            if len(kindS) == 1:
+                kind = kindS.pop()
+            elif kindS == {"int", "float"}:
+                kind = "float"
+            else:
+                kind = "json"
+            schemaL.append((ky, kind))
+        return schemaL
+
+    def __getValueKind(self, value):
+        if isinstance(value, (set, frozenset)):
+            return "set"
+        if isinstance(value, bool):
+            return "bool"
+        if isinstance(value, int):
+            return "int"
+        if isinstance(value, float):
+            return "float"
+        if isinstance(value, str):
+            return "str"
+        if isinstance(value, Mapping) and all(isinstance(ky, str) and isinstance(v, int) and not isinstance(v, bool) and v >= 0 for ky, v in value.items()):
+            return "counts"
+        return "json"
+
+    def __internString(self, strD, tS):
+        return strD.setdefault(tS, len(strD))
+
+    def __align(self, numBytes):
+        return (numBytes + 7) // 8 * 8
+
+    # ------------------------------------------------------------------------------------
+    #  Reading
+    # ------------------------------------------------------------------------------------
+
+    def open(self):
+        """Memory-map the binary store (read-only).
+
+        Returns:
+            bool: True for success or False otherwise
+        """
+        try:
+            if self.__buf is not None:
+                return True
+            buf = np.memmap(self.__filePath, dtype=np.uint8, mode="r")
+            if buf[: len(self.MAGIC)].tobytes() != self.MAGIC:
+                logger.error("Unrecognized index store format %s", self.__filePath)
+                return False
+            (headerLen,) = struct.unpack("<Q", buf[8:16].tobytes())
+            headerD = json.loads(buf[16 : 16 + headerLen].tobytes().decode("utf-8"))
+            if headerD.get("formatVersion", None) != self.FORMAT_VERSION:
+                logger.error("Unsupported index store version %r in %s", headerD.get("formatVersion", None), self.__filePath)
+                return False
+            self.__buf = buf
+            self.__headerD = headerD
+            self.__dataOffset = 16 + headerLen
+            self.__numRows = headerD["numRows"]
+            self.__columnL = headerD["columns"]
+            self.__sectionD = {}
+            self.__idRefA = self.__getSection("ids")
+            self.__strOffsetA = self.__getSection("strOffsets")
+            self.__strBytesA = self.__getSection("strBytes")
+            self.__strCacheL = None
+            self.__rowD = None
+            return True
+        except Exception as e:
+            logger.exception("Failing for %s with %s", self.__filePath, str(e))
+        return False
+
+    def close(self):
+        self.__buf = None
+        self.__sectionD = {}
+        self.__idRefA = self.__strOffsetA = self.__strBytesA = None
+        self.__strCacheL = None
+        self.__rowD = None
+        self.__numRows = 0
+
+    def __getSection(self, name):
+        if name not in self.__sectionD:
+            sD = self.__headerD["sections"][name]
+            dType = np.dtype(sD["dtype"])
+            count = int(np.prod(sD["shape"], dtype=np.int64))
+            start = self.__dataOffset + sD["offset"]
+            self.__sectionD[name] = self.__buf[start : start + count * dType.itemsize].view(dType).reshape(sD["shape"])
+        return self.__sectionD[name]
+
+    def __getString(self, ref):
+        if ref < 0:
+            return None
+        if self.__strCacheL is not None:
+            return self.__strCacheL[ref]
+        return sys.intern(self.__strBytesA[self.__strOffsetA[ref] : self.__strOffsetA[ref + 1]].tobytes().decode("utf-8"))
+
+    def __getStringList(self):
+        """Decode (once) the full interned string table."""
+        if self.__strCacheL is None:
+            rawB = self.__strBytesA.tobytes()
+            offL = self.__strOffsetA.tolist()
+            self.__strCacheL = [sys.intern(rawB[offL[ii] : offL[ii + 1]].decode("utf-8")) for ii in range(len(offL) - 1)]
+        return self.__strCacheL
+
+    def __len__(self):
+        return self.__numRows
+
+    def getIdList(self):
+        if self.__strCacheL is not None:
+            strL = self.__strCacheL
+            return [strL[ref] for ref in self.__idRefA.tolist()]
+        # identifiers are stored first in the string table - decode only this block
+        refL = self.__idRefA.tolist()
+        if not refL:
+            return []
+        offL = self.__strOffsetA[: max(refL) + 2].tolist()
+        rawB = self.__strBytesA[: offL[-1]].tobytes()
+        return [sys.intern(rawB[offL[ref] : offL[ref + 1]].decode("utf-8")) for ref in refL]
+
+    def getRow(self, tId):
+        """Return the row index for the input identifier (or None)."""
+        if self.__rowD is None:
+            self.__rowD = {tId: row for row, tId in enumerate(self.getIdList())}
+        return self.__rowD.get(tId, None)
+
+    def getColumnNames(self):
+        return [colD["name"] for colD in self.__columnL]
+
+    def getCountColumn(self, name):
+        """Return the labels and count matrix (rows x labels, -1 absent) for the input count dictionary attribute.
+
+        Args:
+            name (str): attribute name (e.g. type-counts, feature-counts)
+
+        Returns:
+            (list, numpy.ndarray): column labels and memory-mapped int32 count matrix or (None, None)
+        """
+        for colD in self.__columnL:
+            if colD["name"] == name and colD["kind"] == "counts":
+                return colD["labels"], self.__getSection(colD["section"])
+        return None, None
+
+    def getStringColumn(self, name):
+        """Return the decoded values of the input string attribute in row order.
+
+        Args:
+            name (str): attribute name (e.g. ss-keys)
+
+        Returns:
+            (list): column values (None if absent or not a string) or None if the attribute is not stored
+        """
+        for colD in self.__columnL:
+            if colD["name"] == name and colD["kind"] == "str":
+                return [self.__getString(ref) for ref in self.__getSection(colD["section"]).tolist()]
+            if colD["name"] == name and colD["kind"] == "json":
+                # mixed string and null values
+                valueL = [self.__decodeValue("json", ref) for ref in self.__getSection(colD["section"]).tolist()]
+                return [v if isinstance(v, str) else None for v in valueL]
+        return None
+
+    def getEntry(self, row):
+        """Decode the index entry dictionary for the input row."""
+        rD = {}
+        for colD in self.__columnL:
+            tA = self.__getSection(colD["section"])
+            kind = colD["kind"]
+            if kind == "counts":
+                if self.__getSection(colD["presentSection"])[row]:
+                    rD[colD["name"]] = {label: int(v) for label, v in zip(colD["labels"], tA[row].tolist()) if v >= 0}
+                continue
+            value = self.__decodeValue(kind, tA[row].item())
+            if value is not _Absent:
+                rD[colD["name"]] = value
+        return rD
+
+    def __decodeValue(self, kind, v):
+        if kind == "str":
+            return _Absent if v < 0 else self.__getString(v)
+        if kind == "json":
+            return _Absent if v < 0 else json.loads(self.__getString(v))
+        if kind == "bool":
+            return _Absent if v < 0 else bool(v)
+        if kind == "int":
+            return _Absent if v == self.INT_ABSENT else v
+        return _Absent if np.isnan(v) else v
+
+    def toDict(self, entryFactory=None):
+        """Decode the full store into an index dictionary {<id>: {<attribute>: <value>, ...}, ...}.
+
+        Args:
+            entryFactory (callable, optional): applied to each decoded entry dictionary as its row is assembled (e.g. to build a compact record). Defaults to None.
+
+        Returns:
+            (dict): index dictionary
+        """
+        startTime = time.time()
+        self.__getStringList()
+        colValueL = []
+        for colD in self.__columnL:
+            name = colD["name"]
+            kind = colD["kind"]
+            tA = self.__getSection(colD["section"])
+            if kind == "counts":
+                labelL = colD["labels"]
+                valueL = [{} if present else _Absent for present in self.__getSection(colD["presentSection"]).tolist()]
+                rowIdxA, colIdxA = np.nonzero(tA >= 0)
+                for row, col, count in zip(rowIdxA.tolist(), colIdxA.tolist(), tA[rowIdxA, colIdxA].tolist()):
+                    valueL[row][labelL[col]] = count
+            else:
+                valueL = [self.__decodeValue(kind, v) for v in tA.tolist()]
+            colValueL.append((name, valueL))
+        #
+        rD = {}
+        for row, tId in enumerate(self.getIdList()):
+            entryD = {name: valueL[row] for name, valueL in colValueL if valueL[row] is not _Absent}
+            rD[tId] = entryFactory(entryD) if entryFactory else entryD
+        logger.debug("Decoded %d index entries from %s (%.4f seconds)", len(rD), self.__filePath, time.time() - startTime)
+        return rD
+
+
+class ChemCompIndexStoreMapping(Mapping):
+    """Read-only mapping over a binary index store with on-demand decoding of index entries.
+
+    Only the identifier to row table is held in memory; entries are decoded when first
+    accessed and retained in a bounded LRU cache.
+    """
+
+    def __init__(self, indexStore, cacheSize=1000, entryFactory=None):
+        """
+        Args:
+            indexStore (obj): opened instance of ChemCompIndexStore()
+            cacheSize (int, optional): maximum number of decoded entries retained. Defaults to 1000.
+            entryFactory (callable, optional): applied to each decoded entry dictionary (e.g. to build a compact record). Defaults to None.
+        """
+        self.__idxStore = indexStore
+        self.__entryFactory = entryFactory
+        self.__idL = indexStore.getIdList()
+        self.__rowD = {tId: row for row, tId in enumerate(self.__idL)}
+        self.__cache = CacheUtils(size=cacheSize, label="index entries")
+
+    def __getitem__(self, tId):
+        vD = self.__cache.get(tId)
+        if vD is None:
+            vD = self.__idxStore.getEntry(self.__rowD[tId])
+            vD = self.__entryFactory(vD) if self.__entryFactory else vD
+            self.__cache.set(tId, vD)
+        return vD
+
+    def __contains__(self, tId):
+        return tId in self.__rowD
+
+    def __iter__(self):
+        return iter(self.__idL)
+
+    def __len__(self):
+        return len(self.__idL)
+
+    def getIndexStore(self):
+        return self.__idxStore
@@ -0,0 +1,248 @@
+##
+# File:    ChemCompNeighborTable.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+#
+# Updates:
+#  18-Oct-2026 jdw Resume an interrupted build only for the same fingerprint index content (checksum).
+##
+"""
+Precomputed nearest neighbour table (top-N fingerprint similarity neighbours of each search database molecule).
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import json
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def getScoreFilePath(filePath):
+    """Return the path of the neighbour score file companion to the neighbour index file."""
+    return os.path.splitext(filePath)[0] + "-score.npy"
+
+
+def getMetaFilePath(filePath):
+    """Return the path of the table metadata file companion to the neighbour index file."""
+    return os.path.splitext(filePath)[0] + "-meta.json"
+
+
+def getPartDirPath(filePath):
+    """Return the path of the work directory holding the completed blocks of an incomplete table build."""
+    return os.path.splitext(filePath)[0] + "-parts"
+
+
+class ChemCompNeighborTable(object):
+    """Nearest neighbour table of fixed width rows addressed by external index (e.g. OE molecule database index).
+
+    Each row holds the indices (int32, -1 padded) and Tanimoto scores (float64) of the top-N neighbours of
+    the row molecule (including the molecule itself) in order of decreasing score.  Rows are complete for
+    all neighbours scoring at least the table minimum score up to the table width.
+    """
+
+    def __init__(self, nbrIdxA, scoreA, fpType=None, minScore=None):
+        """Neighbour table.
+
+        Args:
+            nbrIdxA (numpy.ndarray): neighbour external indices (rows x top-N, -1 padded)
+            scoreA (numpy.ndarray): neighbour scores (rows x top-N)
+            fpType (str, optional): fingerprint type label (e.g. TREE, PATH, MACCS, CIRCULAR, LINGO). Defaults to None.
+            minScore (float, optional): minimum score of the stored neighbours. Defaults to None (no cutoff).
+        """
+        self.__nbrIdxA = nbrIdxA
+        self.__scoreA = scoreA
+        self.__fpType = fpType
+        self.__minScore = minScore if minScore else 0.0
+
+    def __len__(self):
+        return len(self.__nbrIdxA)
+
+    def getFpType(self):
+        return self.__fpType
+
+    def getMinScore(self):
+        return self.__minScore
+
+    def getMaxNeighbors(self):
+        return self.__nbrIdxA.shape[1]
+
+    def getNeighbors(self, idx, minScore=None, maxResults=0, idxList=None):
+        """Return the stored neighbours of the input row.
+
+        Args:
+            idx (int): external index of the query molecule
+            minScore (float, optional): minimum Tanimoto score (0.0-1.0). Defaults to None (no cutoff).
+            maxResults (int, optional): maximum number of results (0 for all stored). Defaults to 0.
+            idxList (list, optional): restrict the neighbours to these external indices. Defaults to None (all).
+
+        Returns:
+            (list): [(external index, score), ...] in order of decreasing score
+        """
+        if idx < 0 or idx >= len(self.__nbrIdxA):
+            return []
+        nbrA = np.asarray(self.__nbrIdxA[idx])
+        scoreA = np.asarray(self.__scoreA[idx])
+        keepA = nbrA >= 0
+        if minScore:
+            keepA &= scoreA >= minScore
+        if idxList is not None:
+            keepA &= np.isin(nbrA, np.asarray(list(idxList), dtype=np.int64))
+        rL = list(zip(nbrA[keepA].tolist(), scoreA[keepA].tolist()))
+        return rL[:maxResults] if maxResults else rL
+
+    def write(self, filePath):
+        """Write the table as NumPy (.npy) files - neighbour indices in filePath, scores and metadata in companion files.
+
+        Args:
+            filePath (str): output file path (.npy)
+
+        Returns:
+            bool: True for success or False otherwise
+        """
+        try:
+            dirPath = os.path.dirname(filePath)
+            if dirPath and not os.path.isdir(dirPath):
+                os.makedirs(dirPath)
+            np.save(filePath, np.asarray(self.__nbrIdxA, dtype=np.int32))
+            np.save(getScoreFilePath(filePath), np.asarray(self.__scoreA, dtype=np.float64))
+            with open(getMetaFilePath(filePath), "w", encoding="utf-8") as ofh:
+                json.dump({"fpType": self.__fpType, "minScore": self.__minScore, "maxNeighbors": self.getMaxNeighbors(), "numRows": len(self)}, ofh)
+            return True
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+        return False
+
+    @staticmethod
+    def load(filePath, mmapMode="r"):
+        """Return the table read from NumPy files written by write().
+
+        Args:
+            filePath (str): input file path (.npy)
+            mmapMode (str, optional): numpy.load() memory map mode ("r" read-only memory-mapped or None to read into memory). Defaults to "r".
+
+        Returns:
+            (obj): ChemCompNeighborTable() or None
+        """
+        try:
+            startTime = time.time()
+            with open(getMetaFilePath(filePath), "r", encoding="utf-8") as ifh:
+                metaD = json.load(ifh)
+            nbrIdxA = np.load(filePath, mmap_mode=mmapMode)
+            scoreA = np.load(getScoreFilePath(filePath), mmap_mode=mmapMode)
+            nbrTable = ChemCompNeighborTable(nbrIdxA, scoreA, fpType=metaD["fpType"], minScore=metaD["minScore"])
+            logger.info(
+                "Loaded %r neighbor table %d rows width %d (mmap %r) (%.4f seconds)", metaD["fpType"], len(nbrTable), nbrTable.getMaxNeighbors(), mmapMode, time.time() - startTime
+            )
+            return nbrTable
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+        return None
+
+    @staticmethod
+    def build(fpIdx, filePath, maxNeighbors=50, minScore=None, numProc=2, blockSize=128, resume=True):
+        """Build and write the neighbour table by an all-pairs similarity self join of the input fingerprint index.
+
+        Blocks of query fingerprints (in popcount order) are scored over a pool of worker threads.  Each completed
+        block is stored in a work directory (see getPartDirPath()) so an interrupted build resumes with the
+        remaining blocks.  The work directory is removed when the table is written.
+
+        Args:
+            fpIdx (obj): packed fingerprint index (ChemCompFingerPrintIndex)
+            filePath (str): output file path (.npy)
+            maxNeighbors (int, optional): number of neighbours stored for each molecule. Defaults to 50.
+            minScore (float, optional): minimum Tanimoto score of the stored neighbours. Defaults to None (no cutoff).
+            numProc (int, optional): number of worker threads. Defaults to 2.
+            blockSize (int, optional): number of query fingerprints scored together. Defaults to 128.
+            resume (bool, optional): reuse the completed blocks of a previous build with the same parameters and fingerprint index content. Defaults to True.
+
+        Returns:
+            bool: True for success or False otherwise
+        """
+        try:
+            startTime = time.time()
+            partDirPath = getPartDirPath(filePath)
+            paramFilePath = os.path.join(partDirPath, "params.json")
+            paramD = {
+                "fpType": fpIdx.getFpType(),
+                "maxNeighbors": maxNeighbors,
+                "minScore": minScore if minScore else 0.0,
+                "numRows": len(fpIdx),
+                "blockSize": blockSize,
+                "checksum": fpIdx.getChecksum(),
+            }
+            if os.path.isdir(partDirPath) and (not resume or ChemCompNeighborTable.__readParams(paramFilePath) != paramD):
+                logger.info("Discarding incomplete neighbor table build in %r", partDirPath)
+                shutil.rmtree(partDirPath)
+            if not os.path.isdir(partDirPath):
+                os.makedirs(partDirPath)
+                with open(paramFilePath, "w", encoding="utf-8") as ofh:
+                    json.dump(paramD, ofh)
+            #
+            idxL = fpIdx.getIdList()
+            blockL = [(ii, idxL[ii : ii + blockSize]) for ii in range(0, len(idxL), blockSize)]
+            todoL = [(ii, bL) for ii, bL in blockL if not os.path.exists(ChemCompNeighborTable.__getPartFilePath(partDirPath, ii))]
+            logger.info("Building %r neighbor table for %d fingerprints (%d/%d blocks remaining)", fpIdx.getFpType(), len(idxL), len(todoL), len(blockL))
+            ok = True
+            with ThreadPoolExecutor(max_workers=max(1, numProc)) as executor:
+                futureL = [executor.submit(ChemCompNeighborTable.__buildBlock, fpIdx, partDirPath, ii, bL, maxNeighbors, minScore) for ii, bL in todoL]
+                for future in as_completed(futureL):
+                    ok = future.result() and ok
+            if not ok:
+                logger.error("Incomplete %r neighbor table build (resume from %r)", fpIdx.getFpType(), partDirPath)
+                return False
+            #
+            numRows = max(idxL) + 1 if idxL else 0
+            nbrIdxA = np.full((numRows, maxNeighbors), -1, dtype=np.int32)
+            scoreA = np.zeros((numRows, maxNeighbors), dtype=np.float64)
+            for ii, _ in blockL:
+                with np.load(ChemCompNeighborTable.__getPartFilePath(partDirPath, ii)) as partD:
+                    nbrIdxA[partD["idx"]] = partD["nbr"]
+                    scoreA[partD["idx"]] = partD["score"]
+            ok = ChemCompNeighborTable(nbrIdxA, scoreA, fpType=fpIdx.getFpType(), minScore=minScore).write(filePath)
+            if ok:
+                shutil.rmtree(partDirPath)
+            logger.info("Built %r neighbor table %d rows width %d (status %r) (%.4f seconds)", fpIdx.getFpType(), numRows, maxNeighbors, ok, time.time() - startTime)
+            return ok
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+        return False
+
+    @staticmethod
+    def __readParams(paramFilePath):
+        try:
+            with open(paramFilePath, "r", encoding="utf-8") as ifh:
+                return json.load(ifh)
+        except Exception:
+            return None
+
+    @staticmethod
+    def __getPartFilePath(partDirPath, blockStart):
+        return os.path.join(partDirPath, "part-%010d.npz" % blockStart)
+
+    @staticmethod
+    def __buildBlock(fpIdx, partDirPath, blockStart, idxList, maxNeighbors, minScore):
+        """Score a block of query fingerprints against the index and store the block neighbours (write and rename)."""
+        try:
+            rLL = fpIdx.getSortedScoresBatch(fpIdx.getFingerPrints(idxList), minScore=minScore, maxResults=maxNeighbors)
+            nbrIdxA = np.full((len(idxList), maxNeighbors), -1, dtype=np.int32)
+            scoreA = np.zeros((len(idxList), maxNeighbors), dtype=np.float64)
+            for jj, rL in enumerate(rLL):
+                nbrIdxA[jj, : len(rL)] = [tup[0] for tup in rL]
+                scoreA[jj, : len(rL)] = [tup[1] for tup in rL]
+            partFilePath = ChemCompNeighborTable.__getPartFilePath(partDirPath, blockStart)
+            tmpFilePath = partFilePath[: -len(".npz")] + "-tmp.npz"
+            np.savez(tmpFilePath, idx=np.asarray(idxList, dtype=np.int64), nbr=nbrIdxA, score=scoreA)
+            os.replace(tmpFilePath, partFilePath)
+            return True
+        except Exception as e:
+            logger.exception("Failing block %d with %s", blockStart, str(e))
+        return False
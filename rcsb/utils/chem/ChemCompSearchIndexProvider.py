@@ -5,6 +5,16 @@
 #
 # Updates:
 #  13-Mar-2020 jdw Add formula index search method.
+#  18-Oct-2026 jdw Add exact element set index for non-subset formula searches.
+#  18-Oct-2026 jdw Use columnar (NumPy) formula and feature index for minimum composition prefiltering.
+#  18-Oct-2026 jdw Store the index in a binary memory-mapped format (indexFormat="binary"|"json") and add exportIndex().
+#  18-Oct-2026 jdw Add lazy index mode (lazyIndex=True) decoding binary index entries on demand.
+#  18-Oct-2026 jdw Hold index entries as compact read-only records (compactIndex=True).
+#  18-Oct-2026 jdw Add optional structural key (ssKeys) screen to filterMinimumFormulaAndFeatures().
+#  18-Oct-2026 jdw Add partition attributes (source, type, status) and partition filters (partitionD).
+#  18-Oct-2026 jdw Add InChIKey (full key and skeleton block) hash index and matchInChIKey().
+#  18-Oct-2026 jdw Add canonical isomeric, canonical and tautomer canonical SMILES hash indices and matchSmiles().
+#  18-Oct-2026 jdw Convert an existing JSON search index to the binary index format rather than rebuilding it.
 ##
 """
 Utilities to read and process an index of PDB chemical component definitions.
@@ -19,8 +29,12 @@ import os
 import time
 from collections import namedtuple
 
+from rcsb.utils.chem.ChemCompFormulaIndex import ChemCompFormulaIndex
+from rcsb.utils.chem.ChemCompIndexRecord import ChemCompIndexRecord, ChemCompIndexRecordFactory
+from rcsb.utils.chem.ChemCompIndexStore import ChemCompIndexStore, ChemCompIndexStoreMapping
 from rcsb.utils.chem.ChemCompMoleculeProvider import ChemCompMoleculeProvider
 from rcsb.utils.chem.OeMoleculeFactory import OeMoleculeFactory
+from rcsb.utils.chem.PdbxChemComp import PdbxChemCompIt
 from rcsb.utils.io.IoUtil import getObjSize
 from rcsb.utils.io.MarshalUtil import MarshalUtil
 
@@ -36,6 +50,14 @@ logger = logging.getLogger(__name__)
 MatchResults = namedtuple("MatchResults", "ccId oeMol searchType matchOpts screenType fpType fpScore oeIdx formula", defaults=(None,) * 9)
 
 
+def addPartitionAttributes(relD, dataContainer):
+    """Add the partition attributes (source, type, status) of the input definition to each related search index entry."""
+    cc = next(iter(PdbxChemCompIt(dataContainer)), None)
+    partD = cc.getPartitionAttributes() if cc else {}
+    for vD in relD.values():
+        vD.update(partD)
+
+
 class ChemCompSearchIndexWorker(object):
     """A skeleton class that implements the interface expected by the multiprocessing
     for calculating search index candidates --
@@ -93,6 +115,7 @@ class ChemCompSearchIndexWorker(object):
                     continue
                 relD = oemf.buildRelated(limitPerceptions=limitPerceptions)
                 logger.debug("%s %s related molecular forms %d", procName, ccId, len(relD))
+                addPartitionAttributes(relD, dataContainer)
                 if relD:
                     rL.extend([relD[v] for v in relD])
                 else:
@@ -105,13 +128,64 @@ class ChemCompSearchIndexWorker(object):
 class ChemCompSearchIndexProvider(object):
     """Utilities to read and process the index of chemical component definitions search targets"""
 
+    # SMILES type -> search index attribute
+    SMILES_INDEX_ATTRIBUTES = {"iso": "smiles", "can": "can-smiles", "tautomer": "tautomer-smiles"}
+
     def __init__(self, **kwargs):
-        #
+        """
+        Args:
+            cachePath (str, optional): path to the directory containing cache files. Defaults to ".".
+            ccFileNamePrefix (str, optional): index file name prefix. Defaults to "cc".
+            indexFormat (str, optional): serialized index format (binary|json). Defaults to "binary".
+            lazyIndex (bool, optional): decode binary index entries on demand rather than on reload. Defaults to False.
+            indexCacheSize (int, optional): number of decoded entries retained in lazy index mode. Defaults to 1000.
+            compactIndex (bool, optional): hold index entries as compact read-only records. Defaults to True.
+        """
         self.__cachePath = kwargs.get("cachePath", ".")
         self.__dirPath = os.path.join(self.__cachePath, "chem_comp")
         self.__mU = MarshalUtil(workPath=self.__dirPath)
         self.__ccFileNamePrefix = kwargs.get("ccFileNamePrefix", "cc")
+        self.__indexFormat = kwargs.get("indexFormat", "binary")
+        self.__idxStore = None
         self.__searchIdx = self.__reload(**kwargs)
+        self.__formulaIdx = ChemCompFormulaIndex(indexStore=self.__idxStore) if self.__idxStore else ChemCompFormulaIndex(self.__searchIdx)
+        self.__elementSetIdxD = self.__formulaIdx.getElementSetIndex()
+        self.__inchiKeyIdxD, self.__inchiSkeletonIdxD = self.__buildInChIKeyIndex()
+        self.__smilesIdxD = {smilesType: self.__buildHashIndex(attributeName) for smilesType, attributeName in self.SMILES_INDEX_ATTRIBUTES.items()}
+
+    def __getStringColumn(self, attributeName):
+        vL = self.__idxStore.getStringColumn(attributeName) if self.__idxStore else None
+        if vL is None:
+            vL = [self.__searchIdx[searchCcId].get(attributeName, None) for searchCcId in self.__formulaIdx.getIdList()]
+        return vL
+
+    def __buildHashIndex(self, attributeName):
+        """Return the hash index of the values of the input string attribute to search index rows."""
+        startTime = time.time()
+        hashD = {}
+        for row, val in enumerate(self.__getStringColumn(attributeName)):
+            if val:
+                hashD.setdefault(val, []).append(row)
+        logger.debug("Built %s index with %d keys (%.4f seconds)", attributeName, len(hashD), time.time() - startTime)
+        return hashD
+
+    def __buildInChIKeyIndex(self):
+        """Return the hash indices of full InChIKeys and InChIKey skeletons (first block) to search index rows."""
+        startTime = time.time()
+        keyD = {}
+        skelD = {}
+        for row, inchiKey in enumerate(self.__getStringColumn("inchi-key")):
+            if inchiKey:
+                keyD.setdefault(inchiKey, []).append(row)
+                skelD.setdefault(inchiKey[:14], []).append(row)
+        logger.debug("Built InChIKey index with %d keys and %d skeletons (%.4f seconds)", len(keyD), len(skelD), time.time() - startTime)
+        return keyD, skelD
+
+    def __getPartitionIds(self, rowL, partitionD):
+        if rowL and partitionD:
+            maskA = self.__formulaIdx.getPartitionMask(partitionD)
+            rowL = [row for row in rowL if maskA[row]]
+        return self.__formulaIdx.getIds(rowL)
 
     def testCache(self, minCount=None, logSizes=False):
         if logSizes and self.__searchIdx:
@@ -120,8 +194,13 @@ class ChemCompSearchIndexProvider(object):
         return ok
 
     def getIndex(self):
+        """Return the search index (a read-only mapping decoded on demand in lazy index mode)."""
         return self.__searchIdx
 
+    def getFormulaIndex(self):
+        """Return the columnar formula and feature count index (rows follow search index order)."""
+        return self.__formulaIdx
+
     def getIndexEntry(self, searchCcId):
         try:
             return self.__searchIdx[searchCcId]
@@ -130,7 +209,21 @@ class ChemCompSearchIndexProvider(object):
         return None
 
     def getIndexFilePath(self):
-        return os.path.join(self.__dirPath, "%s-search-idx-chemical-components.json" % self.__ccFileNamePrefix)
+        fExt = "bin" if self.__indexFormat == "binary" else "json"
+        return os.path.join(self.__dirPath, "%s-search-idx-chemical-components.%s" % (self.__ccFileNamePrefix, fExt))
+
+    def exportIndex(self, filePath, fmt="json"):
+        """Export the current search index (e.g. as JSON for debugging).
+
+        Args:
+            filePath (str): output file path
+            fmt (str, optional): export format (json|pickle). Defaults to "json".
+
+        Returns:
+            bool: True for success or False otherwise
+        """
+        idxD = {ky: vD.toDict() if isinstance(vD, ChemCompIndexRecord) else vD for ky, vD in self.__searchIdx.items()}
+        return self.__mU.doExport(filePath, idxD, fmt=fmt)
 
     def __reload(self, **kwargs):
         """Reload or created index of PDB chemical components.
@@ -150,12 +243,28 @@ class ChemCompSearchIndexProvider(object):
         maxChunkSize = kwargs.get("maxChunkSize", 20)
         limitPerceptions = kwargs.get("limitPerceptions", True)
         quietFlag = kwargs.get("quietFlag", True)
+        lazyIndex = kwargs.get("lazyIndex", False)
+        indexCacheSize = kwargs.get("indexCacheSize", 1000)
+        compactIndex = kwargs.get("compactIndex", True)
+        recordFactory = ChemCompIndexRecordFactory() if compactIndex else None
         searchIdxFilePath = self.getIndexFilePath()
         #
+        if useCache and searchIdxFilePath.endswith(".bin") and not self.__mU.exists(searchIdxFilePath):
+            self.__convertJsonIndex(searchIdxFilePath)
+        #
         if useCache and self.__mU.exists(searchIdxFilePath):
             _, fExt = os.path.splitext(searchIdxFilePath)
-            searchIdxFormat = "json" if fExt == ".json" else "pickle"
-            rdCcIdxD = self.__mU.doImport(searchIdxFilePath, fmt=searchIdxFormat)
+            if fExt == ".bin":
+                idxStore = ChemCompIndexStore(searchIdxFilePath)
+                ok = idxStore.open()
+                if ok and lazyIndex and not molLimit:
+                    rdCcIdxD = ChemCompIndexStoreMapping(idxStore, cacheSize=indexCacheSize, entryFactory=recordFactory.makeRecord if recordFactory else None)
+                else:
+                    rdCcIdxD = idxStore.toDict(entryFactory=recordFactory.makeRecord if recordFactory else None) if ok else {}
+                self.__idxStore = idxStore if rdCcIdxD and not molLimit else None
+            else:
+                searchIdxFormat = "json" if fExt == ".json" else "pickle"
+                rdCcIdxD = self.__mU.doImport(searchIdxFilePath, fmt=searchIdxFormat)
             searchIdxD = {k: rdCcIdxD[k] for k in sorted(rdCcIdxD.keys())[:molLimit]} if molLimit else rdCcIdxD
         else:
             cmpKwargs = {k: v for k, v in kwargs.items() if k not in ["cachePath", "useCache", "molLimit"]}
@@ -165,19 +274,39 @@ class ChemCompSearchIndexProvider(object):
                 searchIdxD = self.__updateChemCompSearchIndex(ccmP.getMolD(), searchIdxFilePath, molLimit, limitPerceptions, numProc, maxChunkSize, quietFlag)
                 logger.info("Storing %s with data for %d search candidates (status=%r) ", searchIdxFilePath, len(searchIdxD), ok)
         #
-        #
-        for idxD in searchIdxD.values():
-            idxD["atom-types"] = set(idxD["type-counts"].keys()) if "type-counts" in idxD else set()
-
+        if recordFactory and isinstance(searchIdxD, dict):
+            searchIdxD = recordFactory.makeRecords(searchIdxD)
         return searchIdxD
 
+    def __convertJsonIndex(self, filePath):
+        """Convert an existing JSON search index (stored before the binary index format) to the binary index store.
+
+        Args:
+            filePath (str): binary search index file path
+
+        Returns:
+            bool: True for success or False otherwise
+        """
+        jsonFilePath = os.path.splitext(filePath)[0] + ".json"
+        if not self.__mU.exists(jsonFilePath):
+            return False
+        try:
+            startTime = time.time()
+            searchIdxD = self.__mU.doImport(jsonFilePath, fmt="json")
+            ok = bool(searchIdxD) and ChemCompIndexStore(filePath).write(searchIdxD)
+            logger.info("Converted %s to %s with %d search definitions (status=%r) (%.4f seconds)", jsonFilePath, filePath, len(searchIdxD or {}), ok, time.time() - startTime)
+            return ok
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+        return False
+
     def __updateChemCompSearchIndex(self, ccObjD, filePath, molLimit, limitPerceptions, numProc, maxChunkSize, quietFlag):
         searchIdxD = {}
         try:
             # Serialized index of chemical component search targets
             startTime = time.time()
             _, fExt = os.path.splitext(filePath)
-            fileFormat = "json" if fExt == ".json" else "pickle"
+            fileFormat = "binary" if fExt == ".bin" else "json" if fExt == ".json" else "pickle"
             if numProc <= 1:
                 searchIdxD = self.__buildChemCompSearchIndex(ccObjD, limitPerceptions=limitPerceptions, molLimit=molLimit)
             else:
@@ -185,7 +314,10 @@ class ChemCompSearchIndexProvider(object):
                     ccObjD, limitPerceptions=limitPerceptions, molLimit=molLimit, numProc=numProc, maxChunkSize=maxChunkSize, quietFlag=quietFlag
                 )
 
-            ok = self.__mU.doExport(filePath, searchIdxD, fmt=fileFormat)
+            if fileFormat == "binary":
+                ok = ChemCompIndexStore(filePath).write(searchIdxD)
+            else:
+                ok = self.__mU.doExport(filePath, searchIdxD, fmt=fileFormat)
             endTime = time.time()
             logger.info("Storing %s (%s) with %d search definitions (status=%r) (%.4f seconds)", filePath, fileFormat, len(searchIdxD), ok, endTime - startTime)
         #
@@ -209,6 +341,7 @@ class ChemCompSearchIndexProvider(object):
                     logger.error("%s chemical component definition import error", ccId)
                 smiD = oemf.buildRelated(limitPerceptions=limitPerceptions)
                 logger.debug("%s related molecular forms %d", ccId, len(smiD))
+                addPartitionAttributes(smiD, ccObjD[ccId])
                 rD.update(smiD)
         except Exception as e:
             logger.exception("Failing with %s", str(e))
@@ -234,12 +367,65 @@ class ChemCompSearchIndexProvider(object):
         rD = {vD["name"]: vD for vD in resultList[0]}
         return rD
 
-    def matchMolecularFormulaRange(self, typeRangeD, matchSubset=False):
+    def getPartitionIndex(self):
+        """Return the partition summary {<partition key>: {<value>: <count>, ...}, ...} (keys: source, type, status)."""
+        return self.__formulaIdx.getPartitionIndex()
+
+    def getPartitionIds(self, partitionD):
+        """Return the search index identifiers (in index order) within the input partition.
+
+        Args:
+            partitionD (dict): partition filter (e.g. {"source": "CCD", "type": ["NON-POLYMER"], "status": "REL"})
+
+        Returns:
+            (list):  search index identifiers
+        """
+        return self.__formulaIdx.getIds(self.__formulaIdx.getPartitionRows(partitionD))
+
+    def matchInChIKey(self, inchiKey, skeleton=False, partitionD=None):
+        """Return the search index identifiers with the input InChIKey (hash lookup).
+
+        Args:
+            inchiKey (str): InChIKey (e.g. BSYNRYMUTXBXSQ-UHFFFAOYSA-N)
+            skeleton (bool, optional): match only the first (connectivity) block of the key. Defaults to False.
+            partitionD (dict, optional): partition filter (e.g. {"source": "CCD", "status": "REL"}). Defaults to None.
+
+        Returns:
+            (list):  search index identifiers (in index order)
+        """
+        if not inchiKey:
+            return []
+        rowL = self.__inchiSkeletonIdxD.get(inchiKey[:14], []) if skeleton else self.__inchiKeyIdxD.get(inchiKey, [])
+        return self.__getPartitionIds(rowL, partitionD)
+
+    def matchSmiles(self, smiles, smilesType="iso", partitionD=None):
+        """Return the search index identifiers with the input OE canonical SMILES (hash lookup).
+
+        Args:
+            smiles (str): OE canonical SMILES of the query (generated consistently with the selected smilesType)
+            smilesType (str, optional): canonical isomeric (iso), canonical without stereo (can) or the canonical
+                                        SMILES of the unique protomer (tautomer) form. Defaults to "iso".
+            partitionD (dict, optional): partition filter (e.g. {"source": "CCD", "status": "REL"}). Defaults to None.
+
+        Returns:
+            (list):  search index identifiers (in index order)
+
+        Note: tautomer SMILES are recorded only with the reference (model-xyz) entry of each component.
+        """
+        if not smiles:
+            return []
+        if smilesType not in self.__smilesIdxD:
+            logger.error("Unsupported SMILES type %r", smilesType)
+            return []
+        return self.__getPartitionIds(self.__smilesIdxD[smilesType].get(smiles, []), partitionD)
+
+    def matchMolecularFormulaRange(self, typeRangeD, matchSubset=False, partitionD=None):
         """Find matching formula for the input atom type range query (evaluates min <= ff <= max).
 
         Args:
             typeRangeD (dict): dictionary of element ranges {'<element_name>: {'min': <int>, 'max': <int>}}
             matchSubset (bool, optional): test for formula subset (default: False)
+            partitionD (dict, optional): partition filter (e.g. {"source": "CCD", "status": "REL"}). Defaults to None.
 
         Returns:
             (list):  chemical component identifiers with matching formula (MatchResults)
@@ -249,114 +435,66 @@ class ChemCompSearchIndexProvider(object):
             if not typeRangeD:
                 return rL
             myTypeRangeD = {k.upper(): v for k, v in typeRangeD.items()}
-            queryTypeS = set(myTypeRangeD.keys())
-            for ccId, idxD in self.__searchIdx.items():
-                tD = idxD["type-counts"]
-                # targetTypeS = set(tD.keys())
-                if not matchSubset and idxD["atom-types"] != queryTypeS:
-                    continue
-                #
-                if not queryTypeS.issubset(idxD["atom-types"]):
-                    continue
-                match = True
-                for atomType, rangeD in myTypeRangeD.items():
-                    try:
+            if matchSubset or partitionD:
+                ccIdL = self.__formulaIdx.getIds(self.__formulaIdx.matchRange(myTypeRangeD, matchSubset=matchSubset, partitionD=partitionD))
+            else:
+                # Exact composition - only entries sharing the query element set are considered
+                ccIdL = []
+                for ccId in self.__elementSetIdxD.get(frozenset(myTypeRangeD), []):
+                    tD = self.__searchIdx[ccId]["type-counts"]
+                    match = True
+                    for atomType, rangeD in myTypeRangeD.items():
+                        # min <= ff <= max
                         if ("min" in rangeD and rangeD["min"] > tD[atomType]) or ("max" in rangeD and rangeD["max"] < tD[atomType]):
                             match = False
                             break
-                    except Exception:
-                        match = False
-                        break
-                if match:
-                    # logger.info("%s formula %r query %r", ccId, idxD["type-counts"], typeRangeD)
-                    rL.append(MatchResults(ccId=ccId, searchType="formula", formula=idxD["formula"]))
+                    if match:
+                        ccIdL.append(ccId)
+            for ccId in ccIdL:
+                rL.append(MatchResults(ccId=ccId, searchType="formula", formula=self.__searchIdx[ccId]["formula"]))
         except Exception as e:
             logger.exception("Failing for %r with %s", typeRangeD, str(e))
         return rL
 
-    def filterMinimumMolecularFormula(self, typeCountD):
+    def filterMinimumMolecularFormula(self, typeCountD, partitionD=None):
         """Find molecules with the minumum formula composition for the input atom type query (evaluates min <= ff).
 
         Args:
             typeCountD (dict): dictionary of element minimum values {'<element_name>: #}
+            partitionD (dict, optional): partition filter (e.g. {"source": "CCD", "status": "REL"}). Defaults to None.
 
         Returns:
             (list):  chemical component identifiers
         """
         rL = []
         try:
-            if not typeCountD:
+            if not typeCountD and not partitionD:
                 return list(self.__searchIdx.keys())
 
-            queryTypeS = set(typeCountD.keys())
-            for ccId, idxD in self.__searchIdx.items():
-                tD = idxD["type-counts"]
-                if not queryTypeS.issubset(tD):
-                    continue
-                match = True
-                for atomType, minCount in typeCountD.items():
-                    try:
-                        if minCount > tD[atomType]:
-                            match = False
-                            break
-                    except Exception:
-                        match = False
-                        break
-                if match:
-                    rL.append(ccId)
+            rL = self.__formulaIdx.getIds(self.__formulaIdx.filterMinimum(typeCountD, partitionD=partitionD))
         except Exception as e:
             logger.exception("Failing for %r with %s", typeCountD, str(e))
         return rL
 
-    def filterMinimumFormulaAndFeatures(self, typeCountD, featureCountD):
-        """Find molecules with the minumum formula and feature composition.
+    def filterMinimumFormulaAndFeatures(self, typeCountD, featureCountD, ssKeys=None, partitionD=None):
+        """Find molecules with the minumum formula and feature composition (and optionally containing the input structural keys).
 
         Args:
             typeCountD (dict): dictionary of element minimum values {'<element_name>: #}
             featureCountD (dict): dictionary of feature minimum values {'<element_name>: #}
+            ssKeys (str, optional): structural key bitset (see OeMoleculeFactory.getSubStructKeys()). Defaults to None.
+            partitionD (dict, optional): partition filter (e.g. {"source": "CCD", "status": "REL"}). Defaults to None.
 
         Returns:
-            (list):  chemical component identifiers
+            (list):  chemical component identifiers (in index order)
         """
         rL = []
         try:
             if not typeCountD or not featureCountD:
-                return list(self.__searchIdx.keys())
-            # ----
-            featureQueryS = set(featureCountD.keys())
-            typeQueryS = set(typeCountD.keys())
-            #
-            for ccId, idxD in self.__searchIdx.items():
-                tD = idxD["type-counts"]
-                fD = idxD["feature-counts"]
-                #
-                if not typeQueryS.issubset(tD) or not featureQueryS.issubset(fD):
-                    continue
-
-                match = True
-                for atomType, minCount in typeCountD.items():
-                    try:
-                        if minCount > tD[atomType]:
-                            match = False
-                            break
-                    except Exception:
-                        match = False
-                        break
-
-                if not match:
-                    continue
-                #
-                for featureType, minCount in featureCountD.items():
-                    try:
-                        if minCount > fD[featureType]:
-                            match = False
-                            break
-                    except Exception:
-                        match = False
-                        break
-                #
-                if match:
-                    rL.append(ccId)
+                if not ssKeys and not partitionD:
+                    return list(self.__searchIdx.keys())
+                typeCountD = featureCountD = None
+            rL = self.__formulaIdx.getIds(self.__formulaIdx.filterMinimum(typeCountD, featureCountD, ssKeys=ssKeys, partitionD=partitionD))
         except Exception as e:
             logger.exception("Failing for %r with %s", typeCountD, str(e))
         return rL
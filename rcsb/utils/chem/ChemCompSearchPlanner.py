@@ -0,0 +1,166 @@
+##
+# File:    ChemCompSearchPlanner.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+#
+# Updates:
+#
+##
+"""
+Cost-based planner selecting the substructure search strategy for each query from search index statistics.
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import logging
+import threading
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+QueryPlan = namedtuple("QueryPlan", "strategy numProc estCandidates estSeconds costD", defaults=(None,) * 5)
+
+# per unit costs (seconds) of the cost model
+DEFAULT_COSTD = {
+    # graph match of a decoded target (read, OEPrepareSearch() and SingleMatch())
+    "match": 5.0e-5,
+    # graph match of a search ready target (OePreparedMolCache)
+    "matchPrepared": 1.0e-5,
+    # vectorized index filter for each definition and tested column
+    "scanColumn": 2.0e-9,
+    # dispatch overhead of a multi-process search
+    "multiProc": 2.0e-3,
+    # screened database search setup, screen test for each target and graph match for each screen candidate
+    "screenStart": 1.0e-3,
+    "screenTarget": 2.0e-7,
+    "screenMatch": 2.0e-5,
+}
+
+
+class ChemCompSearchPlanner(object):
+    """Cost-based choice of the substructure search strategy.
+
+    Candidate counts of each strategy are estimated from the column statistics of the formula index (element and
+    feature count histograms and structural key bit density, see ChemCompFormulaIndex.estimateMinimum()) and
+    converted to estimated costs with a per unit cost model.  Strategies:
+
+        exhaustive  - graph match of every definition (in the partition)
+        prefilter   - formula/feature/structural key prefilter and graph match of the selected candidates
+        keys        - structural key (fingerprint) screen and graph match of the selected candidates
+        screened    - screened substructure search database (OESubSearchDatabase)
+
+    Graph matching strategies are planned with a single process or with numProc processes whichever is cheaper.
+    Estimated and actual costs of executed plans are logged and accumulated (getStats()) for tuning the cost model.
+    """
+
+    STRATEGIES = ("exhaustive", "prefilter", "keys", "screened")
+
+    def __init__(self, costD=None):
+        """Cost-based substructure search planner.
+
+        Args:
+            costD (dict, optional): per unit costs (seconds) overriding DEFAULT_COSTD. Defaults to None.
+        """
+        self.__costD = dict(DEFAULT_COSTD)
+        self.__costD.update(costD if costD else {})
+        self.__lock = threading.Lock()
+        # {<strategy>: {"count": <int>, "estSeconds": <float>, "seconds": <float>, "estCandidates": <float>, "candidates": <int>}}
+        self.__statsD = {}
+
+    def getCostModel(self):
+        return dict(self.__costD)
+
+    def __getGraphCost(self, numCandidates, numProc, prepared):
+        """Return the (seconds, number of processes) of the cheaper single or multi-process graph match of the candidates."""
+        matchSeconds = numCandidates * self.__costD["matchPrepared" if prepared else "match"]
+        if numProc > 1 and self.__costD["multiProc"] + matchSeconds / numProc < matchSeconds:
+            return self.__costD["multiProc"] + matchSeconds / numProc, numProc
+        return matchSeconds, 1
+
+    def plan(self, fIdx, typeCountD, featureCountD=None, ssKeys=None, partitionD=None, numProc=1, prepared=False, screened=False, strategyList=None):
+        """Return the cheapest search plan for the input query criteria.
+
+        Args:
+            fIdx (object): formula index (ChemCompFormulaIndex) of the search index
+            typeCountD (dict): query element minimum counts (e.g. from OeSubStructSearchUtils.getQueryCriteria())
+            featureCountD (dict, optional): query feature minimum counts. Defaults to None.
+            ssKeys (str, optional): query structural key bitset (hexadecimal string). Defaults to None.
+            partitionD (dict, optional): partition filter. Defaults to None.
+            numProc (int, optional): maximum number of graph matching processes. Defaults to 1.
+            prepared (bool, optional): search ready targets are available for the match options. Defaults to False.
+            screened (bool, optional): a screened substructure search database is available. Defaults to False.
+            strategyList (list, optional): candidate strategies. Defaults to None (all of STRATEGIES).
+
+        Returns:
+            (QueryPlan): strategy, number of processes, estimated candidates and seconds of the cheapest plan and the
+                         estimates of all considered strategies costD {<strategy>: (<candidates>, <seconds>, <numProc>), ...}
+        """
+        strategyList = strategyList if strategyList else self.STRATEGIES
+        numRows = float(len(fIdx))
+        numPartRows = fIdx.estimateMinimum(None, partitionD=partitionD) if partitionD else numRows
+        if not typeCountD or not featureCountD:
+            typeCountD = featureCountD = None
+        numTypeCols = len(typeCountD or {}) + len([v for v in (featureCountD or {}).values() if v > 0])
+        keyWordA = fIdx.getKeyWords(ssKeys) if ssKeys else None
+        numKeyCols = int((keyWordA != 0).sum()) if keyWordA is not None else 0
+        costD = {}
+        if "exhaustive" in strategyList:
+            seconds, tProc = self.__getGraphCost(numPartRows, numProc, prepared)
+            costD["exhaustive"] = (numPartRows, seconds + (numRows * self.__costD["scanColumn"] if partitionD else 0.0), tProc)
+        if "prefilter" in strategyList:
+            numCand = fIdx.estimateMinimum(typeCountD, featureCountD, ssKeys=ssKeys, partitionD=partitionD)
+            seconds, tProc = self.__getGraphCost(numCand, numProc, prepared)
+            costD["prefilter"] = (numCand, seconds + numRows * (numTypeCols + numKeyCols + 1) * self.__costD["scanColumn"], tProc)
+        if "keys" in strategyList and numKeyCols:
+            numCand = fIdx.estimateMinimum(None, ssKeys=ssKeys, partitionD=partitionD)
+            seconds, tProc = self.__getGraphCost(numCand, numProc, prepared)
+            costD["keys"] = (numCand, seconds + numRows * (numKeyCols + 1) * self.__costD["scanColumn"], tProc)
+        if "screened" in strategyList and screened:
+            # the screen is approximated by the structural key screen (complete database search and partition filter)
+            numCand = fIdx.estimateMinimum(None, ssKeys=ssKeys) if numKeyCols else numRows
+            tProc = max(1, numProc)
+            seconds = self.__costD["screenStart"] + (numRows * self.__costD["screenTarget"] + numCand * self.__costD["screenMatch"]) / tProc
+            costD["screened"] = (numCand, seconds, tProc)
+        strategy = min(costD, key=lambda ky: costD[ky][1])
+        numCand, seconds, tProc = costD[strategy]
+        return QueryPlan(strategy=strategy, numProc=tProc, estCandidates=numCand, estSeconds=seconds, costD=costD)
+
+    def record(self, queryPlan, seconds, numCandidates=None, searchId=None):
+        """Log and accumulate the estimated and actual cost of an executed plan.
+
+        Args:
+            queryPlan (QueryPlan): executed plan
+            seconds (float): actual execution time
+            numCandidates (int, optional): actual number of graph matched candidates (if known). Defaults to None.
+            searchId (str, optional): search identifier for logging. Defaults to None.
+        """
+        logger.info(
+            "%s plan %s (numProc %d) estimated %.1f candidates %.6f seconds actual %s candidates %.6f seconds (alternatives %s)",
+            searchId if searchId else "query",
+            queryPlan.strategy,
+            queryPlan.numProc,
+            queryPlan.estCandidates,
+            queryPlan.estSeconds,
+            numCandidates if numCandidates is not None else "-",
+            seconds,
+            ", ".join("%s %.1f/%.6f" % (ky, tup[0], tup[1]) for ky, tup in sorted(queryPlan.costD.items(), key=lambda kv: kv[1][1])),
+        )
+        with self.__lock:
+            sD = self.__statsD.setdefault(queryPlan.strategy, {"count": 0, "estSeconds": 0.0, "seconds": 0.0, "estCandidates": 0.0, "candidates": 0})
+            sD["count"] += 1
+            sD["estSeconds"] += queryPlan.estSeconds
+            sD["seconds"] += seconds
+            if numCandidates is not None:
+                sD["estCandidates"] += queryPlan.estCandidates
+                sD["candidates"] += numCandidates
+
+    def getStats(self):
+        """Return the accumulated estimated and actual costs of executed plans by strategy.
+
+        Returns:
+            (dict): {<strategy>: {"count": <int>, "estSeconds": <float>, "seconds": <float>, "estCandidates": <float>, "candidates": <int>}, ...}
+        """
+        with self.__lock:
+            return {ky: dict(vD) for ky, vD in self.__statsD.items()}
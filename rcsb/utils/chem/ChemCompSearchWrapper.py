@@ -5,7 +5,29 @@
 # Version: 0.001
 #
 # Updates:
-#
+#  18-Oct-2026 jdw Use vectorized formula+feature prefilter (OE database indices) for substructure search.
+#  18-Oct-2026 jdw Add lazyIndex bootstrap option for on-demand decoding of the search index.
+#  18-Oct-2026 jdw Add LRU result cache for formula searches (formulaCacheSize) with hit/miss counters.
+#  18-Oct-2026 jdw Add partition filters (partitionD) to all search entry points.
+#  18-Oct-2026 jdw Add InChIKey exact match fast path to matchByDescriptor() (forceFullSearch to bypass).
+#  18-Oct-2026 jdw Add matchByIdentity() hash lookups on canonical isomeric, canonical and tautomer canonical SMILES.
+#  18-Oct-2026 jdw Add fpEngine configuration option selecting the OE or packed (NumPy) fingerprint scoring engine.
+#  18-Oct-2026 jdw Add batch finger print search fingerPrintSearchBatch() streaming results per query.
+#  18-Oct-2026 jdw Add fpDbType bootstrap option for stored (memory-mapped) fingerprint databases.
+#  18-Oct-2026 jdw Add buildNeighborTables() and answer IdentifierPdb similarity queries from the neighbor tables.
+#  18-Oct-2026 jdw Add fpFoldBits and fpFoldSlack options for two-stage folded fingerprint screening (packed engine).
+#  18-Oct-2026 jdw Add LRU cache of prepared query molecules and fingerprints (queryCacheSize) shared by search and depiction.
+#  18-Oct-2026 jdw Stop the substructure search worker pool of the previous search database on reload.
+#  18-Oct-2026 jdw Build search ready target molecules per match option family (prepMatchOptsList) on reload.
+#  18-Oct-2026 jdw Add maxHits, timeoutSeconds and cancelToken to subStructSearchByDescriptor() (status 1 for partial results).
+#  18-Oct-2026 jdw Add ssEngine configuration option selecting the prefilter or screened (OESubSearchDatabase) substructure search engine.
+#  18-Oct-2026 jdw Add cost-based substructure search planner (ssEngine "auto") with logged estimated and actual plan costs.
+#  18-Oct-2026 jdw Start the substructure search worker pool on reload with an explicit start method (mpStartMethod).
+#  18-Oct-2026 jdw Make search ready target preparation (prepMatchOptsList) opt-in and report its memory.
+#  18-Oct-2026 jdw Exclude the (uninterruptible) screened strategy from planned searches with a time budget or cancellation token.
+#  18-Oct-2026 jdw Score each block of fingerPrintSearchBatch() queries for all fingerprint types and return it as it completes.
+#  18-Oct-2026 jdw Add getSearchPoolStatus() reporting the targets shared with the search pool workers and their memory.
+#  18-Oct-2026 jdw Keep the prefilter substructure search engine for stored configurations without an ssEngine setting (auto is the setConfig() default).
 ##
 """
 Wrapper for chemical component search operations.
@@ -17,6 +39,7 @@ __email__ = "john.westbrook@rcsb.org"
 __license__ = "Apache 2.0"
 
 import copy
+import heapq
 import logging
 import platform
 import resource
@@ -27,11 +50,15 @@ from collections import namedtuple
 
 from rcsb.utils.chem.ChemCompIndexProvider import ChemCompIndexProvider
 from rcsb.utils.chem.ChemCompSearchIndexProvider import ChemCompSearchIndexProvider
+from rcsb.utils.chem.ChemCompSearchPlanner import ChemCompSearchPlanner
 from rcsb.utils.chem.MolecularFormula import MolecularFormula
 from rcsb.utils.chem.OeSearchMoleculeProvider import OeSearchMoleculeProvider
 from rcsb.utils.chem.OeIoUtils import OeIoUtils
+from rcsb.utils.chem.OeMoleculeFactory import OeMoleculeFactory
+from rcsb.utils.chem.OePreparedMolCache import OePreparedMolCache
 from rcsb.utils.chem.OeSearchUtils import OeSearchUtils
-from rcsb.utils.chem.OeSubStructSearchUtils import OeSubStructSearchUtils
+from rcsb.utils.chem.OeSubStructSearchUtils import OeSubStructSearchUtils, SearchCancelToken
+from rcsb.utils.io.CacheUtils import CacheUtils
 from rcsb.utils.io.FileUtil import FileUtil
 from rcsb.utils.io.MarshalUtil import MarshalUtil
 from rcsb.utils.io.SftpUtil import SftpUtil
@@ -44,6 +71,10 @@ logger = logging.getLogger(__name__)
 
 MatchResults = namedtuple("MatchResults", "ccId oeMol searchType matchOpts screenType fpType fpScore oeIdx formula", defaults=(None,) * 9)
 
+# substructure search engine of stored configurations without an ssEngine setting (auto|prefilter|screened) -
+# configurations written by setConfig() default to the cost-based planner (auto)
+DEFAULT_SS_ENGINE = "prefilter"
+
 
 class ChemCompSearchWrapper(SingletonClass):
     """Wrapper for chemical component search operations."""
@@ -59,6 +90,8 @@ class ChemCompSearchWrapper(SingletonClass):
                              (default environment variable CHEM_SEARCH_CACHE_PATH or ".")
             ccFileNamePrefix (str): prefix code used to distinguish different subsets of chemical definitions
                                     (default environment variable CHEM_SEARCH_CC_PREFIX or "cc-full")
+            formulaCacheSize (int): maximum number of cached formula search results (default 100)
+            queryCacheSize (int): maximum number of cached prepared query molecules (default 100)
 
         """
         self.__startTime = time.time()
@@ -78,10 +111,23 @@ class ChemCompSearchWrapper(SingletonClass):
         self.__oesmP = None
         self.__oesU = None
         self.__oesubsU = None
+        self.__prepMolCache = None
+        self.__planner = None
+        # ---
+        self.__formulaCacheSize = kwargs.get("formulaCacheSize", 100)
+        self.__formulaCache = CacheUtils(size=self.__formulaCacheSize, label="formula search")
+        self.__formulaCacheHits = 0
+        self.__formulaCacheMisses = 0
+        # ---
+        self.__queryCacheSize = kwargs.get("queryCacheSize", 100)
+        self.__queryCache = CacheUtils(size=self.__queryCacheSize, label="query molecule")
+        self.__queryCacheHits = 0
+        self.__queryCacheMisses = 0
         # ---
         self.__statusDescriptorError = -100
         self.__searchError = -200
         self.__searchSuccess = 0
+        self.__searchPartial = 1
 
     def setConfig(self, ccUrlTarget, birdUrlTarget, **kwargs):
         """Provide the chemical definition source path details for rebuilding search
@@ -117,11 +163,14 @@ class ChemCompSearchWrapper(SingletonClass):
             molLimit = kwargs.get("molLimit", None)
             useCache = kwargs.get("useCache", False)
             logSizes = kwargs.get("logSizes", False)
+            lazyIndex = kwargs.get("lazyIndex", False)
             #
             numProc = kwargs.get("numProc", 12)
             maxProc = os.cpu_count()
             numProc = min(numProc, maxProc)
             maxChunkSize = kwargs.get("maxChunkSize", 50)
+            # start method of the substructure search worker pool (fork|forkserver|spawn) (None for the pool default)
+            mpStartMethod = kwargs.get("mpStartMethod", None)
             #
             logger.debug("+++ >>> Assigning numProc as %d", numProc)
             #
@@ -130,6 +179,23 @@ class ChemCompSearchWrapper(SingletonClass):
             #
             # fpTypeCuttoffD = {"TREE": 0.6, "MACCS": 0.9, "PATH": 0.6, "CIRCULAR": 0.6, "LINGO": 0.9}
             fpTypeCuttoffD = kwargs.get("fpTypeCuttoffD", {"TREE": 0.6, "MACCS": 0.9})
+            # fingerprint scoring engine (oe|packed)
+            fpEngine = kwargs.get("fpEngine", "oe")
+            # folded fingerprint first stage screen length (packed engine, e.g. 1024) and cutoff reduction (None for single stage scoring)
+            fpFoldBits = kwargs.get("fpFoldBits", None)
+            fpFoldSlack = kwargs.get("fpFoldSlack", 0.1)
+            # stored fingerprint database type (FAST|PACKED)
+            fpDbType = kwargs.get("fpDbType", "FAST")
+            # number of neighbors stored in the precomputed neighbor tables (see buildNeighborTables())
+            maxNeighbors = kwargs.get("maxNeighbors", 50)
+            # match options selecting the families of search ready targets prepared on reload (e.g. ["graph-relaxed"]) -
+            # each family holds an in-memory copy of the search database shared with forked search workers (empty to disable)
+            prepMatchOptsList = kwargs.get("prepMatchOptsList", [])
+            # substructure search engine (auto|prefilter|screened) and screen type of the screened search database (SMARTS|MOLECULE)
+            # "auto" selects the strategy of each query with the cost-based planner (per unit costs plannerCostD, see ChemCompSearchPlanner)
+            ssEngine = kwargs.get("ssEngine", "auto")
+            screenType = kwargs.get("screenType", "SMARTS")
+            plannerCostD = kwargs.get("plannerCostD", None)
             buildTypeList = kwargs.get("buildTypeList", ["oe-iso-smiles", "oe-smiles", "cactvs-iso-smiles", "cactvs-smiles", "inchi"])
             #
             oesmpKwargs = {
@@ -143,11 +209,21 @@ class ChemCompSearchWrapper(SingletonClass):
                 "minCount": None,
                 "maxFpResults": 50,
                 "fpTypeCuttoffD": fpTypeCuttoffD,
+                "fpEngine": fpEngine,
+                "fpFoldBits": fpFoldBits,
+                "fpFoldSlack": fpFoldSlack,
+                "fpDbType": fpDbType,
+                "maxNeighbors": maxNeighbors,
+                "prepMatchOptsList": prepMatchOptsList,
                 "buildTypeList": buildTypeList,
-                "screenTypeList": None,
+                "ssEngine": ssEngine,
+                "screenType": screenType,
+                "screenTypeList": [screenType] if ssEngine == "screened" else kwargs.get("screenTypeList", None),
+                "plannerCostD": plannerCostD,
                 "quietFlag": quietFlag,
                 "numProc": numProc,
                 "maxChunkSize": maxChunkSize,
+                "mpStartMethod": mpStartMethod,
                 "molLimit": molLimit,
                 "logSizes": logSizes,
                 "suppressHydrogens": True,
@@ -166,6 +242,7 @@ class ChemCompSearchWrapper(SingletonClass):
                 "maxChunkSize": maxChunkSize,
                 "molLimit": None,
                 "logSizes": False,
+                "lazyIndex": lazyIndex,
             }
             configD = {"versionNumber": 0.30, "ccsiKwargs": ccsiKwargs, "oesmpKwargs": oesmpKwargs}
             #
@@ -343,6 +420,8 @@ class ChemCompSearchWrapper(SingletonClass):
                 ccIdxP = ChemCompIndexProvider(**kwargs)
                 ok = ccIdxP.testCache()
                 self.__ccIdxP = ccIdxP if ok else None
+                # cached formula search results refer to the previous index
+                self.__formulaCache = CacheUtils(size=self.__formulaCacheSize, label="formula search")
                 logger.info("Chemical component index status %r", ok)
         except Exception as e:
             logger.exception("Failing with %s", str(e))
@@ -418,18 +497,74 @@ class ChemCompSearchWrapper(SingletonClass):
                 return ok
             fpTypeCuttoffD = self.__configD["oesmpKwargs"]["fpTypeCuttoffD"] if "fpTypeCuttoffD" in self.__configD["oesmpKwargs"] else {}
             fpTypeList = [k for k, v in fpTypeCuttoffD.items()]
-            oesU = OeSearchUtils(self.__oesmP, fpTypeList=fpTypeList)
+            fpEngine = self.__configD["oesmpKwargs"]["fpEngine"] if "fpEngine" in self.__configD["oesmpKwargs"] else "oe"
+            fpFoldBits = self.__configD["oesmpKwargs"]["fpFoldBits"] if "fpFoldBits" in self.__configD["oesmpKwargs"] else None
+            fpFoldSlack = self.__configD["oesmpKwargs"]["fpFoldSlack"] if "fpFoldSlack" in self.__configD["oesmpKwargs"] else 0.1
+            prepMatchOptsList = self.__configD["oesmpKwargs"]["prepMatchOptsList"] if "prepMatchOptsList" in self.__configD["oesmpKwargs"] else []
+            ssEngine = self.__configD["oesmpKwargs"]["ssEngine"] if "ssEngine" in self.__configD["oesmpKwargs"] else DEFAULT_SS_ENGINE
+            screenType = self.__configD["oesmpKwargs"]["screenType"] if "screenType" in self.__configD["oesmpKwargs"] else "SMARTS"
+            numProc = self.__configD["oesmpKwargs"]["numProc"] if "numProc" in self.__configD["oesmpKwargs"] else 4
+            screenTypeList = self.__configD["oesmpKwargs"]["screenTypeList"] if "screenTypeList" in self.__configD["oesmpKwargs"] else None
+            plannerCostD = self.__configD["oesmpKwargs"]["plannerCostD"] if "plannerCostD" in self.__configD["oesmpKwargs"] else None
+            mpStartMethod = self.__configD["oesmpKwargs"]["mpStartMethod"] if "mpStartMethod" in self.__configD["oesmpKwargs"] else None
+            # the planner includes the screened strategy when the screened database is built (screenTypeList)
+            useScreen = ssEngine == "screened" or (ssEngine == "auto" and screenTypeList and screenType in screenTypeList)
+            self.__planner = ChemCompSearchPlanner(costD=plannerCostD) if ssEngine == "auto" else None
+            # search ready targets shared by the graph matching of both search utilities
+            oeMolDb, _ = self.__oesmP.getOeMolDatabase()
+            self.__prepMolCache = OePreparedMolCache(oeMolDb, matchOptsList=prepMatchOptsList) if prepMatchOptsList else None
+            oesU = OeSearchUtils(self.__oesmP, fpTypeList=fpTypeList, fpEngine=fpEngine, fpFoldBits=fpFoldBits, fpFoldSlack=fpFoldSlack, prepMolCache=self.__prepMolCache)
             ok1 = oesU.testCache()
             self.__oesU = oesU if ok1 else None
             #
-            oesubsU = OeSubStructSearchUtils(self.__oesmP)
+            # stop the worker pool holding the previous molecule database
+            if self.__oesubsU:
+                self.__oesubsU.close()
+            oesubsU = OeSubStructSearchUtils(
+                self.__oesmP, screenType=screenType if useScreen else None, numProc=numProc, prepMolCache=self.__prepMolCache, mpStartMethod=mpStartMethod
+            )
+            if ssEngine == "screened" and not oesubsU.getScreenType():
+                logger.warning("Screened substructure search engine unavailable - using the prefilter engine")
             ok2 = oesubsU.testCache()
+            # start the worker pool now rather than within the first multi-process query (possibly on a worker thread)
+            if ok2 and numProc > 1:
+                ok2 = oesubsU.startPool(numProc)
             self.__oesubsU = oesubsU if ok2 else None
         except Exception as e:
             logger.exception("Failing with %s", str(e))
         return ok1 and ok2
 
-    def searchByDescriptor(self, descriptor, descriptorType, matchOpts="graph-relaxed", searchId=None):
+    def buildNeighborTables(self, numProc=None, resume=True):
+        """Build the precomputed nearest neighbor tables (top maxNeighbors similarity neighbors of each search
+           database molecule scoring above the configured cutoff) for the configured fingerprint types.
+           The all-pairs similarity self join is run in parallel and interrupted builds are resumed.
+
+        Args:
+            numProc (int, optional): number of worker threads. Defaults to the configured numProc.
+            resume (bool, optional): resume previously interrupted builds. Defaults to True.
+
+        Returns:
+            bool: True for success or False otherwise
+        """
+        ok = False
+        try:
+            if not self.__oesmP and not self.updateSearchMoleculeProvider(useCache=True):
+                return ok
+            fpTypeCuttoffD = self.__configD["oesmpKwargs"]["fpTypeCuttoffD"] if "fpTypeCuttoffD" in self.__configD["oesmpKwargs"] else {}
+            maxNeighbors = self.__configD["oesmpKwargs"]["maxNeighbors"] if "maxNeighbors" in self.__configD["oesmpKwargs"] else 50
+            numProc = numProc if numProc else self.__configD["oesmpKwargs"].get("numProc", 2)
+            ok = True
+            for fpType, fpCutoff in fpTypeCuttoffD.items():
+                startTime = time.time()
+                tOk = self.__oesmP.buildNeighborTable(fpType, maxNeighbors=maxNeighbors, minScore=fpCutoff, numProc=numProc, resume=resume)
+                logger.info("Built %s neighbor table (status %r) (%.4f seconds)", fpType, tOk, time.time() - startTime)
+                ok = ok and tOk
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            ok = False
+        return ok
+
+    def searchByDescriptor(self, descriptor, descriptorType, matchOpts="graph-relaxed", searchId=None, partitionD=None, forceFullSearch=False):
         """Wrapper method for descriptor match and descriptor substructure search methods.
 
         Args:
@@ -439,6 +574,9 @@ class ChemCompSearchWrapper(SingletonClass):
                                        fingerprint-similarity, sub-struct-graph-relaxed, sub-struct-graph-relaxed-stereo,
                                        sub-struct-graph-strict Defaults to "graph-relaxed")
             searchId (str, optional): search identifier for logging. Defaults to None.
+            partitionD (dict, optional): restrict the search to a partition of the index, e.g. {"source": "CCD", "type": ["NON-POLYMER"], "status": "REL"}
+                                         (keys: source (CCD|BIRD), type (chem_comp.type), status (release status)). Defaults to None.
+            forceFullSearch (bool, optional): bypass the InChIKey exact match fast path (see matchByDescriptor()). Defaults to False.
 
         Returns:
             (statusCode, list, list): status, graph match and finger match lists of type (MatchResults)
@@ -447,20 +585,32 @@ class ChemCompSearchWrapper(SingletonClass):
                                          0 search execution success
         """
         if matchOpts.startswith("sub-struct-"):
-            return self.subStructSearchByDescriptor(descriptor, descriptorType, matchOpts=matchOpts, searchId=searchId)
+            return self.subStructSearchByDescriptor(descriptor, descriptorType, matchOpts=matchOpts, searchId=searchId, partitionD=partitionD)
         else:
-            return self.matchByDescriptor(descriptor, descriptorType, matchOpts=matchOpts, searchId=searchId)
+            return self.matchByDescriptor(descriptor, descriptorType, matchOpts=matchOpts, searchId=searchId, partitionD=partitionD, forceFullSearch=forceFullSearch)
 
-    def matchByDescriptor(self, descriptor, descriptorType, matchOpts="graph-relaxed", searchId=None):
+    def matchByDescriptor(self, descriptor, descriptorType, matchOpts="graph-relaxed", searchId=None, partitionD=None, forceFullSearch=False):
         """Return graph match (w/  finger print pre-filtering) and finger print search results for the
            input desriptor.
 
+           For graph-strict and graph-relaxed matches, search index entries sharing the query InChIKey
+           (graph-strict) or InChIKey skeleton (graph-relaxed) are first located by hash lookup and
+           verified by graph match.  If any are matched, these exact matches are returned (with an
+           empty finger print result list) without running the finger print and graph search pipeline.
+
+           For IdentifierPdb descriptors (the identifier of a chemical component in the search database),
+           fingerprint-similarity matches are taken from the precomputed neighbor tables (see buildNeighborTables())
+           when available without scoring the query online.
+
         Args:
-            descriptor (str):  molecular descriptor (SMILES, InChI)
-            descriptorType (str): descriptor type (SMILES, InChI
+            descriptor (str):  molecular descriptor (SMILES, InChI, chemical component identifier)
+            descriptorType (str): descriptor type (SMILES, InChI, IdentifierPdb)
             matchOpts (str, optional): graph match criteria (graph-relaxed, graph-relaxed-stereo, graph-strict,
                                        fingerprint-similarity, Defaults to "graph-relaxed")
             searchId (str, optional): search identifier for logging. Defaults to None.
+            partitionD (dict, optional): restrict the search to a partition of the index, e.g. {"source": "CCD", "type": ["NON-POLYMER"], "status": "REL"}
+                                         (keys: source (CCD|BIRD), type (chem_comp.type), status (release status)). Defaults to None.
+            forceFullSearch (bool, optional): always run the full finger print and graph search pipeline. Defaults to False.
 
         Returns:
             (statusCode, list, list): status, graph match and finger match lists of type (MatchResults)
@@ -478,23 +628,168 @@ class ChemCompSearchWrapper(SingletonClass):
             #
             searchId = searchId if searchId else "query"
             messageTag = searchId + ":" + descriptorType
-            oeioU = OeIoUtils()
-            oeMol = oeioU.descriptorToMol(descriptor, descriptorType, limitPerceptions=limitPerceptions, messageTag=messageTag)
-            oeMol = oeioU.suppressHydrogens(oeMol)
+            if descriptorType.upper() == "IDENTIFIERPDB":
+                ccId = descriptor.strip().upper()
+                if matchOpts == "fingerprint-similarity" and not partitionD:
+                    retStatus, fpL = self.__matchByNeighborTable(ccId, list(fpTypeCuttoffD.items())[:2], maxFpResults, searchId)
+                    if retStatus:
+                        return self.__searchSuccess, ssL, fpL
+                oeMol = OeIoUtils().suppressHydrogens(self.__oesmP.getMol(ccId))
+            else:
+                oeMol = self.getQueryMol(descriptor, descriptorType, limitPerceptions=limitPerceptions, messageTag=messageTag)
             if not oeMol:
                 logger.warning("descriptor type %r molecule build fails: %r", descriptorType, descriptor)
                 return self.__statusDescriptorError, ssL, fpL
             #
-            retStatus, ssL, fpL = self.__oesU.searchSubStructureAndFingerPrint(oeMol, list(fpTypeCuttoffD.items())[:2], maxFpResults, matchOpts=matchOpts)
+            if not forceFullSearch and matchOpts in ["graph-strict", "graph-relaxed"]:
+                retStatus, ssL = self.__matchByInChIKey(oeMol, matchOpts, partitionD, searchId)
+                if retStatus and ssL:
+                    return self.__searchSuccess, ssL, fpL
+            #
+            ccIdL = self.__siIdxP.getPartitionIds(partitionD) if partitionD else None
+            if ccIdL is not None and not ccIdL:
+                return 0, ssL, fpL
+            retStatus, ssL, fpL = self.__oesU.searchSubStructureAndFingerPrint(oeMol, list(fpTypeCuttoffD.items())[:2], maxFpResults, matchOpts=matchOpts, ccIdList=ccIdL)
             statusCode = 0 if retStatus else self.__searchError
         except Exception as e:
             logger.exception("Failing with %s", str(e))
             #
         return statusCode, ssL, fpL
 
-    def subStructSearchByDescriptor(self, descriptor, descriptorType, matchOpts="sub-struct-graph-relaxed", searchId=None):
+    def __matchByNeighborTable(self, ccId, fpTypeCutoffList, maxFpResults, searchId):
+        """Return the finger print matches of a search database molecule from the precomputed neighbor tables (False if any table is unavailable)."""
+        startTime = time.time()
+        fpLL = []
+        for fpType, fpCutoff in fpTypeCutoffList:
+            ok, tL = self.__oesU.getNeighborScores(ccId, fpType, fpCutoff, maxFpResults)
+            if not ok:
+                return False, []
+            fpLL.append(tL)
+        fpL = list(dict.fromkeys(heapq.merge(*fpLL, key=lambda nTup: -nTup.fpScore)))
+        logger.info("%s identifier %s neighbor table matches %d (%.4f seconds)", searchId, ccId, len(fpL), time.time() - startTime)
+        return True, fpL
+
+    def __matchByInChIKey(self, oeMol, matchOpts, partitionD, searchId):
+        """Return the graph verified search index entries sharing the InChIKey (graph-strict) or InChIKey skeleton (graph-relaxed) of the query."""
+        startTime = time.time()
+        oemf = OeMoleculeFactory()
+        oemf.setOeMol(oeMol, searchId)
+        inchiKey = oemf.getInChIKey()
+        ccIdL = self.__siIdxP.matchInChIKey(inchiKey, skeleton=matchOpts == "graph-relaxed", partitionD=partitionD)
+        if not ccIdL:
+            return True, []
+        retStatus, ssL = self.__oesU.searchSubStructure(oeMol, matchOpts=matchOpts, ccIdList=ccIdL)
+        ssL = [rTup._replace(searchType="inchikey-match") for rTup in ssL]
+        logger.info("%s InChIKey %s candidates %d matched %d (%.4f seconds)", searchId, inchiKey, len(ccIdL), len(ssL), time.time() - startTime)
+        return retStatus, ssL
+
+    def matchByIdentity(self, descriptor, descriptorType, identityType="can", searchId=None, partitionD=None):
+        """Return the search index entries identical to the input descriptor by hash lookup of canonical
+           identifiers (no graph match is performed).
+
+        Args:
+            descriptor (str):  molecular descriptor (SMILES, InChI)
+            descriptorType (str): descriptor type (SMILES, InChI)
+            identityType (str, optional): identity criteria - iso (same canonical isomeric SMILES), can (same compound ignoring stereo),
+                                          tautomer (same compound ignoring stereo, tautomer and protonation state). Defaults to "can".
+            searchId (str, optional): search identifier for logging. Defaults to None.
+            partitionD (dict, optional): restrict the search to a partition of the index, e.g. {"source": "CCD", "status": "REL"}. Defaults to None.
+
+        Returns:
+            (statusCode, list): status and list of identity matches of type (MatchResults) with searchType "identity-<identityType>"
+                                -100 descriptor processing error
+                                -200 search execution error
+                                   0 search execution success
+        """
+        mL = []
+        statusCode = -200
+        try:
+            limitPerceptions = self.__configD["oesmpKwargs"]["limitPerceptions"] if "limitPerceptions" in self.__configD["oesmpKwargs"] else False
+            startTime = time.time()
+            searchId = searchId if searchId else "query"
+            messageTag = searchId + ":" + descriptorType
+            oeMol = self.getQueryMol(descriptor, descriptorType, limitPerceptions=limitPerceptions, messageTag=messageTag)
+            if not oeMol:
+                logger.warning("descriptor type %r molecule build fails: %r", descriptorType, descriptor)
+                return self.__statusDescriptorError, mL
+            #
+            oemf = OeMoleculeFactory()
+            oemf.setOeMol(oeMol, searchId)
+            if identityType == "iso":
+                smiles = oemf.getIsoSMILES()
+            elif identityType == "can":
+                smiles = oemf.getCanSMILES()
+            elif identityType == "tautomer":
+                smiles = oemf.getTautomerCanSMILES()
+            else:
+                logger.error("%s unsupported identity type %r", searchId, identityType)
+                return statusCode, mL
+            ccIdL = self.__siIdxP.matchSmiles(smiles, smilesType=identityType, partitionD=partitionD)
+            mL = [MatchResults(ccId=ccId, oeMol=self.__oesmP.getMol(ccId), searchType="identity-" + identityType) for ccId in ccIdL]
+            statusCode = self.__searchSuccess
+            logger.info("%s identity (%s) %s matched %d (%.4f seconds)", searchId, identityType, smiles, len(mL), time.time() - startTime)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+        return statusCode, mL
+
+    def fingerPrintSearchBatch(self, queryList, partitionD=None, numProc=None, blockSize=64):
+        """Return finger print search results for a batch of query descriptors.  Queries are scored together
+           in blocks over a pool of worker threads (see OeSearchUtils.getMultiFingerPrintScoresBatch()).  Each block is scored
+           for all configured finger print types and results are returned per query as each block is completed.
+
+        Args:
+            queryList (list): query descriptors [(searchId, descriptor, descriptorType), ...]
+            partitionD (dict, optional): restrict the search to a partition of the index, e.g. {"source": "CCD", "status": "REL"}. Defaults to None.
+            numProc (int, optional): number of worker threads. Defaults to the configured numProc.
+            blockSize (int, optional): number of queries scored together. Defaults to 64.
+
+        Yields:
+            (str, statusCode, list): search identifier, status and finger match list of type (MatchResults) in order of decreasing score
+                                     -100 descriptor processing error
+                                     -200 search execution error
+                                        0 search execution success
+        """
+        startTime = time.time()
+        fpTypeCuttoffD = self.__configD["oesmpKwargs"]["fpTypeCuttoffD"] if "fpTypeCuttoffD" in self.__configD["oesmpKwargs"] else {}
+        maxFpResults = self.__configD["oesmpKwargs"]["maxFpResults"] if "maxFpResults" in self.__configD["oesmpKwargs"] else 50
+        limitPerceptions = self.__configD["oesmpKwargs"]["limitPerceptions"] if "limitPerceptions" in self.__configD["oesmpKwargs"] else False
+        numProc = numProc if numProc else self.__configD["oesmpKwargs"].get("numProc", 2)
+        #
+        searchIdL = []
+        oeMolL = []
+        for searchId, descriptor, descriptorType in queryList:
+            oeMol = self.getQueryMol(descriptor, descriptorType, limitPerceptions=limitPerceptions, messageTag=searchId + ":" + descriptorType)
+            if not oeMol:
+                logger.warning("descriptor type %r molecule build fails: %r", descriptorType, descriptor)
+                yield searchId, self.__statusDescriptorError, []
+                continue
+            searchIdL.append(searchId)
+            oeMolL.append(oeMol)
+        #
+        ccIdL = self.__siIdxP.getPartitionIds(partitionD) if partitionD else None
+        fpTypeCutoffList = list(fpTypeCuttoffD.items())[:2]
+        if not fpTypeCutoffList:
+            logger.error("No finger print types configured")
+            for searchId in searchIdL:
+                yield searchId, self.__searchError, []
+            return
+        # each block of queries is scored for all finger print types and returned as the block completes
+        for ii, ok, tL in self.__oesU.getMultiFingerPrintScoresBatch(oeMolL, fpTypeCutoffList, maxFpResults, ccIdList=ccIdL, numProc=numProc, blockSize=blockSize):
+            fpL = sorted(set(tL), key=lambda nTup: nTup.fpScore, reverse=True)
+            yield searchIdL[ii], self.__searchSuccess if ok else self.__searchError, fpL
+        #
+        elapsed = time.time() - startTime
+        logger.info("Batch finger print search on %d queries (%.4f seconds) (%.2f queries/second)", len(queryList), elapsed, len(queryList) / elapsed if elapsed else 0.0)
+
+    def subStructSearchByDescriptor(
+        self, descriptor, descriptorType, matchOpts="sub-struct-graph-relaxed", searchId=None, partitionD=None, maxHits=None, timeoutSeconds=None, cancelToken=None
+    ):
         """Return graph match (w/  finger print pre-filtering) and finger print search results for the
-           input desriptor.
+           input desriptor.  The configured substructure search engine (ssEngine) is "prefilter" (formula/feature/key
+           prefilter and graph match), "screened" (screened substructure search database with the time budget and
+           cancellation honoured only before the search starts) or "auto" (strategy selected for each query by the
+           cost-based planner, see ChemCompSearchPlanner, excluding the screened strategy for searches with a time
+           budget or cancellation token).
 
         Args:
             descriptor (str):  molecular descriptor (SMILES, InChI)
@@ -502,44 +797,105 @@ class ChemCompSearchWrapper(SingletonClass):
             matchOpts (str, optional): graph match criteria (sub-struct-graph-relaxed, sub-struct-graph-relaxed-stereo,
                                        sub-struct-graph-strict). Defaults to "sub-struct-graph-relaxed".
             searchId (str, optional): search identifier for logging. Defaults to None.
+            partitionD (dict, optional): restrict the search to a partition of the index, e.g. {"source": "CCD", "type": ["NON-POLYMER"], "status": "REL"}
+                                         (keys: source (CCD|BIRD), type (chem_comp.type), status (release status)). Defaults to None.
+            maxHits (int, optional): maximum number of substructure matches. Defaults to None (no limit).
+            timeoutSeconds (float, optional): time budget in seconds of the search (including query preparation and prefiltering). Defaults to None (no limit).
+            cancelToken (obj, optional): cancellation token (SearchCancelToken) - cancel() stops a running search (e.g. from another thread). Defaults to None.
 
         Returns:
             (statusCode, list, list): status, substructure search results of type (MatchResults), empty list placeholder
                                       -100 descriptor processing error
                                       -200 search execution error
                                          0 search execution success
+                                         1 partial results (search stopped at maxHits, timeoutSeconds or by cancelToken)
         """
         ssL = []
         retStatus = False
         statusCode = -200
+        startTime = time.time()
         try:
+            # the screened search is not interruptible and is planned only for searches without a budget or token
+            interruptible = bool(timeoutSeconds) or cancelToken is not None
+            cancelToken = cancelToken if cancelToken else SearchCancelToken()
             limitPerceptions = self.__configD["oesmpKwargs"]["limitPerceptions"] if "limitPerceptions" in self.__configD["oesmpKwargs"] else False
             numProc = self.__configD["oesmpKwargs"]["numProc"] if "numProc" in self.__configD["oesmpKwargs"] else 4
             #
             searchId = searchId if searchId else "query"
             messageTag = searchId + ":" + descriptorType
-            oeioU = OeIoUtils()
-            oeMol = oeioU.descriptorToMol(descriptor, descriptorType, limitPerceptions=limitPerceptions, messageTag=messageTag)
-            oeMol = oeioU.suppressHydrogens(oeMol)
+            oeMol = self.getQueryMol(descriptor, descriptorType, limitPerceptions=limitPerceptions, messageTag=messageTag)
             if not oeMol:
                 logger.warning("descriptor type %r molecule build fails: %r", descriptorType, descriptor)
                 return self.__statusDescriptorError, ssL, []
             #
-            ccIdL = self.__oesubsU.prefilterIndex(oeMol, self.__siIdxP, matchOpts=matchOpts)
-            retStatus, ssL = self.__oesubsU.searchSubStructure(oeMol, ccIdList=ccIdL, matchOpts=matchOpts, numProc=numProc)
-            statusCode = 0 if retStatus else self.__searchError
+            ssEngine = self.__configD["oesmpKwargs"]["ssEngine"] if "ssEngine" in self.__configD["oesmpKwargs"] else DEFAULT_SS_ENGINE
+            queryPlan = queryCriteria = None
+            if ssEngine == "screened" and self.__oesubsU.getScreenType():
+                strategy = "screened"
+            elif ssEngine == "auto" and self.__planner:
+                queryCriteria = self.__oesubsU.getQueryCriteria(oeMol, matchOpts)
+                queryPlan = self.__planner.plan(
+                    self.__siIdxP.getFormulaIndex(),
+                    queryCriteria[0],
+                    queryCriteria[1],
+                    ssKeys=queryCriteria[2],
+                    partitionD=partitionD,
+                    numProc=numProc,
+                    prepared=self.__prepMolCache is not None and self.__prepMolCache.hasMatchOpts(matchOpts, oeMol),
+                    screened=self.__oesubsU.getScreenType() is not None,
+                    strategyList=[ky for ky in ChemCompSearchPlanner.STRATEGIES if ky != "screened"] if interruptible else None,
+                )
+                strategy, numProc = queryPlan.strategy, queryPlan.numProc
+            else:
+                strategy = "prefilter"
+            #
+            planTime = time.time()
+            numCandidates = None
+            if strategy == "screened":
+                if timeoutSeconds and time.time() - startTime > timeoutSeconds:
+                    cancelToken.setStopReason("timeout")
+                    retStatus, ssL = True, []
+                else:
+                    idxL = self.__oesubsU.partitionDbIndex(self.__siIdxP, partitionD) if partitionD else None
+                    retStatus, ssL = self.__oesubsU.searchSubStructureScreened(oeMol, matchOpts=matchOpts, idxList=idxL, maxHits=maxHits, cancelToken=cancelToken, idxP=self.__siIdxP)
+            else:
+                if strategy == "exhaustive":
+                    # None for all molecule database indices
+                    idxL = self.__oesubsU.partitionDbIndex(self.__siIdxP, partitionD) if partitionD else None
+                    numCandidates = len(idxL) if idxL is not None else len(self.__siIdxP.getFormulaIndex())
+                elif strategy == "keys":
+                    idxL = self.__oesubsU.filterDbIndex(self.__siIdxP, None, ssKeys=queryCriteria[2], partitionD=partitionD)
+                    numCandidates = len(idxL)
+                else:
+                    idxL = self.__oesubsU.prefilterDbIndex(oeMol, self.__siIdxP, matchOpts=matchOpts, partitionD=partitionD, queryCriteria=queryCriteria)
+                    numCandidates = len(idxL)
+                timeLeft = max(1.0e-6, timeoutSeconds - (time.time() - startTime)) if timeoutSeconds else None
+                # An empty candidate list excludes all candidates (skip the exhaustive search)
+                retStatus, ssL = (
+                    self.__oesubsU.searchSubStructure(oeMol, idxList=idxL, matchOpts=matchOpts, numProc=numProc, maxHits=maxHits, timeoutSeconds=timeLeft, cancelToken=cancelToken)
+                    if idxL is None or idxL
+                    else (True, [])
+                )
+            if queryPlan:
+                self.__planner.record(queryPlan, time.time() - planTime, numCandidates=numCandidates, searchId=searchId)
+            if not retStatus:
+                statusCode = self.__searchError
+            else:
+                statusCode = self.__searchPartial if cancelToken.isPartial() else self.__searchSuccess
         except Exception as e:
             logger.exception("Failing with %s", str(e))
             #
         return statusCode, ssL, []
 
-    def matchByFormulaRange(self, elementRangeD, matchSubset=False, searchId=None):
+    def matchByFormulaRange(self, elementRangeD, matchSubset=False, searchId=None, partitionD=None):
         """Return formula match results for input element range dictionary.
 
         Args:
             elementRangeD (dict): {'<element_name>: {'min': <int>, 'max': <int>}, ... }
             matchSubset (bool, optional): query for formula subset (default: False)
             searchId (str, optional): search identifier for logging. Defaults to None.
+            partitionD (dict, optional): restrict the search to a partition of the index, e.g. {"source": "CCD", "type": ["NON-POLYMER"], "status": "REL"}
+                                         (keys: source (CCD|BIRD), type (chem_comp.type), status (release status)). Defaults to None.
 
         Returns:
             (statusCode, list): status, list of chemical component identifiers
@@ -549,20 +905,22 @@ class ChemCompSearchWrapper(SingletonClass):
         try:
             startTime = time.time()
             searchId = searchId if searchId else "query"
-            rL = self.__ccIdxP.matchMolecularFormulaRange(elementRangeD, matchSubset=matchSubset)
+            rL = self.__matchFormulaRangeCached(elementRangeD, matchSubset, partitionD)
             ok = True
             logger.info("%s formula %r matched %d (%.4f seconds)", searchId, elementRangeD, len(rL), time.time() - startTime)
         except Exception as e:
             logger.exception("Failing with %s", str(e))
         return ok, rL
 
-    def matchByFormula(self, formula, matchSubset=False, searchId=None):
+    def matchByFormula(self, formula, matchSubset=False, searchId=None, partitionD=None):
         """Return formula match results for input molecular formula.
 
         Args:
             formula (str): molecular formula  (ex. 'C6H6')
             matchSubset (bool, optional): query for formula subset (default: False)
             searchId (str, optional): search identifier for logging. Defaults to None.
+            partitionD (dict, optional): restrict the search to a partition of the index, e.g. {"source": "CCD", "type": ["NON-POLYMER"], "status": "REL"}
+                                         (keys: source (CCD|BIRD), type (chem_comp.type), status (release status)). Defaults to None.
 
         Returns:
             (statusCode, list): status, list of chemical component identifiers
@@ -575,13 +933,101 @@ class ChemCompSearchWrapper(SingletonClass):
             mf = MolecularFormula()
             eD = mf.parseFormula(formula)
             elementRangeD = {k.upper(): {"min": v, "max": v} for k, v in eD.items()}
-            rL = self.__ccIdxP.matchMolecularFormulaRange(elementRangeD, matchSubset=matchSubset)
+            rL = self.__matchFormulaRangeCached(elementRangeD, matchSubset, partitionD)
             ok = True
             logger.info("%s formula %r matched %d (%.4f seconds)", searchId, elementRangeD, len(rL), time.time() - startTime)
         except Exception as e:
             logger.exception("Failing with %s", str(e))
         return ok, rL
 
+    def __matchFormulaRangeCached(self, elementRangeD, matchSubset, partitionD=None):
+        """Return formula range match results from the result cache or the chemical component index."""
+        partitionT = tuple(sorted((k, tuple(sorted({str(v).upper() for v in ([vL] if isinstance(vL, str) else vL)}))) for k, vL in partitionD.items())) if partitionD else None
+        cacheKey = (tuple(sorted((k.upper(), v.get("min", None), v.get("max", None)) for k, v in elementRangeD.items())), bool(matchSubset), partitionT)
+        rL = self.__formulaCache.get(cacheKey)
+        if rL is None:
+            self.__formulaCacheMisses += 1
+            rL = self.__ccIdxP.matchMolecularFormulaRange(elementRangeD, matchSubset=matchSubset, partitionD=partitionD)
+            self.__formulaCache.set(cacheKey, rL)
+        else:
+            self.__formulaCacheHits += 1
+        return list(rL)
+
+    def getQueryMol(self, descriptor, descriptorType, limitPerceptions=None, messageTag=None, copyMol=False):
+        """Return the prepared (hydrogen suppressed) query molecule for the input descriptor with the fingerprints of
+           the configured types (FP_<fpType> data).  Prepared molecules are held in a bounded LRU cache keyed by
+           (descriptor, descriptor type, limitPerceptions) shared by the search and depiction methods.
+
+        Args:
+            descriptor (str):  molecular descriptor (SMILES, InChI, SMARTS)
+            descriptorType (str): descriptor type (SMILES, InChI, SMARTS)
+            limitPerceptions (bool, optional): limit the perceptions/transformations of the input descriptor. Defaults to the configured setting.
+            messageTag (str, optional): prefix string for error messages. Defaults to None.
+            copyMol (bool, optional): return a copy of the cached molecule (for callers modifying the molecule). Defaults to False.
+
+        Returns:
+            (obj): OE molecule (shared and not to be modified unless copyMol is set) or None for failure
+        """
+        oesmpKwargs = self.__configD["oesmpKwargs"] if self.__configD and "oesmpKwargs" in self.__configD else {}
+        if limitPerceptions is None:
+            limitPerceptions = oesmpKwargs.get("limitPerceptions", False)
+        cacheKey = (descriptor, descriptorType.upper(), bool(limitPerceptions))
+        oeMol = self.__queryCache.get(cacheKey)
+        if oeMol is None:
+            self.__queryCacheMisses += 1
+            oeioU = OeIoUtils()
+            oeMol = oeioU.descriptorToMol(descriptor, descriptorType, limitPerceptions=limitPerceptions, messageTag=messageTag)
+            oeMol = oeioU.suppressHydrogens(oeMol) if oeMol else None
+            if not oeMol:
+                return None
+            if "SMARTS" not in descriptorType.upper():
+                oeioU.addFingerPrints(oeMol, list(oesmpKwargs.get("fpTypeCuttoffD", {}).keys()))
+            self.__queryCache.set(cacheKey, oeMol)
+        else:
+            self.__queryCacheHits += 1
+        # suppressHydrogens() returns a copy of the prepared molecule
+        return OeIoUtils().suppressHydrogens(oeMol) if copyMol else oeMol
+
+    def getQueryCacheStatus(self):
+        """Return the prepared query molecule cache counters.
+
+        Returns:
+            (dict): {"hits": <int>, "misses": <int>, "maxSize": <int>}
+        """
+        return {"hits": self.__queryCacheHits, "misses": self.__queryCacheMisses, "maxSize": self.__queryCacheSize}
+
+    def getSearchPlanStats(self):
+        """Return the accumulated estimated and actual costs of planned substructure searches by strategy (see ChemCompSearchPlanner.getStats()).
+
+        Returns:
+            (dict): {<strategy>: {"count": <int>, "estSeconds": <float>, "seconds": <float>, "estCandidates": <float>, "candidates": <int>}, ...}
+        """
+        return self.__planner.getStats() if self.__planner else {}
+
+    def getPreparedMolCacheStatus(self):
+        """Return the families of search ready target molecules prepared on reload with their resident memory.
+
+        Returns:
+            (dict): {<family>: {"count": <int>, "seconds": <float>, "memoryBytes": <int>}, ...}
+        """
+        return self.__prepMolCache.getStatus() if self.__prepMolCache else {}
+
+    def getSearchPoolStatus(self):
+        """Return the start method, targets shared with the workers and the memory of each worker of the substructure search pool.
+
+        Returns:
+            (dict): see OeSubStructSearchUtils.getPoolStatus() (empty if the pool is not running)
+        """
+        return self.__oesubsU.getPoolStatus() if self.__oesubsU else {}
+
+    def getFormulaCacheStatus(self):
+        """Return the formula search result cache counters.
+
+        Returns:
+            (dict): {"hits": <int>, "misses": <int>, "maxSize": <int>}
+        """
+        return {"hits": self.__formulaCacheHits, "misses": self.__formulaCacheMisses, "maxSize": self.__formulaCacheSize}
+
     def status(self):
         unitS = "MB" if platform.system() == "Darwin" else "GB"
         rusageMax = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
@@ -2,6 +2,8 @@
 # File: OeCommonUtils.py
 # Date: 22-Oct-2020
 #
+# Updates:
+#  18-Oct-2026 jdw Add getMatchOptsFamily() grouping match options sharing atom and bond expressions.
 ##
 import logging
 
@@ -48,3 +50,23 @@ class OeCommonUtils(object):
         # bondexpr = oechem.OEExprOpts_BondOrder|oechem.OEExprOpts_EqNotAromatic
         #
         return atomexpr, bondexpr
+
+    @staticmethod
+    def getMatchOptsFamily(matchOpts):
+        """Return the family of match options sharing the atom and bond matching criteria of the input options.
+
+        Args:
+            matchOpts (string): qualitative description of atom and bond matching criteria
+
+        Returns:
+            str: family (strict|relaxed-stereo|relaxed|exact) or None for unanticipated options
+        """
+        if matchOpts in ["default", "strict", "graph-strict", "graph-default", "sub-struct-graph-strict"]:
+            return "strict"
+        elif matchOpts in ["relaxed-stereo", "graph-relaxed-stereo", "sub-struct-graph-relaxed-stereo"]:
+            return "relaxed-stereo"
+        elif matchOpts in ["relaxed", "graph-relaxed", "simple", "sub-struct-graph-relaxed"]:
+            return "relaxed"
+        elif matchOpts in ["exact"]:
+            return "exact"
+        return None
@@ -5,7 +5,10 @@
 # Version: 0.001
 #
 # Updates:
-#
+#  18-Oct-2026 jdw Add packed (NumPy) fingerprint index export (fpDbType="PACKED") from molecule FP_<type> data.
+#  18-Oct-2026 jdw Persist packed fingerprint indices (createOePackedFingerPrintDatabase()) and load them memory-mapped.
+#  18-Oct-2026 jdw Add addFingerPrints() storing query fingerprints with the molecule (FP_<type> data).
+#  18-Oct-2026 jdw Add getFingerPrintDbType() mapping fast fingerprint database requests for unsupported types to packed databases.
 ##
 """
 Utilities to manage OE specific IO and format conversion operations.
@@ -18,11 +21,14 @@ __license__ = "Apache 2.0"
 
 
 import logging
+import math
 import os
 import time
 
+import numpy as np
 from openeye import oechem
 from openeye import oegraphsim
+from rcsb.utils.chem.ChemCompFingerPrintIndex import ChemCompFingerPrintIndex, popCount
 from rcsb.utils.chem.OeMoleculeFactory import OeMoleculeFactory
 from rcsb.utils.io.MarshalUtil import MarshalUtil
 
@@ -377,12 +383,180 @@ class OeIoUtils(object):
         logger.info("Completed operation at %s (%.4f seconds)", time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - startTime)
         return ok
 
+    @staticmethod
+    def getFingerPrintDbType(fpType, fpDbType):
+        """Return the effective fingerprint database type - OE fast fingerprint databases support only TREE, PATH and CIRCULAR
+        types and other types are stored as packed fingerprint databases (loaded memory-mapped without decoding the molecules).
+
+        Args:
+            fpType (str): fingerprint type (TREE,PATH,MACCS,CIRCULAR,LINGO)
+            fpDbType (str): requested database type (STANDARD|FAST|PACKED)
+
+        Returns:
+            (str): database type (STANDARD|FAST|PACKED)
+        """
+        return "PACKED" if fpDbType == "FAST" and fpType not in ["TREE", "PATH", "CIRCULAR"] else fpDbType
+
     def loadOeFingerPrintDatabase(self, oeMolDbFilePath, oeFpDbFilePath, inMemory=False, fpType="TREE", fpDbType="FAST"):
         if fpDbType == "FAST":
             return self.__loadOeFastFingerPrintDatabase(oeFpDbFilePath, inMemory=inMemory, fpType=fpType)
+        elif fpDbType == "PACKED":
+            return self.__loadOePackedFingerPrintDatabase(oeMolDbFilePath, oeFpDbFilePath, inMemory=inMemory, fpType=fpType)
         else:
             return self.__loadOeFingerPrintDatabase(oeMolDbFilePath, fpType=fpType)
 
+    def getFingerPrint(self, oeMol, fpType="TREE"):
+        """Return the fingerprint of the input type stored with the input molecule (FP_<fpType> data) or generated on demand.
+
+        Args:
+            oeMol (obj): OE molecule
+            fpType (str, optional): finger print type (TREE, CIRCULAR, PATH, MACCS, LINGO). Defaults to "TREE".
+
+        Returns:
+            (obj): OEFingerPrint() or None
+        """
+        fpD = {
+            "TREE": oegraphsim.OEFPType_Tree,
+            "CIRCULAR": oegraphsim.OEFPType_Circular,
+            "PATH": oegraphsim.OEFPType_Path,
+            "MACCS": oegraphsim.OEFPType_MACCS166,
+            "LINGO": oegraphsim.OEFPType_Lingo,
+        }
+        tag = "FP_" + fpType
+        if oeMol.HasData(tag):
+            return oeMol.GetData(tag)
+        fp = oegraphsim.OEFingerPrint()
+        ok = oegraphsim.OEMakeFP(fp, oeMol, fpD[fpType] if fpType in fpD else oegraphsim.OEFPType_Tree)
+        return fp if ok and fp.IsValid() else None
+
+    def addFingerPrints(self, oeMol, fpTypeList):
+        """Generate and store the fingerprints of the input types with the input molecule (FP_<fpType> data)
+        for reuse by getFingerPrint().
+
+        Args:
+            oeMol (obj): OE molecule
+            fpTypeList (list): finger print types (TREE, CIRCULAR, PATH, MACCS, LINGO)
+
+        Returns:
+            bool: True for success or False otherwise
+        """
+        try:
+            ok = True
+            for fpType in fpTypeList:
+                tag = "FP_" + fpType
+                if oeMol.HasData(tag):
+                    continue
+                fp = self.getFingerPrint(oeMol, fpType=fpType)
+                if fp:
+                    oeMol.SetData(tag, fp)
+                ok = ok and fp is not None
+            return ok
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+        return False
+
+    def getPackedFingerPrint(self, oeMol, fpType="TREE", numWords=None):
+        """Return the fingerprint of the input molecule as a packed uint64 word vector (see ChemCompFingerPrintIndex()).
+
+        Args:
+            oeMol (obj): OE molecule
+            fpType (str, optional): finger print type (TREE, CIRCULAR, PATH, MACCS, LINGO). Defaults to "TREE".
+            numWords (int, optional): number of uint64 words in the packed vector. Defaults to the fingerprint size.
+
+        Returns:
+            (numpy.ndarray): uint64 word vector or None
+        """
+        fp = self.getFingerPrint(oeMol, fpType=fpType)
+        return self.__packFingerPrint(fp, numWords) if fp else None
+
+    def __packFingerPrint(self, fp, numWords=None):
+        # only the leading hexadecimal characters covering the fingerprint bits are significant
+        numBits = fp.GetSize()
+        numWords = numWords if numWords else int(math.ceil(numBits / 64.0))
+        return ChemCompFingerPrintIndex.packHexString(fp.ToHexString(), numWords, numChars=int(math.ceil(numBits / 4.0)))
+
+    def createOePackedFingerPrintDatabase(self, oeMolDbFilePath, oeFpDbFilePath, fpType="TREE"):
+        """Create and store the packed (NumPy) fingerprint index for the input molecular database.
+
+        Args:
+            oeMolDbFilePath (str): path to the input molecular database
+            oeFpDbFilePath (str): path to the output packed fingerprint index (.npy)
+            fpType (str):  finger print type
+
+        Returns:
+            bool: True for success or False otherwise
+        """
+        fpIdx = self.__buildOePackedFingerPrintDatabase(oeMolDbFilePath, fpType=fpType)
+        return fpIdx.write(oeFpDbFilePath) if fpIdx else False
+
+    def __loadOePackedFingerPrintDatabase(self, oeMolDbFilePath, oeFpDbFilePath, inMemory=False, fpType="TREE"):
+        """Load the stored packed fingerprint index (memory-mapped unless inMemory) - the stored index is
+        (re)created if it is missing or older than the molecular database.
+        """
+        if not oeFpDbFilePath:
+            return self.__buildOePackedFingerPrintDatabase(oeMolDbFilePath, fpType=fpType)
+        if not self.__mU.exists(oeFpDbFilePath) or os.path.getmtime(oeFpDbFilePath) < os.path.getmtime(oeMolDbFilePath):
+            logger.info("Creating packed %s fingerprint database %r", fpType, oeFpDbFilePath)
+            if not self.createOePackedFingerPrintDatabase(oeMolDbFilePath, oeFpDbFilePath, fpType=fpType):
+                return None
+        return ChemCompFingerPrintIndex.load(oeFpDbFilePath, fpType=fpType, mmapMode=None if inMemory else "r")
+
+    def __buildOePackedFingerPrintDatabase(self, oeMolDbFilePath, fpType="TREE", numCheck=20):
+        """Export the fingerprints (FP_<fpType> data) of the molecules in the input molecular database into
+        a packed (NumPy) fingerprint index.  Packed Tanimoto scores for a sample of fingerprint pairs are checked
+        against the OE scores.
+
+        Args:
+            oeMolDbFilePath (str): path to the input molecular database
+            fpType (str):  finger print type
+            numCheck (int): number of fingerprint pairs checked against the OE Tanimoto score
+
+        Returns:
+            (obj): ChemCompFingerPrintIndex() or None
+        """
+        fpIdx = None
+        try:
+            startTime = time.time()
+            oeMolDb = self.loadOeBinaryDatabaseAndIndex(oeMolDbFilePath)
+            numMols = oeMolDb.GetMaxMolIdx()
+            oeMol = oechem.OEGraphMol()
+            idxL = []
+            wordL = []
+            checkL = []
+            numWords = None
+            for idx in range(0, numMols):
+                if not oeMolDb.GetMolecule(oeMol, idx):
+                    logger.info("Missing molecule at index %r", idx)
+                    continue
+                fp = self.getFingerPrint(oeMol, fpType=fpType)
+                if not fp:
+                    logger.info("Missing %s fingerprint at index %r", fpType, idx)
+                    continue
+                numWords = numWords if numWords else int(math.ceil(fp.GetSize() / 64.0))
+                idxL.append(idx)
+                wordL.append(self.__packFingerPrint(fp, numWords))
+                if len(checkL) < numCheck + 1:
+                    checkL.append(oegraphsim.OEFingerPrint(fp))
+            if not idxL:
+                logger.error("No %s fingerprints exported from %r", fpType, oeMolDbFilePath)
+                return None
+            fpIdx = ChemCompFingerPrintIndex(np.vstack(wordL), idxL, fpType=fpType)
+            #
+            for ii in range(len(checkL) - 1):
+                oeScore = oegraphsim.OETanimoto(checkL[ii], checkL[ii + 1])
+                qA = self.__packFingerPrint(checkL[ii], numWords)
+                tA = self.__packFingerPrint(checkL[ii + 1], numWords)
+                interCount, unionCount = int(popCount(qA & tA)), int(popCount(qA | tA))
+                packedScore = interCount / unionCount if unionCount else 0.0
+                if abs(oeScore - packedScore) > 1.0e-4:
+                    logger.error("Packed %s fingerprint score mismatch (%.4f/%.4f) - packed index unavailable", fpType, packedScore, oeScore)
+                    return None
+            logger.info("Exported molecules %d %s packed fingerprints %d (%.4f seconds)", numMols, fpType, len(fpIdx), time.time() - startTime)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            fpIdx = None
+        return fpIdx
+
     def __loadOeFingerPrintDatabase(self, oeMolDbFilePath, fpType="TREE"):
         """Create conventional search fingerprint database from the input molecular database.
 
@@ -6,6 +6,9 @@
 #
 # Updates:
 # 2-Oct-2019  jdw adapted from OeBuildMol()
+# 18-Oct-2026 jdw add packed structural path keys (ss-keys) to search index entries
+# 18-Oct-2026 jdw add canonical (can-smiles) and tautomer canonical (tautomer-smiles) SMILES to search index entries
+# 18-Oct-2026 jdw bound the tautomer canonical SMILES search by atom and tautomer count limits only (no time limit)
 ##
 # pylint: disable=too-many-lines
 """
@@ -20,6 +23,7 @@ __license__ = "Apache 2.0"
 
 import hashlib
 import logging
+import zlib
 from collections import defaultdict, namedtuple
 
 from openeye import oechem
@@ -253,6 +257,16 @@ class OeMoleculeFactory(object):
         """Return the cannonical stereo SMILES string derived from the current OE molecule."""
         return oechem.OECreateIsoSmiString(self.__oeMol) if self.__oeMol else None
 
+    def getTautomerCanSMILES(self, maxTautomerAtoms=200, maxSearchTime=0):
+        """Return the cannonical SMILES string of the unique protomer (tautomer and charge normalized) form of the
+        current OE molecule.  Stereo is not encoded so the result identifies the compound ignoring stereo and tautomer state.
+
+        The tautomer search is bounded by the tautomeric atom, zone size and generated tautomer limits only
+        (maxSearchTime=0 sets no time limit) so the same molecule always yields the same key.
+        """
+        upMol = self.getUniqueProtomerMolExtended(maxTautomerAtoms=maxTautomerAtoms, maxSearchTime=maxSearchTime) if self.__oeMol else None
+        return oechem.OECreateCanSmiString(upMol) if upMol else None
+
     def getFormula(self):
         """Return the Hill order formulat  derived from the current OE molecule."""
         return oechem.OEMolecularFormula(self.__oeMol) if self.__oeMol else None
@@ -362,6 +376,53 @@ class OeMoleculeFactory(object):
         #
         return fD
 
+    def getSubStructKeys(self, nBits=512, maxPathLength=4):
+        """Get the packed structural key bitset for the current molecule.
+
+        Keys are hashed from the element sequences of all simple heavy atom paths of up to
+        maxPathLength bonds.  Bond orders, charges and aromaticity are not encoded so the
+        keys of any substructure match (for all supported matching options) are a subset of
+        the keys of the matched molecule.
+
+        Args:
+            nBits (int, optional): bitset length (multiple of 64). Defaults to 512.
+            maxPathLength (int, optional): maximum path length (bonds). Defaults to 4.
+
+        Returns:
+            str: bitset as a hexadecimal string (nBits // 4 characters) or None for failure
+        """
+        if not self.__oeMol:
+            return None
+        try:
+            atNoD = {}
+            for atom in self.__oeMol.GetAtoms():
+                if atom.GetAtomicNum() > 1:
+                    atNoD[atom.GetIdx()] = atom.GetAtomicNum()
+            nbrD = {idx: [] for idx in atNoD}
+            for bond in self.__oeMol.GetBonds():
+                iIdx = bond.GetBgnIdx()
+                jIdx = bond.GetEndIdx()
+                if iIdx in atNoD and jIdx in atNoD:
+                    nbrD[iIdx].append(jIdx)
+                    nbrD[jIdx].append(iIdx)
+            #
+            pathS = set()
+            for idx in atNoD:
+                stack = [(idx,)]
+                while stack:
+                    path = stack.pop()
+                    tT = tuple(atNoD[ii] for ii in path)
+                    pathS.add(min(tT, tT[::-1]))
+                    if len(path) <= maxPathLength:
+                        stack.extend(path + (nIdx,) for nIdx in nbrD[path[-1]] if nIdx not in path)
+            bits = 0
+            for tT in pathS:
+                bits |= 1 << (zlib.crc32("-".join(str(atNo) for atNo in tT).encode("utf-8")) % nBits)
+            return format(bits, "0%dx" % (nBits // 4))
+        except Exception as e:
+            logger.exception("Failing for %r with %s", self.__ccId, str(e))
+        return None
+
     def getOeMoleculeFeatures(self, filterHydrogens=False):
         """Get the essential features of the constructed OEMol for the input component."""
         formula = self.getFormula()
@@ -472,18 +533,22 @@ class OeMoleculeFactory(object):
                     fCharge = self.getFormalCharge()
                     eleD = self.getElementCounts(addExplicitHydrogens=True, useSymbol=True)
                     fCountD = self.getFeatureCounts()
+                    ssKeys = self.getSubStructKeys()
+                    canSmiles = self.getCanSMILES()
                     if smiles and inchiKey and smiles not in uniqSmilesD:
                         uniqSmilesD[smiles] = True
                         retD[name] = {
                             "name": name,
                             "build-type": buildType,
                             "smiles": smiles,
+                            "can-smiles": canSmiles,
                             "inchi-key": inchiKey,
                             "formula": formula,
                             "fcharge": fCharge,
                             "type-counts": eleD,
                             "program": oeVersionString,
                             "feature-counts": fCountD,
+                            "ss-keys": ssKeys,
                         }
             for buildType in ["oe-smiles", "acdlabs-smiles", "cactvs-smiles"]:
                 ok = self.build(molBuildType=buildType, setTitle=True, limitPerceptions=limitPerceptions)
@@ -496,22 +561,31 @@ class OeMoleculeFactory(object):
                     fCharge = self.getFormalCharge()
                     eleD = self.getElementCounts(addExplicitHydrogens=True, useSymbol=True)
                     fCountD = self.getFeatureCounts()
+                    ssKeys = self.getSubStructKeys()
+                    canSmiles = self.getCanSMILES()
                     if smiles and inchiKey and smiles not in uniqSmilesD:
                         uniqSmilesD[smiles] = True
                         retD[name] = {
                             "name": name,
                             "build-type": buildType,
                             "smiles": smiles,
+                            "can-smiles": canSmiles,
                             "inchi-key": inchiKey,
                             "formula": formula,
                             "fcharge": fCharge,
                             "type-counts": eleD,
                             "program": oeVersionString,
                             "feature-counts": fCountD,
+                            "ss-keys": ssKeys,
                         }
             # --- do charge and tautomer normalization on the model-xyz build
             ok = self.build(molBuildType="model-xyz", setTitle=True, limitPerceptions=limitPerceptions)
             if ok:
+                # tautomer canonical form (a time independent search - see getTautomerCanSMILES()) is recorded with the reference (model-xyz) entry
+                if self.__ccId in retD:
+                    tautomerSmiles = self.getTautomerCanSMILES()
+                    if tautomerSmiles:
+                        retD[self.__ccId]["tautomer-smiles"] = tautomerSmiles
                 logger.debug("%s begin protomer search", self.__ccId)
                 upMol = self.getUniqueProtomerMolExtended(maxTautomerAtoms=200, maxSearchTime=2.50)
                 if not upMol:
@@ -527,18 +601,22 @@ class OeMoleculeFactory(object):
                     fCharge = self.getFormalCharge()
                     eleD = self.getElementCounts(addExplicitHydrogens=True, useSymbol=True)
                     fCountD = self.getFeatureCounts()
+                    ssKeys = self.getSubStructKeys()
+                    canSmiles = self.getCanSMILES()
                     if smiles and inchiKey and smiles not in uniqSmilesD:
                         uniqSmilesD[smiles] = True
                         retD[name] = {
                             "name": name,
                             "build-type": "unique-protomer|model-xyz",
                             "smiles": smiles,
+                            "can-smiles": canSmiles,
                             "inchi-key": inchiKey,
                             "formula": formula,
                             "fcharge": fCharge,
                             "type-counts": eleD,
                             "program": oeVersionString,
                             "feature-counts": fCountD,
+                            "ss-keys": ssKeys,
                         }
                     logger.debug("%s begin tautomer search", self.__ccId)
                     tautomerList = self.getTautomerMolList()
@@ -556,18 +634,22 @@ class OeMoleculeFactory(object):
                             fCharge = self.getFormalCharge()
                             eleD = self.getElementCounts(addExplicitHydrogens=True, useSymbol=True)
                             fCountD = self.getFeatureCounts()
+                            ssKeys = self.getSubStructKeys()
+                            canSmiles = self.getCanSMILES()
                             if smiles and inchiKey and smiles not in uniqSmilesD:
                                 uniqSmilesD[smiles] = True
                                 retD[name] = {
                                     "name": name,
                                     "build-type": label,
                                     "smiles": smiles,
+                                    "can-smiles": canSmiles,
                                     "inchi-key": inchiKey,
                                     "formula": formula,
                                     "fcharge": fCharge,
                                     "type-counts": eleD,
                                     "program": oeVersionString,
                                     "feature-counts": fCountD,
+                                    "ss-keys": ssKeys,
                                 }
 
         except Exception as e:
@@ -5,6 +5,9 @@
 #
 # Updates:
 #  28-Oct-2019 jdw incorporate all of the public Bird cc definitions
+#  18-Oct-2026 jdw Cache fingerprint databases by fingerprint type and database type (fpDbType).
+#  18-Oct-2026 jdw Store fingerprint databases (fpDbType FAST|PACKED, default FAST) and load them memory-mapped (fpMemoryMap).
+#  18-Oct-2026 jdw Store fingerprint types unsupported by the OE fast fingerprint database (e.g. MACCS) as packed databases.
 ##
 """
 Utilities deliver OE molecule data for PDB chemical component definitions
@@ -36,6 +39,9 @@ class OeMoleculeProvider(object):
             cachePath (str, optional): path to the directory containing cache files (default: '.')
             molBuildType (str,optional): data source for building OE molecules (default: "model-xyz")
             oeFileNamePrefix (str, optional) file name prefix for all generated databases (default: "oe")
+            fpDbType (str, optional) stored fingerprint database type FAST (OE fast database for TREE, PATH and CIRCULAR types and
+                                     packed index for other types) or PACKED (default: "FAST")
+            fpMemoryMap (bool, optional) load stored fingerprint databases memory-mapped (default: True)
 
         """
         # Database file names with be prefixed with base prefix plus the molecular build type and perception options
@@ -51,6 +57,10 @@ class OeMoleculeProvider(object):
         self.__dirPath = os.path.join(cachePath, "oe_mol")
         #
         self.__fpDbD = {}
+        # stored fingerprint database type (FAST or PACKED, STANDARD is rebuilt on each load) and memory map option -
+        # FAST is stored as PACKED for fingerprint types unsupported by the OE fast fingerprint database
+        self.__fpDbType = kwargs.get("fpDbType", "FAST")
+        self.__fpMemoryMap = kwargs.get("fpMemoryMap", True)
         self.__ssDb = None
         self.__oeMolD = {}
         self.__oeMolDb = None
@@ -70,16 +80,24 @@ class OeMoleculeProvider(object):
             self.__ssDb = oeIo.loadOeSubSearchDatabase(fp, screenType, numProc=numProc)
         return self.__ssDb
 
-    def getFingerPrintDb(self, fpType, fpDbType="STANDARD", rebuild=False):
-        if fpType not in self.__fpDbD or rebuild:
+    def getFingerPrintDb(self, fpType, fpDbType=None, rebuild=False):
+        reqDbType = fpDbType if fpDbType else self.__fpDbType
+        fpDbType = self.__getFpDbType(fpType, fpDbType)
+        if (fpType, fpDbType) not in self.__fpDbD or rebuild:
             oeIo = OeIoUtils()
-            fastFpDbPath = os.path.join(self.__dirPath, self.__getFastFpDbFileName(fpType))
+            fpDbPath = os.path.join(self.__dirPath, self.__getPackedFpDbFileName(fpType) if fpDbType == "PACKED" else self.__getFastFpDbFileName(fpType))
             oeMolDbFilePath = os.path.join(self.__dirPath, self.__getOeMolDbFileName())
-            fpDb = oeIo.loadOeFingerPrintDatabase(oeMolDbFilePath, fastFpDbPath, inMemory=True, fpType=fpType, fpDbType=fpDbType)
+            if fpDbType == "FAST" and not self.__mU.exists(fpDbPath):
+                oeIo.createOeFingerPrintDatabase(oeMolDbFilePath, fpDbPath, fpType=fpType)
+            fpDb = oeIo.loadOeFingerPrintDatabase(oeMolDbFilePath, fpDbPath, inMemory=not self.__fpMemoryMap, fpType=fpType, fpDbType=fpDbType)
+            if not fpDb and fpDbType != reqDbType:
+                # fingerprint types without a packed representation (e.g. LINGO) use the standard database
+                logger.warning("No packed %s fingerprint database - using the standard fingerprint database", fpType)
+                fpDb = oeIo.loadOeFingerPrintDatabase(oeMolDbFilePath, None, fpType=fpType, fpDbType="STANDARD")
             if fpDb:
-                self.__fpDbD[fpType] = fpDb
+                self.__fpDbD[(fpType, fpDbType)] = fpDb
         #
-        return self.__fpDbD[fpType]
+        return self.__fpDbD.get((fpType, fpDbType), None)
 
     def __getOeMolDbTitleIndex(self):
         oeMolDbTitleD = {}
@@ -122,6 +140,13 @@ class OeMoleculeProvider(object):
     def __getFastFpDbFileName(self, fpType):
         return "%s-fast-fp-database-%s.fpbin" % (self.__oeFileNamePrefix, fpType)
 
+    def __getPackedFpDbFileName(self, fpType):
+        return "%s-packed-fp-database-%s.npy" % (self.__oeFileNamePrefix, fpType)
+
+    def __getFpDbType(self, fpType, fpDbType=None):
+        """Return the effective fingerprint database type (see OeIoUtils.getFingerPrintDbType())."""
+        return OeIoUtils.getFingerPrintDbType(fpType, fpDbType if fpDbType else self.__fpDbType)
+
     def __getSubSearchFileName(self, screenType):
         return "%s-ss-database-%s.oeb" % (self.__oeFileNamePrefix, screenType)
 
@@ -161,7 +186,7 @@ class OeMoleculeProvider(object):
         quietFlag = kwargs.get("quietFlag", True)
         suppressHydrogens = kwargs.get("suppressHydrogens", False)
         logSizes = kwargs.get("logSizes", False)
-        fpDbType = "STANDARD"
+        fpDbType = kwargs.get("fpDbType", "FAST")
         #
         ccCount = 0
         oeCount = 0
@@ -195,15 +220,20 @@ class OeMoleculeProvider(object):
             logger.info("Created and stored %d indexed OeMols in OE database format (%.4f seconds)", molCount, endTime - startTime)
 
         # --------
-        if fpDbType == "FAST":
-            for fpType in fpTypeList:
-                startTime = time.time()
-                #  Fast FP search database file names
-                fpPath = os.path.join(self.__dirPath, self.__getFastFpDbFileName(fpType))
-                if not useCache or (useCache and not self.__mU.exists(fpPath)):
+        for fpType in fpTypeList:
+            startTime = time.time()
+            #  Stored (fast or packed) FP search database file names
+            tDbType = self.__getFpDbType(fpType, fpDbType)
+            if tDbType == "STANDARD":
+                continue
+            fpPath = os.path.join(self.__dirPath, self.__getFastFpDbFileName(fpType) if tDbType == "FAST" else self.__getPackedFpDbFileName(fpType))
+            if not useCache or (useCache and not self.__mU.exists(fpPath)):
+                if tDbType == "FAST":
                     ok = oeIo.createOeFingerPrintDatabase(oeMolDbFilePath, fpPath, fpType=fpType)
-                    endTime = time.time()
-                    logger.info("Created and stored %s fingerprint database (%.4f seconds)", fpType, endTime - startTime)
+                else:
+                    ok = oeIo.createOePackedFingerPrintDatabase(oeMolDbFilePath, fpPath, fpType=fpType)
+                endTime = time.time()
+                logger.info("Created and stored %s %s fingerprint database (status %r) (%.4f seconds)", fpType, tDbType, ok, endTime - startTime)
         # --------
         if molBuildType in ["oe-iso-smiles"]:
             for screenType in screenTypeList:
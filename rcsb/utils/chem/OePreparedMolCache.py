@@ -0,0 +1,228 @@
+##
+# File:    OePreparedMolCache.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+#
+# Updates:
+#  18-Oct-2026 jdw Report the resident memory of each prepared family, prepare with a stereo template and skip query molecule (OEQMol) searches.
+#  18-Oct-2026 jdw Add the decoded (not prepared) target family shared with search pool workers and getProcessMemory().
+##
+"""
+In-memory cache of search ready (decoded and substructure search prepared) molecule database targets.
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import logging
+import os
+import platform
+import resource
+import time
+
+from openeye import oechem
+
+from rcsb.utils.chem.OeCommonUtils import OeCommonUtils
+
+logger = logging.getLogger(__name__)
+
+# template query of the family preparation (aromatic ring, tetrahedral and double bond stereo centers)
+PREP_TEMPLATE_SMILES = "C/C=C/c1ccccc1[C@@H](N)O"
+
+
+def getResidentMemory():
+    """Return the resident memory (bytes) of the current process (the peak resident memory where not available)."""
+    try:
+        with open("/proc/self/statm", "r", encoding="utf-8") as ifh:
+            return int(ifh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        pass
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if platform.system() == "Darwin" else rss * 1024
+
+
+def getProcessMemory():
+    """Return the resident, proportional (shared pages divided among the sharing processes) and private memory
+    (bytes) of the current process.  Only the resident memory is reported where /proc/self/smaps_rollup is not available.
+
+    Returns:
+        (dict): {"rssBytes": <int>, "pssBytes": <int or None>, "privateBytes": <int or None>}
+    """
+    rD = {"rssBytes": getResidentMemory(), "pssBytes": None, "privateBytes": None}
+    try:
+        kbD = {}
+        with open("/proc/self/smaps_rollup", "r", encoding="utf-8") as ifh:
+            for line in ifh:
+                fL = line.split()
+                if len(fL) == 3 and fL[2] == "kB":
+                    kbD[fL[0][:-1]] = int(fL[1])
+        rD["pssBytes"] = kbD["Pss"] * 1024
+        rD["privateBytes"] = (kbD.get("Private_Clean", 0) + kbD.get("Private_Dirty", 0)) * 1024
+    except Exception:
+        pass
+    return rD
+
+
+class OePreparedMolCache(object):
+    """Molecule database targets decoded and prepared for substructure search (OEPrepareSearch()) once for each
+    match option family (strict|relaxed-stereo|relaxed|exact).
+
+    Target preparation (OEPrepareSearch()) perceives the target properties tested by the atom and bond matching
+    criteria of the search, which are shared by all options of a family.  Targets are prepared with a template query
+    carrying the family criteria and bearing aromatic, tetrahedral and double bond stereo centers, so that properties
+    perceived only for queries with such centers are prepared as well, and graph matches of any query molecule built
+    with the family criteria reduce to the SingleMatch() test.  Query molecules (OEQMol, e.g. from SMARTS) carry their
+    own expressions and are matched to freshly prepared targets (see hasMatchOpts()).
+
+    The decoded family (prepareDecoded()) holds targets decoded but not prepared.  Search pool workers started by fork
+    share it (copy-on-write) in place of decoding the molecule database records for each query, and prepare a private
+    copy of each candidate for the search.
+
+    Each family holds a complete in-memory copy of the molecule database, so families should be prepared only for
+    the match options in use.  Worker processes share the prepared targets only when started by fork.
+    """
+
+    DECODED_FAMILY = "decoded"
+
+    def __init__(self, oeMolDb, matchOptsList=None):
+        """Build the cache of search ready targets.
+
+        Args:
+            oeMolDb (obj): OE molecule database (OEMolDatabase)
+            matchOptsList (list, optional): match options selecting the prepared families (e.g. ["graph-strict", "graph-relaxed"]). Defaults to None.
+        """
+        self.__oeMolDb = oeMolDb
+        # {<family>: [<prepared OEGraphMol or None>, ...] (by molecule database index)}
+        self.__molD = {}
+        self.__statusD = {}
+        for matchOpts in matchOptsList if matchOptsList else []:
+            self.prepare(matchOpts)
+
+    def prepare(self, matchOpts):
+        """Decode and prepare all molecule database targets for the family of the input match options.
+
+        Args:
+            matchOpts (str): match options (e.g. graph-relaxed)
+
+        Returns:
+            bool: True for success or False otherwise
+        """
+        try:
+            family = OeCommonUtils.getMatchOptsFamily(matchOpts)
+            if not family:
+                logger.error("Unanticipated match options %r", matchOpts)
+                return False
+            if family in self.__molD:
+                return True
+            atomexpr, bondexpr = OeCommonUtils.getAtomBondExprOpts(matchOpts)
+            templateMol = oechem.OEGraphMol()
+            oechem.OESmilesToMol(templateMol, PREP_TEMPLATE_SMILES)
+            return self.__build(family, oechem.OESubSearch(templateMol, atomexpr, bondexpr))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+        return False
+
+    def prepareDecoded(self):
+        """Decode (without search preparation) all molecule database targets in the decoded family.
+
+        Returns:
+            bool: True for success or False otherwise
+        """
+        try:
+            if self.DECODED_FAMILY in self.__molD:
+                return True
+            return self.__build(self.DECODED_FAMILY, None)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+        return False
+
+    def __build(self, family, ss):
+        """Decode (and prepare with the input substructure search if provided) all molecule database targets of the input family."""
+        try:
+            startTime = time.time()
+            startMemory = getResidentMemory()
+            molL = []
+            for idx in range(self.__oeMolDb.GetMaxMolIdx()):
+                mol = oechem.OEGraphMol()
+                if not self.__oeMolDb.GetMolecule(mol, idx):
+                    logger.error("Unable to read molecule %r at index %r", self.__oeMolDb.GetTitle(idx), idx)
+                    molL.append(None)
+                    continue
+                if ss is not None:
+                    oechem.OEPrepareSearch(mol, ss)
+                molL.append(mol)
+            self.__molD[family] = molL
+            self.__statusD[family] = {
+                "count": sum(1 for mol in molL if mol is not None),
+                "seconds": time.time() - startTime,
+                "memoryBytes": max(0, getResidentMemory() - startMemory),
+            }
+            logger.info(
+                "Prepared %d %s search targets (%.2f MB) (%.4f seconds)",
+                self.__statusD[family]["count"],
+                family,
+                self.__statusD[family]["memoryBytes"] / 10**6,
+                self.__statusD[family]["seconds"],
+            )
+            return True
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+        return False
+
+    def hasMatchOpts(self, matchOpts, oeQueryMol=None):
+        """Return True if targets are prepared for the family of the input match options (and the input query).
+
+        Args:
+            matchOpts (str): match options (e.g. graph-relaxed)
+            oeQueryMol (obj, optional): query molecule (prepared targets are not used for OEQMol queries). Defaults to None.
+
+        Returns:
+            bool: True if prepared targets apply or False otherwise
+        """
+        if oeQueryMol is not None and isinstance(oeQueryMol, oechem.OEQMolBase):
+            return False
+        return OeCommonUtils.getMatchOptsFamily(matchOpts) in self.__molD
+
+    def getMol(self, idx, matchOpts):
+        """Return the search ready target at the input molecule database index for the input match options.
+
+        The returned molecule is shared - callers should not modify it.
+
+        Args:
+            idx (int): molecule database index
+            matchOpts (str): match options (e.g. graph-relaxed)
+
+        Returns:
+            (obj): prepared OEGraphMol or None if the family is not prepared or the target is missing
+        """
+        molL = self.__molD.get(OeCommonUtils.getMatchOptsFamily(matchOpts), None)
+        return molL[idx] if molL is not None and 0 <= idx < len(molL) else None
+
+    def getDecodedMol(self, idx):
+        """Return the decoded (not search prepared) target at the input molecule database index.
+
+        The returned molecule is shared - callers should search a copy of it.
+
+        Args:
+            idx (int): molecule database index
+
+        Returns:
+            (obj): decoded OEGraphMol or None if the decoded family is not built or the target is missing
+        """
+        molL = self.__molD.get(self.DECODED_FAMILY, None)
+        return molL[idx] if molL is not None and 0 <= idx < len(molL) else None
+
+    def hasDecoded(self):
+        """Return True if the decoded target family is built."""
+        return self.DECODED_FAMILY in self.__molD
+
+    def getStatus(self):
+        """Return the prepared families with target counts, preparation times and resident memory (process resident
+        memory growth while preparing the family).
+
+        Returns:
+            (dict): {<family>: {"count": <int>, "seconds": <float>, "memoryBytes": <int>}, ...}
+        """
+        return dict(self.__statusD)
@@ -4,7 +4,12 @@
 # Date:    4-Mar-2020
 #
 # Updates:
-#
+#  18-Oct-2026 jdw Add packed fingerprint index (fpDbType="PACKED") and cache fingerprint databases by type and database type.
+#  18-Oct-2026 jdw Store fingerprint databases (fpDbType FAST|PACKED, default FAST) and load them memory-mapped (fpMemoryMap).
+#  18-Oct-2026 jdw Add precomputed nearest neighbor tables (buildNeighborTable()/getNeighborTable()).
+#  18-Oct-2026 jdw Add getOeMolDatabaseFilePath() for search worker processes opening their own database handles.
+#  18-Oct-2026 jdw Store fingerprint types unsupported by the OE fast fingerprint database (e.g. MACCS) as packed databases.
+#  18-Oct-2026 jdw Share the fingerprint database type mapping with OeMoleculeProvider (OeIoUtils.getFingerPrintDbType()).
 ##
 """
 Utilities deliver OE molecule data for searchable chemical component data.
@@ -18,6 +23,7 @@ import logging
 import os
 import time
 
+from rcsb.utils.chem.ChemCompNeighborTable import ChemCompNeighborTable
 from rcsb.utils.chem.ChemCompSearchIndexProvider import ChemCompSearchIndexProvider
 from rcsb.utils.chem.OeIoUtils import OeIoUtils
 from rcsb.utils.io.MarshalUtil import MarshalUtil
@@ -40,6 +46,10 @@ class OeSearchMoleculeProvider(object):
             cachePath (str, optional): path to the directory containing cache files (default: '.')
             ccFileNamePrefix (str, optional) file name prefix for chemical component search index (default: "cc")
             oeFileNamePrefix (str, optional) file name prefix for all generated databases (default: "oe")
+            fpDbType (str, optional) stored fingerprint database type FAST (OE fast fingerprint database for TREE, PATH
+                                     and CIRCULAR types and packed index for other types) or PACKED (NumPy packed
+                                     fingerprint index) (default: "FAST")
+            fpMemoryMap (bool, optional) load stored fingerprint databases memory-mapped (default: True)
 
         """
         # Database file names with be prefixed with base prefix plus the molecular build type and perception options
@@ -55,6 +65,11 @@ class OeSearchMoleculeProvider(object):
         self.__dirPath = os.path.join(cachePath, "oe_mol")
         #
         self.__fpDbD = {}
+        self.__nbrTableD = {}
+        # stored fingerprint database type (FAST or PACKED, STANDARD is rebuilt on each load) and memory map option -
+        # FAST is stored as PACKED for fingerprint types unsupported by the OE fast fingerprint database
+        self.__fpDbType = kwargs.get("fpDbType", "FAST")
+        self.__fpMemoryMap = kwargs.get("fpMemoryMap", True)
         self.__ssDb = None
         self.__oeMolD = {}
         self.__oeMolDb = None
@@ -74,16 +89,78 @@ class OeSearchMoleculeProvider(object):
             self.__ssDb = oeIo.loadOeSubSearchDatabase(fp, screenType, numProc=numProc)
         return self.__ssDb
 
-    def getFingerPrintDb(self, fpType, fpDbType="STANDARD", rebuild=False):
-        if fpType not in self.__fpDbD or rebuild:
+    def getFingerPrintDb(self, fpType, fpDbType=None, rebuild=False):
+        """Return the fingerprint database for the input fingerprint type.
+
+        Args:
+            fpType (str): fingerprint type (TREE,PATH,MACCS,CIRCULAR,LINGO)
+            fpDbType (str, optional): database type STANDARD (OEFPDatabase), FAST (OEFastFPDatabase) or
+                                      PACKED (NumPy ChemCompFingerPrintIndex). Defaults to the provider fpDbType.
+            rebuild (bool, optional): reload the database. Defaults to False.
+
+        Returns:
+            (obj): fingerprint database or None
+        """
+        reqDbType = fpDbType if fpDbType else self.__fpDbType
+        fpDbType = self.__getFpDbType(fpType, fpDbType)
+        if (fpType, fpDbType) not in self.__fpDbD or rebuild:
             oeIo = OeIoUtils()
-            fastFpDbPath = os.path.join(self.__dirPath, self.__getFastFpDbFileName(fpType))
+            fpDbPath = os.path.join(self.__dirPath, self.__getPackedFpDbFileName(fpType) if fpDbType == "PACKED" else self.__getFastFpDbFileName(fpType))
             oeMolDbFilePath = os.path.join(self.__dirPath, self.__getOeMolDbFileName())
-            fpDb = oeIo.loadOeFingerPrintDatabase(oeMolDbFilePath, fastFpDbPath, inMemory=True, fpType=fpType, fpDbType=fpDbType)
+            if fpDbType == "FAST" and not self.__mU.exists(fpDbPath):
+                oeIo.createOeFingerPrintDatabase(oeMolDbFilePath, fpDbPath, fpType=fpType)
+            fpDb = oeIo.loadOeFingerPrintDatabase(oeMolDbFilePath, fpDbPath, inMemory=not self.__fpMemoryMap, fpType=fpType, fpDbType=fpDbType)
+            if not fpDb and fpDbType != reqDbType:
+                # fingerprint types without a packed representation (e.g. LINGO) use the standard database
+                logger.warning("No packed %s fingerprint database - using the standard fingerprint database", fpType)
+                fpDb = oeIo.loadOeFingerPrintDatabase(oeMolDbFilePath, None, fpType=fpType, fpDbType="STANDARD")
             if fpDb:
-                self.__fpDbD[fpType] = fpDb
+                self.__fpDbD[(fpType, fpDbType)] = fpDb
         #
-        return self.__fpDbD[fpType]
+        return self.__fpDbD.get((fpType, fpDbType), None)
+
+    def buildNeighborTable(self, fpType, maxNeighbors=50, minScore=None, numProc=2, resume=True):
+        """Build and store the nearest neighbor table (top-N similarity neighbors of each search database molecule)
+        for the input fingerprint type from the packed fingerprint database.  Interrupted builds are resumed.
+
+        Args:
+            fpType (str): fingerprint type (TREE,PATH,MACCS,CIRCULAR,LINGO)
+            maxNeighbors (int, optional): number of neighbors stored for each molecule. Defaults to 50.
+            minScore (float, optional): minimum similarity score of stored neighbors. Defaults to None.
+            numProc (int, optional): number of worker threads. Defaults to 2.
+            resume (bool, optional): resume a previously interrupted build. Defaults to True.
+
+        Returns:
+            bool: True for success or False otherwise
+        """
+        fpIdx = self.getFingerPrintDb(fpType, fpDbType="PACKED")
+        if not fpIdx:
+            logger.error("No packed fingerprint database for %r", fpType)
+            return False
+        nbrTablePath = os.path.join(self.__dirPath, self.__getNeighborTableFileName(fpType))
+        ok = ChemCompNeighborTable.build(fpIdx, nbrTablePath, maxNeighbors=maxNeighbors, minScore=minScore, numProc=numProc, resume=resume)
+        self.__nbrTableD.pop(fpType, None)
+        return ok
+
+    def getNeighborTable(self, fpType):
+        """Return the stored nearest neighbor table for the input fingerprint type.
+
+        Args:
+            fpType (str): fingerprint type (TREE,PATH,MACCS,CIRCULAR,LINGO)
+
+        Returns:
+            (obj): ChemCompNeighborTable() or None if the table is missing or older than the molecule database
+        """
+        if fpType not in self.__nbrTableD:
+            fp = os.path.join(self.__dirPath, self.__getNeighborTableFileName(fpType))
+            oeMolDbFilePath = os.path.join(self.__dirPath, self.__getOeMolDbFileName())
+            if not self.__mU.exists(fp):
+                return None
+            if self.__mU.exists(oeMolDbFilePath) and os.path.getmtime(fp) < os.path.getmtime(oeMolDbFilePath):
+                logger.warning("Neighbor table %r is older than the molecule database (skipping)", fp)
+                return None
+            self.__nbrTableD[fpType] = ChemCompNeighborTable.load(fp, mmapMode="r" if self.__fpMemoryMap else None)
+        return self.__nbrTableD[fpType]
 
     def __getOeMolDbTitleIndex(self):
         oeMolDbTitleD = {}
@@ -102,6 +179,10 @@ class OeSearchMoleculeProvider(object):
             self.__oeMolDbTitleD = self.__getOeMolDbTitleIndex()
         return self.__oeMolDb, self.__oeMolDbTitleD
 
+    def getOeMolDatabaseFilePath(self):
+        """Return the path of the OE molecule database file (e.g. for worker processes opening their own database)."""
+        return os.path.join(self.__dirPath, self.__getOeMolDbFileName())
+
     def getOeMolD(self):
         try:
             if not self.__oeMolD:
@@ -129,6 +210,16 @@ class OeSearchMoleculeProvider(object):
     def __getFastFpDbFileName(self, fpType):
         return "%s-si-fast-fp-database-%s.fpbin" % (self.__oeFileNamePrefix, fpType)
 
+    def __getPackedFpDbFileName(self, fpType):
+        return "%s-si-packed-fp-database-%s.npy" % (self.__oeFileNamePrefix, fpType)
+
+    def __getNeighborTableFileName(self, fpType):
+        return "%s-si-neighbor-table-%s.npy" % (self.__oeFileNamePrefix, fpType)
+
+    def __getFpDbType(self, fpType, fpDbType=None):
+        """Return the effective fingerprint database type (see OeIoUtils.getFingerPrintDbType())."""
+        return OeIoUtils.getFingerPrintDbType(fpType, fpDbType if fpDbType else self.__fpDbType)
+
     def __getSubSearchFileName(self, screenType):
         return "%s-si-ss-database-%s.oeb" % (self.__oeFileNamePrefix, screenType)
 
@@ -173,7 +264,7 @@ class OeSearchMoleculeProvider(object):
             suppressHydrogens = kwargs.get("suppressHydrogens", False)
             quietFlag = kwargs.get("quietFlag", True)
             logSizes = kwargs.get("logSizes", False)
-            fpDbType = "STANDARD"
+            fpDbType = kwargs.get("fpDbType", "FAST")
             buildScreenedDb = True
             #
             oeCount = 0
@@ -207,15 +298,20 @@ class OeSearchMoleculeProvider(object):
                 logger.info("Created and stored %d indexed oeMols in OE database format (%.4f seconds)", molCount, endTime - startTime)
 
             # --------
-            if fpDbType == "FAST":
-                for fpType in fpTypeList:
-                    startTime = time.time()
-                    #  Fast FP search database file names
-                    fpPath = os.path.join(self.__dirPath, self.__getFastFpDbFileName(fpType))
-                    if not useCache or (useCache and not self.__mU.exists(fpPath)):
+            for fpType in fpTypeList:
+                startTime = time.time()
+                #  Stored (fast or packed) FP search database file names
+                tDbType = self.__getFpDbType(fpType, fpDbType)
+                if tDbType == "STANDARD":
+                    continue
+                fpPath = os.path.join(self.__dirPath, self.__getFastFpDbFileName(fpType) if tDbType == "FAST" else self.__getPackedFpDbFileName(fpType))
+                if not useCache or (useCache and not self.__mU.exists(fpPath)):
+                    if tDbType == "FAST":
                         ok = oeIo.createOeFingerPrintDatabase(oeMolDbFilePath, fpPath, fpType=fpType)
-                        endTime = time.time()
-                        logger.info("Created and stored %s fingerprint database (%.4f seconds)", fpType, endTime - startTime)
+                    else:
+                        ok = oeIo.createOePackedFingerPrintDatabase(oeMolDbFilePath, fpPath, fpType=fpType)
+                    endTime = time.time()
+                    logger.info("Created and stored %s %s fingerprint database (status %r) (%.4f seconds)", fpType, tDbType, ok, endTime - startTime)
             # --------
             if buildScreenedDb and screenTypeList:
                 for screenType in screenTypeList:
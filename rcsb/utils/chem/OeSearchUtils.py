@@ -5,7 +5,20 @@
 # Version: 0.001
 #
 # Updates:
-#
+#  18-Oct-2026 jdw Add optional restriction of fingerprint searches to a list of search identifiers (ccIdList).
+#  18-Oct-2026 jdw Add ccIdList option to searchSubStructure().
+#  18-Oct-2026 jdw Add selectable fingerprint scoring engine (fpEngine="oe"|"packed") using the packed NumPy fingerprint index.
+#  18-Oct-2026 jdw Add batch fingerprint scoring getFingerPrintScoresBatch() streaming results per query.
+#  18-Oct-2026 jdw Score fingerprint types concurrently in searchSubStructureAndFingerPrint() overlapping graph matching.
+#  18-Oct-2026 jdw Add getNeighborScores() answering search database molecule queries from precomputed neighbor tables.
+#  18-Oct-2026 jdw Add two-stage folded fingerprint screening (fpFoldBits) with full length rescoring and getFoldedScreenRecall().
+#  18-Oct-2026 jdw Score OE fingerprint databases with the query fingerprint (reusing fingerprints stored with prepared query molecules).
+#  18-Oct-2026 jdw Add paged search generators iterFingerPrints() and iterSubStructure() yielding LazyMatchResults (molecules read on first access).
+#  18-Oct-2026 jdw Raise fingerprint scoring failures from iterFingerPrints() so searchFingerPrints() returns a failure status.
+#  18-Oct-2026 jdw Add getMultiFingerPrintScoresBatch() scoring each query block for several fingerprint types.
+#  18-Oct-2026 jdw Match search ready targets from the prepared molecule cache (prepMolCache) skipping per-query decoding and preparation.
+#  18-Oct-2026 jdw Score fingerprint types stored as packed indices with a standard database for the oe engine (fpEngine="oe").
+#  18-Oct-2026 jdw Score only packed engine finger print types in worker threads by default (concurrentFp) with query finger prints and titles resolved in the calling thread.
 ##
 """
 Utilities to manage OE specific similarity search (match) operations.
@@ -17,28 +30,189 @@ __email__ = "john.westbrook@rcsb.org"
 __license__ = "Apache 2.0"
 
 
+import heapq
+import itertools
 import logging
 import time
 from collections import namedtuple
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+import numpy as np
 from openeye import oechem
 from openeye import oegraphsim
 
+from rcsb.utils.chem.ChemCompFingerPrintIndex import ChemCompFingerPrintIndex, popCount
 from rcsb.utils.chem.OeCommonUtils import OeCommonUtils
+from rcsb.utils.chem.OeIoUtils import OeIoUtils
 
 logger = logging.getLogger(__name__)
 
 MatchResults = namedtuple("MatchResults", "ccId oeMol searchType matchOpts screenType fpType fpScore oeIdx formula", defaults=(None,) * 9)
 
 
+class LazyMatchResults(MatchResults):
+    """Match results (MatchResults) reading the matched molecule (oeMol) from the molecule database when
+    the oeMol attribute is first accessed.  Results yielded by the paged search generators also carry
+    the cursor used to request the following page.
+    """
+
+    def setSource(self, oeMolDb, cursor=None):
+        """Set the molecule database holding the molecule at index oeIdx and the paging cursor of this result.
+
+        Args:
+            oeMolDb (obj): OE molecule database (OEMolDatabase)
+            cursor (tuple, optional): (position, oeIdx) of this result in the search result sequence. Defaults to None.
+
+        Returns:
+            (obj): this result
+        """
+        self.__dict__["_oeMolDb"] = oeMolDb
+        self.__dict__["_cursor"] = cursor
+        return self
+
+    def getCursor(self):
+        """Return the cursor (position, oeIdx) resuming the search after this result."""
+        return self.__dict__.get("_cursor", None)
+
+    @property
+    def oeMol(self):
+        oeMol = super().oeMol
+        if oeMol is None:
+            oeMol = self.__dict__.get("_oeMol", None)
+        oeMolDb = self.__dict__.get("_oeMolDb", None)
+        if oeMol is None and oeMolDb is not None and self.oeIdx is not None:
+            oeMol = oechem.OEGraphMol()
+            if not oeMolDb.GetMolecule(oeMol, self.oeIdx):
+                logger.error("Unable to read molecule %r at index %r", self.ccId, self.oeIdx)
+                return None
+            self.__dict__["_oeMol"] = oeMol
+        return oeMol
+
+    def _replace(self, **kwargs):
+        mr = super()._replace(**kwargs).setSource(self.__dict__.get("_oeMolDb", None), self.__dict__.get("_cursor", None))
+        if "oeMol" not in kwargs and "oeIdx" not in kwargs and "_oeMol" in self.__dict__:
+            mr.__dict__["_oeMol"] = self.__dict__["_oeMol"]
+        return mr
+
+
+def getCursorStart(keyList, offset=0, cursor=None):
+    """Return the start position of a page in an ordered result sequence.
+
+    Args:
+        keyList (list): ordered keys of the result sequence (e.g. OE molecule database indices)
+        offset (int, optional): number of leading results skipped. Defaults to 0.
+        cursor (tuple, optional): (position, key) of the last result of the previous page (takes precedence over offset). Defaults to None.
+
+    Returns:
+        (int): start position or None if the cursor key is not in the result sequence
+    """
+    if not cursor:
+        return max(0, offset if offset else 0)
+    pos, key = cursor
+    if 0 <= pos < len(keyList) and keyList[pos] == key:
+        return pos + 1
+    try:
+        return keyList.index(key) + 1
+    except ValueError:
+        pass
+    return None
+
+
+def iterGraphMatches(oeMolDb, oeQueryMol, candidateList, matchOpts="graph-relaxed", offset=0, cursor=None, prepMolCache=None):
+    """Yield the graph matches of the query molecule over an ordered list of candidate molecule database indices.
+
+    Candidates are read and matched as results are consumed, so a page of matches costs only the candidates
+    tested up to the last match of the page.  A cursor resumes matching with the candidate following the
+    last match of the previous page.
+
+    Args:
+        oeMolDb (obj): OE molecule database (OEMolDatabase)
+        oeQueryMol (object): query molecule OeGraphMol or OeQmol
+        candidateList (list): ordered candidate molecule database indices
+        matchOpts (str, optional): graph match criteria type (graph-strict|graph-relaxed|graph-relaxed-stereo). Defaults to "graph-relaxed".
+        offset (int, optional): number of leading matches skipped. Defaults to 0.
+        cursor (tuple, optional): (candidate position, index) of the last match of the previous page. Defaults to None.
+        prepMolCache (obj, optional): search ready targets (OePreparedMolCache) used in place of decoding and preparing candidates. Defaults to None.
+
+    Yields:
+        (tuple): (candidate position, molecule database index, fraction of the candidate atoms matched by the query)
+    """
+    startPos = getCursorStart(candidateList, cursor=cursor)
+    if startPos is None:
+        logger.warning("Search cursor %r is not in the candidate list", cursor)
+        return
+    numSkip = 0 if cursor else max(0, offset if offset else 0)
+    atomexpr, bondexpr = OeCommonUtils.getAtomBondExprOpts(matchOpts)
+    ss = oechem.OESubSearch(oeQueryMol, atomexpr, bondexpr)
+    if not ss.IsValid():
+        logger.error("Unable to initialize substructure search!")
+        return
+    usePrep = prepMolCache is not None and prepMolCache.hasMatchOpts(matchOpts, oeQueryMol)
+    for pos in range(startPos, len(candidateList)):
+        idx = candidateList[pos]
+        mol = prepMolCache.getMol(idx, matchOpts) if usePrep else None
+        if mol is None:
+            mol = oechem.OEGraphMol()
+            if not oeMolDb.GetMolecule(mol, idx):
+                logger.error("Unable to read molecule %r at index %r", oeMolDb.GetTitle(idx), idx)
+                continue
+            oechem.OEPrepareSearch(mol, ss)
+        if not ss.SingleMatch(mol):
+            continue
+        if numSkip:
+            numSkip -= 1
+            continue
+        yield pos, idx, float(oeQueryMol.NumAtoms()) / float(max(1, mol.NumAtoms()))
+
+
 class OeSearchUtils(object):
     """Utilities to manage OE specific similarity search (match) operations."""
 
-    def __init__(self, oemP, fpTypeList=None, screenType=None, numProc=2, verbose=False):
+    def __init__(self, oemP, fpTypeList=None, screenType=None, numProc=2, verbose=False, fpEngine="oe", fpFoldBits=None, fpFoldSlack=0.1, fpFoldFactor=8, prepMolCache=None):
+        """Utilities to manage OE specific similarity search (match) operations.
+
+        Args:
+            oemP (obj): molecule provider (e.g. OeSearchMoleculeProvider())
+            fpTypeList (list, optional): fingerprint types (TREE,PATH,MACCS,CIRCULAR,LINGO). Defaults to None.
+            screenType (str, optional): screened substructure search database type. Defaults to None.
+            numProc (int, optional): number of processors used by the screened substructure search. Defaults to 2.
+            verbose (bool, optional): verbose logging. Defaults to False.
+            fpEngine (str, optional): fingerprint scoring engine - oe (OE fast or standard fingerprint database) or packed
+                                      (NumPy packed fingerprint index with popcount bound pruning).  The oe engine scores
+                                      fingerprint types stored by the provider as packed indices (e.g. MACCS) with a
+                                      standard database built on load. Defaults to "oe".
+            fpFoldBits (int, optional): length of folded fingerprints used as a first stage screen with the packed engine
+                                        (e.g. 512 or 1024) - candidates are rescored with the full length fingerprints. Defaults to None (single stage).
+            fpFoldSlack (float, optional): reduction of the score cutoff applied in the folded screen. Defaults to 0.1.
+            fpFoldFactor (int, optional): multiple of the maximum number of results retained by the folded screen. Defaults to 8.
+            prepMolCache (obj, optional): search ready targets (OePreparedMolCache) for graph matching. Defaults to None.
+        """
         startTime = time.time()
         self.__verbose = verbose
-        self.__fpDbD = {fpType: oemP.getFingerPrintDb(fpType) for fpType in fpTypeList} if fpTypeList else {}
+        self.__oemP = oemP
+        self.__prepMolCache = prepMolCache
+        self.__fpDbD = {}
+        for fpType in fpTypeList if fpTypeList else []:
+            fpDb = oemP.getFingerPrintDb(fpType, fpDbType="PACKED") if fpEngine == "packed" else None
+            if fpEngine == "packed" and not fpDb:
+                logger.warning("Packed %s fingerprint index unavailable - using OE fingerprint database", fpType)
+            fpDb = fpDb if fpDb else oemP.getFingerPrintDb(fpType)
+            if fpEngine == "oe" and isinstance(fpDb, ChemCompFingerPrintIndex):
+                logger.info("Loading the standard %s fingerprint database for the oe fingerprint engine", fpType)
+                fpDb = oemP.getFingerPrintDb(fpType, fpDbType="STANDARD")
+            self.__fpDbD[fpType] = fpDb
+        # in-memory folded first stage screens (full length fingerprints may remain memory-mapped)
+        self.__fpFoldD = {}
+        self.__fpFoldSlack = fpFoldSlack
+        self.__fpFoldFactor = fpFoldFactor
+        for fpType, fpDb in self.__fpDbD.items() if fpFoldBits else []:
+            foldIdx = fpDb.getFoldedIndex(fpFoldBits) if isinstance(fpDb, ChemCompFingerPrintIndex) else None
+            if foldIdx:
+                self.__fpFoldD[fpType] = foldIdx
+                logger.info("Folded %s fingerprint screen %d to %d bits (%d words per fingerprint)", fpType, fpDb.getNumWords() * 64, fpFoldBits, foldIdx.getNumWords())
+            else:
+                logger.warning("No folded %s fingerprint screen (requires the packed engine and a compatible fold length %r)", fpType, fpFoldBits)
         self.__oeMolDb, self.__oeMolDbTitleD = oemP.getOeMolDatabase()
         self.__idxTitleD = {v: k for k, v in self.__oeMolDbTitleD.items()}
         if screenType:
@@ -64,7 +238,7 @@ class OeSearchUtils(object):
         logger.info("Return status %r", ok)
         return ok
 
-    def searchSubStructure(self, oeQueryMol, idxList=None, reverseFlag=False, matchOpts="graph-relaxed"):
+    def searchSubStructure(self, oeQueryMol, idxList=None, reverseFlag=False, matchOpts="graph-relaxed", ccIdList=None):
         """Perform a graph match for the input query molecule on the binary
         database of molecules.  The search optionally restricted to the input index
         list.   The sense of the search may be optionally reversed.
@@ -74,6 +248,7 @@ class OeSearchUtils(object):
             idxList ([type], optional): [description]. Defaults to None.
             reverseFlag (bool, optional): [description]. Defaults to False.
             matchOpts (str, optional): graph match criteria type (graph-strict|graph-relaxed|graph-relaxed-stereo). Defaults to "graph-relaxed".
+            ccIdList (list, optional): search identifiers used in place of idxList. Defaults to None.
 
         Returns:
             [type]: [description]
@@ -81,6 +256,10 @@ class OeSearchUtils(object):
         hL = []
         retStatus = True
         try:
+            if ccIdList:
+                idxList = [self.__oeMolDbTitleD[ccId] for ccId in ccIdList if ccId in self.__oeMolDbTitleD]
+                if not idxList:
+                    return retStatus, hL
             # logger.info("Query mol type %r", type(oeQueryMol))
             atomexpr, bondexpr = OeCommonUtils.getAtomBondExprOpts(matchOpts)
             ss = oechem.OESubSearch(oeQueryMol, atomexpr, bondexpr)
@@ -93,10 +272,17 @@ class OeSearchUtils(object):
             if idxList:
                 searchType = "prefilterd-substructure"
             idxIt = idxList if idxList else range(self.__oeMolDb.GetMaxMolIdx())
+            usePrep = self.__prepMolCache is not None and self.__prepMolCache.hasMatchOpts(matchOpts, oeQueryMol)
 
             for idx in idxIt:
-                mol = oechem.OEGraphMol()
                 ccId = self.__oeMolDb.GetTitle(idx)
+                # shared search ready targets are copied for the returned matches
+                prepMol = self.__prepMolCache.getMol(idx, matchOpts) if usePrep else None
+                if prepMol is not None:
+                    if ss.SingleMatch(prepMol) != reverseFlag:
+                        hL.append(MatchResults(ccId=ccId, oeMol=oechem.OEGraphMol(prepMol), searchType=searchType, matchOpts=matchOpts))
+                    continue
+                mol = oechem.OEGraphMol()
                 if not self.__oeMolDb.GetMolecule(mol, idx):
                     logger.error("Unable to read molecule %r at index %r", ccId, idx)
                     continue
@@ -110,6 +296,90 @@ class OeSearchUtils(object):
         #
         return retStatus, hL
 
+    def __getSortedScores(self, oeQueryMol, fpType, minFpScore, maxFpResults, idxS=None, useFold=True):
+        """Return the sorted fingerprint scores [(oe database index, score), ...] from the OE or the packed fingerprint database."""
+        fpDb = self.__fpDbD[fpType]
+        if isinstance(fpDb, ChemCompFingerPrintIndex):
+            queryFp = OeIoUtils().getPackedFingerPrint(oeQueryMol, fpType=fpType, numWords=fpDb.getNumWords())
+            if queryFp is None:
+                return []
+            foldIdx = self.__fpFoldD.get(fpType, None) if useFold else None
+            if foldIdx:
+                foldFp = ChemCompFingerPrintIndex.foldFingerPrints(queryFp, foldIdx.getNumWords())
+                candL = foldIdx.getSortedScores(foldFp, minScore=self.__getFoldCutoff(minFpScore), maxResults=maxFpResults * self.__fpFoldFactor, idxList=idxS)
+                return fpDb.rescore(queryFp, [idx for idx, _ in candL], minScore=minFpScore, maxResults=maxFpResults)
+            return fpDb.getSortedScores(queryFp, minScore=minFpScore, maxResults=maxFpResults, idxList=idxS)
+        queryFp = OeIoUtils().getFingerPrint(oeQueryMol, fpType=fpType)
+        if queryFp is None:
+            return []
+        # all sorted scores (limit 0) are filtered when the search is restricted
+        opts = oegraphsim.OEFPDatabaseOptions(maxFpResults if idxS is None else 0, oegraphsim.OESimMeasure_Tanimoto)
+        if minFpScore:
+            opts.SetCutoff(minFpScore)
+        scores = fpDb.GetSortedScores(queryFp, opts)
+        if idxS is not None:
+            rL = [(si.GetIdx(), si.GetScore()) for si in scores if si.GetIdx() in idxS]
+            return rL[:maxFpResults] if maxFpResults else rL
+        return [(si.GetIdx(), si.GetScore()) for si in scores]
+
+    def __getFoldCutoff(self, minFpScore):
+        """Return the loosened score cutoff of the folded fingerprint screen."""
+        return max(0.0, minFpScore - self.__fpFoldSlack) if minFpScore else None
+
+    def getFoldedScreenRecall(self, oeQueryMolList, fpType, minFpScore, maxFpResults):
+        """Compare the two-stage (folded screen and full length rescoring) finger print search with the
+        single stage search for the input query molecules.
+
+        Args:
+            oeQueryMolList (list): OE graph molecules
+            fpType (str): fingerprint type  [TREE,PATH,MACCS,CIRCULAR,LINGO]
+            minFpScore (float): min fingerprint match score (0.0-1.0)
+            maxFpResults (int): maximum number of finger print results returned
+
+        Returns:
+            (dict): {"fpType": <str>, "queries": <int>, "matches": <int>, "recall": <fraction of single stage matches also
+                     returned by the two-stage search>, "exactQueries": <queries with identical results>,
+                     "singleStageSeconds": <float>, "twoStageSeconds": <float>} or {} if no folded screen is available
+        """
+        rD = {}
+        try:
+            if fpType not in self.__fpFoldD:
+                logger.warning("No folded %s fingerprint screen", fpType)
+                return rD
+            numMatches = numFound = numExact = 0
+            singleTime = twoStageTime = 0.0
+            for oeQueryMol in oeQueryMolList:
+                startTime = time.time()
+                sL = self.__getSortedScores(oeQueryMol, fpType, minFpScore, maxFpResults, useFold=False)
+                singleTime += time.time() - startTime
+                startTime = time.time()
+                tL = self.__getSortedScores(oeQueryMol, fpType, minFpScore, maxFpResults, useFold=True)
+                twoStageTime += time.time() - startTime
+                numMatches += len(sL)
+                numFound += len({idx for idx, _ in sL} & {idx for idx, _ in tL})
+                numExact += 1 if sL == tL else 0
+            rD = {
+                "fpType": fpType,
+                "queries": len(oeQueryMolList),
+                "matches": numMatches,
+                "recall": numFound / numMatches if numMatches else 1.0,
+                "exactQueries": numExact,
+                "singleStageSeconds": singleTime,
+                "twoStageSeconds": twoStageTime,
+            }
+            logger.info(
+                "Folded %s screen recall %.4f (%d/%d queries exact) single stage %.4f two-stage %.4f seconds",
+                fpType,
+                rD["recall"],
+                numExact,
+                len(oeQueryMolList),
+                singleTime,
+                twoStageTime,
+            )
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+        return rD
+
     def searchFingerPrints(self, oeQueryMol, fpType, minFpScore=None, maxFpResults=50, annotateMols=False, verbose=False):
         hL = []
         retStatus = True
@@ -119,23 +389,16 @@ class OeSearchUtils(object):
                 retStatus = False
                 return retStatus, hL
             #
-            opts = oegraphsim.OEFPDatabaseOptions(maxFpResults, oegraphsim.OESimMeasure_Tanimoto)
-            if minFpScore:
-                opts.SetCutoff(minFpScore)
-            #
             if verbose:
-                logger.info("Using %d fingerprint %s type %s", fpDb.NumFingerPrints(), fpType, fpDb.GetFPTypeBase().GetFPTypeString())
+                logger.info("Using %d fingerprint %s type %s", fpDb.NumFingerPrints(), fpType, type(fpDb).__name__)
                 startTime = time.time()
             #
-            scores = fpDb.GetSortedScores(oeQueryMol, opts)
-            oeMol = oechem.OEGraphMol()
-            for si in scores:
-                if self.__oeMolDb.GetMolecule(oeMol, si.GetIdx()):
-                    ccId = self.__oeMolDb.GetTitle(si.GetIdx())
-                    if annotateMols:
-                        tS = "For %s index %r %r similarity score %.4f " % (ccId, si.GetIdx(), self.__idxTitleD[si.GetIdx()], si.GetScore())
-                        oechem.OESetSDData(oeMol, fpType, tS)
-                    hL.append(MatchResults(ccId=ccId, oeMol=oeMol, searchType="fp", fpType=fpType, fpScore=si.GetScore()))
+            # molecules are read only for annotation or on access to the oeMol attribute of a result
+            for mr in self.iterFingerPrints(oeQueryMol, fpType, minFpScore=minFpScore, limit=maxFpResults if maxFpResults else None):
+                if annotateMols and mr.oeMol:
+                    tS = "For %s index %r %r similarity score %.4f " % (mr.ccId, mr.oeIdx, self.__idxTitleD[mr.oeIdx], mr.fpScore)
+                    oechem.OESetSDData(mr.oeMol, fpType, tS)
+                hL.append(mr)
             if verbose:
                 endTime = time.time()
                 logger.info("Fingerprint %s returning %d hits (%.4f sec)", fpType, len(hL), endTime - startTime)
@@ -145,7 +408,71 @@ class OeSearchUtils(object):
 
         return retStatus, hL
 
-    def getFingerPrintScores(self, oeQueryMol, fpType, minFpScore, maxFpResults):
+    def iterFingerPrints(self, oeQueryMol, fpType, minFpScore=None, limit=None, offset=0, cursor=None, ccIdList=None):
+        """Yield a page of finger print search results for the input OE molecule in order of decreasing score
+        (ties in molecule database index order).  Only the scores through the end of the requested page are
+        ranked and molecules are read from the molecule database when the oeMol of a result is first accessed.
+
+        Args:
+            oeQueryMol (OEmol): OE graph molecule
+            fpType (str): fingerprint type  [TREE,PATH,MACCS,CIRCULAR,LINGO]
+            minFpScore (float, optional): min fingerprint match score (0.0-1.0). Defaults to None.
+            limit (int, optional): maximum number of results. Defaults to None (all).
+            offset (int, optional): number of leading results skipped. Defaults to 0.
+            cursor (tuple, optional): cursor of the last result of the previous page (LazyMatchResults.getCursor()) used in place of offset. Defaults to None.
+            ccIdList (list, optional): restrict results to these search identifiers. Defaults to None (all).
+
+        Yields:
+            (LazyMatchResults): finger print match results
+
+        Scoring failures are raised to the caller (e.g. searchFingerPrints() returns a failure status).
+        """
+        if fpType not in self.__fpDbD:
+            logger.error("Unsupported fingerprint type %r", fpType)
+            return
+        # rank through the end of the requested page (a cursor position is the position of the last result returned)
+        endPos = (cursor[0] + 1 if cursor else max(0, offset if offset else 0)) + limit if limit else 0
+        idxS = {self.__oeMolDbTitleD[ccId] for ccId in ccIdList if ccId in self.__oeMolDbTitleD} if ccIdList is not None else None
+        scoreL = sorted(self.__getSortedScores(oeQueryMol, fpType, minFpScore, endPos, idxS=idxS), key=lambda tup: (-tup[1], tup[0]))
+        startPos = getCursorStart([idx for idx, _ in scoreL], offset=offset, cursor=cursor)
+        if startPos is None:
+            logger.warning("Search cursor %r is not in the %s result list", cursor, fpType)
+            return
+        for pos in range(startPos, min(len(scoreL), startPos + limit) if limit else len(scoreL)):
+            idx, score = scoreL[pos]
+            yield LazyMatchResults(ccId=self.__oeMolDb.GetTitle(idx), searchType="fp", fpType=fpType, fpScore=score, oeIdx=idx).setSource(self.__oeMolDb, (pos, idx))
+
+    def iterSubStructure(self, oeQueryMol, idxList=None, ccIdList=None, matchOpts="graph-relaxed", limit=None, offset=0, cursor=None):
+        """Yield a page of graph matches for the input query molecule testing candidates in the order of the
+        input index list (e.g. finger print score order).  Matching stops when the page is complete and
+        molecules are read from the molecule database when the oeMol of a result is first accessed.
+
+        Args:
+            oeQueryMol (object): query molecule OeGraphMol or OeQmol
+            idxList (list, optional): ordered candidate molecule database indices. Defaults to None (all).
+            ccIdList (list, optional): ordered candidate search identifiers used in place of idxList. Defaults to None.
+            matchOpts (str, optional): graph match criteria type (graph-strict|graph-relaxed|graph-relaxed-stereo). Defaults to "graph-relaxed".
+            limit (int, optional): maximum number of results. Defaults to None (all).
+            offset (int, optional): number of leading matches skipped. Defaults to 0.
+            cursor (tuple, optional): cursor of the last result of the previous page (LazyMatchResults.getCursor()) used in place of offset. Defaults to None.
+
+        Yields:
+            (LazyMatchResults): graph match results (fpScore is the fraction of the candidate atoms matched by the query)
+        """
+        try:
+            if ccIdList:
+                idxList = [self.__oeMolDbTitleD[ccId] for ccId in ccIdList if ccId in self.__oeMolDbTitleD]
+                if not idxList:
+                    return
+            searchType = "prefilterd-substructure" if idxList else "exhaustive-substructure"
+            candL = list(idxList) if idxList else list(range(self.__oeMolDb.GetMaxMolIdx()))
+            matchIt = iterGraphMatches(self.__oeMolDb, oeQueryMol, candL, matchOpts=matchOpts, offset=offset, cursor=cursor, prepMolCache=self.__prepMolCache)
+            for pos, idx, score in itertools.islice(matchIt, limit):
+                yield LazyMatchResults(ccId=self.__oeMolDb.GetTitle(idx), searchType=searchType, matchOpts=matchOpts, fpScore=score, oeIdx=idx).setSource(self.__oeMolDb, (pos, idx))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+
+    def getFingerPrintScores(self, oeQueryMol, fpType, minFpScore, maxFpResults, ccIdList=None):
         """Return finger print search scores for the input OE molecule.
 
         Args:
@@ -153,6 +480,7 @@ class OeSearchUtils(object):
             fpType (str): fingerprint type  [TREE,PATH,MACCS,CIRCULAR,LINGO]
             fpMinScore (float): min fingerprint match score (0.0-1.0)
             maxFpResults (int): maximum number of finger print results returned
+            ccIdList (list, optional): restrict results to these search identifiers. Defaults to None (all).
 
         Returns:
             (bool, list): status, finger match lists of type (MatchResults)
@@ -160,18 +488,166 @@ class OeSearchUtils(object):
         hL = []
         retStatus = True
         try:
-            fpDb = self.__fpDbD[fpType]
-            opts = oegraphsim.OEFPDatabaseOptions(maxFpResults, oegraphsim.OESimMeasure_Tanimoto)
-            if minFpScore:
-                opts.SetCutoff(minFpScore)
-            scores = fpDb.GetSortedScores(oeQueryMol, opts)
-            hL = [MatchResults(ccId=self.__oeMolDb.GetTitle(si.GetIdx()), searchType="fp", fpType=fpType, fpScore=si.GetScore(), oeIdx=si.GetIdx()) for si in scores]
+            idxS = {self.__oeMolDbTitleD[ccId] for ccId in ccIdList if ccId in self.__oeMolDbTitleD} if ccIdList is not None else None
+            scoreL = self.__getSortedScores(oeQueryMol, fpType, minFpScore, maxFpResults, idxS=idxS)
+            hL = [MatchResults(ccId=self.__oeMolDb.GetTitle(idx), searchType="fp", fpType=fpType, fpScore=score, oeIdx=idx) for idx, score in scoreL]
         except Exception as e:
             retStatus = False
             logger.exception("Failing with %s", str(e))
         return retStatus, hL
 
-    def searchSubStructureAndFingerPrint(self, oeQueryMol, fpTypeCutoffList, maxFpResults, matchOpts="graph-relaxed"):
+    def getNeighborScores(self, ccId, fpType, minFpScore, maxFpResults, ccIdList=None):
+        """Return finger print search scores for a search database molecule from the precomputed
+        nearest neighbor table (see OeSearchMoleculeProvider.buildNeighborTable()).
+
+        Args:
+            ccId (str): search identifier of the query molecule
+            fpType (str): fingerprint type  [TREE,PATH,MACCS,CIRCULAR,LINGO]
+            fpMinScore (float): min fingerprint match score (0.0-1.0)
+            maxFpResults (int): maximum number of finger print results returned
+            ccIdList (list, optional): restrict results to these search identifiers. Defaults to None (all).
+
+        Returns:
+            (bool, list): status, finger match lists of type (MatchResults)
+                          status is False if no complete neighbor table result is available for this query
+                          (missing table, unknown identifier, query limits exceeding the stored neighbors or
+                          a restricted search) and the query should be scored online.
+        """
+        hL = []
+        try:
+            nbrTable = self.__oemP.getNeighborTable(fpType) if hasattr(self.__oemP, "getNeighborTable") else None
+            if not nbrTable or ccId not in self.__oeMolDbTitleD or ccIdList is not None:
+                return False, hL
+            if maxFpResults > nbrTable.getMaxNeighbors() or (minFpScore if minFpScore else 0.0) < nbrTable.getMinScore():
+                logger.info("Query limits (%r, %r) exceed the %s neighbor table (%d, %r)", maxFpResults, minFpScore, fpType, nbrTable.getMaxNeighbors(), nbrTable.getMinScore())
+                return False, hL
+            scoreL = nbrTable.getNeighbors(self.__oeMolDbTitleD[ccId], minScore=minFpScore, maxResults=maxFpResults)
+            hL = [MatchResults(ccId=self.__oeMolDb.GetTitle(idx), searchType="fp", fpType=fpType, fpScore=score, oeIdx=idx) for idx, score in scoreL]
+            return True, hL
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+        return False, hL
+
+    def getFingerPrintScoresBatch(self, oeQueryMolList, fpType, minFpScore, maxFpResults, ccIdList=None, numProc=2, blockSize=64):
+        """Return finger print search scores for a list of OE molecules.  Queries are scored in blocks
+        (query x database for the packed fingerprint engine) distributed over a pool of worker threads and
+        results are returned per query as each block completes.
+
+        Args:
+            oeQueryMolList (list): OE graph molecules
+            fpType (str): fingerprint type  [TREE,PATH,MACCS,CIRCULAR,LINGO]
+            minFpScore (float): min fingerprint match score (0.0-1.0)
+            maxFpResults (int): maximum number of finger print results returned per query
+            ccIdList (list, optional): restrict results to these search identifiers. Defaults to None (all).
+            numProc (int, optional): number of worker threads. Defaults to 2.
+            blockSize (int, optional): number of queries scored together. Defaults to 64.
+
+        Yields:
+            (int, bool, list): query list index, status, finger match list of type (MatchResults)
+        """
+        yield from self.getMultiFingerPrintScoresBatch(oeQueryMolList, [(fpType, minFpScore)], maxFpResults, ccIdList=ccIdList, numProc=numProc, blockSize=blockSize)
+
+    def getMultiFingerPrintScoresBatch(self, oeQueryMolList, fpTypeCutoffList, maxFpResults, ccIdList=None, numProc=2, blockSize=64):
+        """Return finger print search scores over several finger print types for a list of OE molecules.  Queries are
+        scored in blocks (query x database for the packed fingerprint engine) distributed over a pool of worker threads.
+        Each block is scored for all of the finger print types and results are returned per query as each block completes.
+
+        Args:
+            oeQueryMolList (list): OE graph molecules
+            fpTypeCutoffList (list): [(finger print type, min score),...]
+            maxFpResults (int): maximum number of finger print results returned per query and finger print type
+            ccIdList (list, optional): restrict results to these search identifiers. Defaults to None (all).
+            numProc (int, optional): number of worker threads. Defaults to 2.
+            blockSize (int, optional): number of queries scored together. Defaults to 64.
+
+        Yields:
+            (int, bool, list): query list index, status (False if scoring fails for any finger print type),
+                               finger match list of type (MatchResults) for all finger print types
+        """
+        startTime = time.time()
+        numQueries = numFailed = 0
+        idxS = {self.__oeMolDbTitleD[ccId] for ccId in ccIdList if ccId in self.__oeMolDbTitleD} if ccIdList is not None else None
+        #
+        # packed query fingerprints {fpType: {query list index: fingerprint, ...}, ...}
+        oeIoU = OeIoUtils()
+        queryFpDD = {}
+        for fpType, _ in fpTypeCutoffList:
+            fpDb = self.__fpDbD[fpType] if fpType in self.__fpDbD else None
+            if not fpDb:
+                logger.error("Missing fingerprint database for %r", fpType)
+            elif isinstance(fpDb, ChemCompFingerPrintIndex):
+                queryFpDD[fpType] = {}
+                for ii, oeQueryMol in enumerate(oeQueryMolList):
+                    queryFp = oeIoU.getPackedFingerPrint(oeQueryMol, fpType=fpType, numWords=fpDb.getNumWords()) if oeQueryMol else None
+                    if queryFp is not None:
+                        queryFpDD[fpType][ii] = queryFp
+        # blocks of queries with similar popcounts (first packed fingerprint type) share the bounded row range
+        iL = list(range(len(oeQueryMolList)))
+        if queryFpDD:
+            queryFpD = next(iter(queryFpDD.values()))
+            iL.sort(key=lambda ii: int(popCount(queryFpD[ii])) if ii in queryFpD else -1)
+        blockL = [iL[jj : jj + blockSize] for jj in range(0, len(iL), blockSize)]
+
+        def scoreBlock(blockIdxL):
+            okD = {ii: True for ii in blockIdxL}
+            fpLD = {ii: [] for ii in blockIdxL}
+            for fpType, minFpScore in fpTypeCutoffList:
+                try:
+                    for ii, scoreL in self.__getSortedScoresBlock(oeQueryMolList, blockIdxL, fpType, minFpScore, maxFpResults, idxS, queryFpDD.get(fpType, None)):
+                        if scoreL is None:
+                            okD[ii] = False
+                            continue
+                        fpLD[ii].extend([MatchResults(ccId=self.__oeMolDb.GetTitle(idx), searchType="fp", fpType=fpType, fpScore=score, oeIdx=idx) for idx, score in scoreL])
+                except Exception as e:
+                    logger.exception("Failing fpType %r with %s", fpType, str(e))
+                    okD = {ii: False for ii in blockIdxL}
+            return okD, fpLD
+
+        #
+        with ThreadPoolExecutor(max_workers=max(1, numProc)) as executor:
+            futureD = {executor.submit(scoreBlock, blockIdxL): blockIdxL for blockIdxL in blockL}
+            for future in as_completed(futureD):
+                okD, fpLD = future.result()
+                for ii in futureD[future]:
+                    numQueries += 1
+                    numFailed += 0 if okD[ii] else 1
+                    yield ii, okD[ii], fpLD[ii]
+        #
+        elapsed = time.time() - startTime
+        logger.info(
+            "Fingerprint %s batch scored %d queries (failed %d) in %.4f seconds (%.2f queries/second)",
+            ",".join([fpType for fpType, _ in fpTypeCutoffList]),
+            numQueries,
+            numFailed,
+            elapsed,
+            numQueries / elapsed if elapsed else 0.0,
+        )
+
+    def __getSortedScoresBlock(self, oeQueryMolList, blockIdxL, fpType, minFpScore, maxFpResults, idxS, queryFpD):
+        """Return the sorted fingerprint scores [(query list index, [(oe database index, score), ...] or None on failure), ...]
+        of a block of queries for the input fingerprint type (queryFpD holds the packed query fingerprints or None for OE scoring).
+        """
+        fpDb = self.__fpDbD[fpType] if fpType in self.__fpDbD else None
+        if not fpDb:
+            return [(ii, None) for ii in blockIdxL]
+        if queryFpD is None:
+            return [(ii, self.__getSortedScores(oeQueryMolList[ii], fpType, minFpScore, maxFpResults, idxS=idxS)) for ii in blockIdxL]
+        rL = [(ii, None) for ii in blockIdxL if ii not in queryFpD]
+        rowL = [ii for ii in blockIdxL if ii in queryFpD]
+        if not rowL:
+            return rL
+        queryFpA = np.vstack([queryFpD[ii] for ii in rowL])
+        foldIdx = self.__fpFoldD.get(fpType, None)
+        if not foldIdx:
+            scoreLL = fpDb.getSortedScoresBatch(queryFpA, minScore=minFpScore, maxResults=maxFpResults, idxList=idxS)
+        else:
+            foldFpA = ChemCompFingerPrintIndex.foldFingerPrints(queryFpA, foldIdx.getNumWords())
+            candLL = foldIdx.getSortedScoresBatch(foldFpA, minScore=self.__getFoldCutoff(minFpScore), maxResults=maxFpResults * self.__fpFoldFactor, idxList=idxS)
+            scoreLL = [fpDb.rescore(queryFp, [idx for idx, _ in candL], minScore=minFpScore, maxResults=maxFpResults) for queryFp, candL in zip(queryFpA, candLL)]
+        rL.extend(zip(rowL, scoreLL))
+        return rL
+
+    def searchSubStructureAndFingerPrint(self, oeQueryMol, fpTypeCutoffList, maxFpResults, matchOpts="graph-relaxed", ccIdList=None, concurrentFp=None):
         """Return graph match and finger print search results for the input OE molecule using finger print pre-filtering.
 
         Args:
@@ -179,34 +655,72 @@ class OeSearchUtils(object):
             fpTypeCutoffList (list): [(finger print type, min score),...]
             maxFpResults (int): maximum number of finger print results returned
             matchOpts (str, optional): graph match criteria type (graph-strict|graph-relaxed|...). Defaults to "graph-relaxed".
+            ccIdList (list, optional): restrict the search to these search identifiers. Defaults to None (all).
+            concurrentFp (bool, optional): score finger print types in worker threads. Defaults to None (only the types
+                                           scored by the packed engine - OE finger print database scoring is not
+                                           assumed to release the GIL).
 
         Returns:
             (bool, list, list): status, graph match and finger match lists of type (MatchResults)
+
+        Finger print types scored in worker threads overlap the scoring of the remaining types and the graph match
+        of the candidates from each finger print type, which starts as soon as its scores are available.  The query
+        finger prints are generated and the database titles resolved in the calling thread, so the worker threads
+        share only read access to the query molecule.  Finger print results are merged in score order and graph
+        matches are returned in the order of their best finger print score.
         """
         fpL = []
         ssL = []
         retStatus = True
+        fpOk = True
         try:
-            for fpType, fpCutoff in fpTypeCutoffList:
-                ok, tL = self.getFingerPrintScores(oeQueryMol, fpType, fpCutoff, maxFpResults)
-                fpL.extend(tL)
-            fpL = list(set(fpL))
-            fpL = sorted(fpL, key=lambda nTup: nTup.fpScore, reverse=True)
-            idxList = [nTup.oeIdx for nTup in fpL]
-            idxList = list(OrderedDict.fromkeys(idxList))
-            # -- only continue with a non-empty fingerprint result --
-            if matchOpts not in ["fingerprint-similarity"] and idxList:
-                # Save the maximum fp score
-                fpScoreD = {}
-                for fpTup in fpL:
-                    fpScoreD[fpTup.ccId] = max(fpScoreD[fpTup.ccId], fpTup.fpScore) if fpTup.ccId in fpScoreD else fpTup.fpScore
-                retStatus, rTupL = self.searchSubStructure(oeQueryMol, idxList=idxList, reverseFlag=False, matchOpts=matchOpts)
-                for rTup in rTupL:
-                    ssL.append(rTup._replace(fpScore=fpScoreD[rTup.ccId]))
+            OeIoUtils().addFingerPrints(oeQueryMol, [fpType for fpType, _ in fpTypeCutoffList])
+            idxS = {self.__oeMolDbTitleD[ccId] for ccId in ccIdList if ccId in self.__oeMolDbTitleD} if ccIdList is not None else None
+            threadL = [
+                (fpType, fpCutoff)
+                for fpType, fpCutoff in fpTypeCutoffList
+                if (concurrentFp if concurrentFp is not None else isinstance(self.__fpDbD.get(fpType, None), ChemCompFingerPrintIndex))
+            ]
+            fpLL = []
+            searchedS = set()
+            matchD = {}
+            with ThreadPoolExecutor(max_workers=max(1, len(threadL))) as executor:
+                futureL = [executor.submit(self.__getFingerPrintScoreList, oeQueryMol, fpType, fpCutoff, maxFpResults, idxS) for fpType, fpCutoff in threadL]
+                seqIt = (self.__getFingerPrintScoreList(oeQueryMol, fpType, fpCutoff, maxFpResults, idxS) for fpType, fpCutoff in fpTypeCutoffList if (fpType, fpCutoff) not in threadL)
+                for ok, fpType, scoreL in itertools.chain(seqIt, (future.result() for future in as_completed(futureL))):
+                    fpOk = fpOk and ok
+                    tL = [MatchResults(ccId=self.__oeMolDb.GetTitle(idx), searchType="fp", fpType=fpType, fpScore=score, oeIdx=idx) for idx, score in scoreL]
+                    fpLL.append(tL)
+                    # -- graph match the new candidates while the remaining finger print types are scored --
+                    if matchOpts in ["fingerprint-similarity"]:
+                        continue
+                    idxList = list(OrderedDict.fromkeys(nTup.oeIdx for nTup in tL if nTup.oeIdx not in searchedS))
+                    if idxList:
+                        searchedS.update(idxList)
+                        tStatus, rTupL = self.searchSubStructure(oeQueryMol, idxList=idxList, reverseFlag=False, matchOpts=matchOpts)
+                        retStatus = retStatus and tStatus
+                        matchD.update({rTup.ccId: rTup for rTup in rTupL})
+            # -- merge the score ordered results of each finger print type --
+            fpL = list(OrderedDict.fromkeys(heapq.merge(*fpLL, key=lambda nTup: -nTup.fpScore)))
+            # Save the maximum fp score
+            fpScoreD = {}
+            for fpTup in fpL:
+                fpScoreD.setdefault(fpTup.ccId, fpTup.fpScore)
+            ssL = [matchD[ccId]._replace(fpScore=fpScore) for ccId, fpScore in fpScoreD.items() if ccId in matchD]
         except Exception as e:
             retStatus = False
             logger.exception("Failing with %s", str(e))
-        return ok and retStatus, ssL, fpL
+        return fpOk and retStatus, ssL, fpL
+
+    def __getFingerPrintScoreList(self, oeQueryMol, fpType, minFpScore, maxFpResults, idxS):
+        """Return the status, finger print type and sorted scores [(oe database index, score), ...] for the input query (thread safe
+        for queries carrying their finger prints - the molecule database is not accessed).
+        """
+        try:
+            return True, fpType, self.__getSortedScores(oeQueryMol, fpType, minFpScore, maxFpResults, idxS=idxS)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+        return False, fpType, []
 
     def searchSubStructureWithFingerPrint(self, oeQueryMol, fpType, minFpScore, maxFpResults, matchOpts="graph-relaxed"):
         """Return graph match search results for the input OE molecule using finger print pre-filtering.
@@ -223,12 +737,7 @@ class OeSearchUtils(object):
         hL = []
         retStatus = True
         try:
-            fpDb = self.__fpDbD[fpType]
-            opts = oegraphsim.OEFPDatabaseOptions(maxFpResults, oegraphsim.OESimMeasure_Tanimoto)
-            if minFpScore:
-                opts.SetCutoff(minFpScore)
-            scores = fpDb.GetSortedScores(oeQueryMol, opts)
-            idxList = [si.GetIdx() for si in scores]
+            idxList = [idx for idx, _ in self.__getSortedScores(oeQueryMol, fpType, minFpScore, maxFpResults)]
             retStatus, hL = self.searchSubStructure(oeQueryMol, idxList=idxList, reverseFlag=False, matchOpts=matchOpts)
         except Exception as e:
             retStatus = False
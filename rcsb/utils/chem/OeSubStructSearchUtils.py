@@ -5,7 +5,19 @@
 # Version: 0.001
 #
 # Updates:
-#
+#  18-Oct-2026 jdw Add vectorized formula+feature prefilter returning OE molecule database indices.
+#  18-Oct-2026 jdw Add structural key (ss-keys) subset screen to the index prefilters.
+#  18-Oct-2026 jdw Add partition filters (partitionD) to the index prefilters.
+#  18-Oct-2026 jdw Add paged substructure search generator iterSubStructure() testing candidates in heavy atom count order.
+#  18-Oct-2026 jdw Run multi-process searches on a persistent worker pool (OeSubStructSearchPool) holding open molecule databases.
+#  18-Oct-2026 jdw Match search ready targets from the prepared molecule cache (prepMolCache) skipping per-query decoding and preparation.
+#  18-Oct-2026 jdw Add hit limit (maxHits), time budget (timeoutSeconds) and cancellation (SearchCancelToken) to searchSubStructure().
+#  18-Oct-2026 jdw Add screened substructure search engine searchSubStructureScreened() and partition index filter partitionDbIndex().
+#  18-Oct-2026 jdw Add getQueryCriteria() and filterDbIndex() for planned (strategy selected) substructure searches.
+#  18-Oct-2026 jdw Start the persistent search pool with an explicit start method (mpStartMethod) and add startPool().
+#  18-Oct-2026 jdw Require fork started pool workers for search ready targets and freeze the collector across the fork.
+#  18-Oct-2026 jdw Score screened substructure matches from the formula index heavy atom counts (idxP).
+#  18-Oct-2026 jdw Share decoded targets with fork started pool workers and report the memory of each worker (getPoolStatus()).
 ##
 """
 Utilities to manage OE specific substructure search operations (w/ formula/feature prefiltering)
@@ -17,33 +29,129 @@ __email__ = "john.westbrook@rcsb.org"
 __license__ = "Apache 2.0"
 
 
+import gc
+import itertools
 import logging
+import math
+import multiprocessing
+import os
+import threading
 import time
 from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 
+import numpy as np
 from openeye import oechem
 
 from rcsb.utils.chem.OeCommonUtils import OeCommonUtils
+from rcsb.utils.chem.OeIoUtils import OeIoUtils
 from rcsb.utils.chem.OeMoleculeFactory import OeMoleculeFactory
+from rcsb.utils.chem.OePreparedMolCache import OePreparedMolCache, getProcessMemory
+from rcsb.utils.chem.OeSearchUtils import LazyMatchResults, iterGraphMatches
 from rcsb.utils.multiproc.MultiProcUtil import MultiProcUtil
 
 logger = logging.getLogger(__name__)
 
 MatchResults = namedtuple("MatchResults", "ccId oeMol searchType matchOpts screenType fpType fpScore oeIdx formula", defaults=(None,) * 9)
 
+# reasons a substructure search stops before testing all candidates (in order of precedence)
+STOP_REASONS = ("cancelled", "timeout", "maxHits")
+
+
+def getStopReason(numHits, maxHits=None, deadline=None, cancelled=False):
+    """Return the reason (cancelled|timeout|maxHits) to stop a search or None to continue.
+
+    Args:
+        numHits (int): number of matches so far
+        maxHits (int, optional): maximum number of matches. Defaults to None (no limit).
+        deadline (float, optional): stop time (time.time()). Defaults to None (no limit).
+        cancelled (bool, optional): cancellation state. Defaults to False.
+
+    Returns:
+        (str): stop reason or None
+    """
+    if cancelled:
+        return "cancelled"
+    if deadline and time.time() > deadline:
+        return "timeout"
+    if maxHits and numHits >= maxHits:
+        return "maxHits"
+    return None
+
+
+class SearchCancelToken(object):
+    """Cooperative cancellation token of a substructure search.
+
+    cancel() (e.g. called from another thread) stops a running search at the next candidate in every worker, and
+    the search records on the token the reason (cancelled|timeout|maxHits) it stopped before testing all candidates.
+    Results of a search with a token reporting isPartial() are incomplete.  A token serves a single search.
+    """
+
+    def __init__(self):
+        self.__event = threading.Event()
+        self.__lock = threading.Lock()
+        self.__callbackL = []
+        self.__stopReason = None
+
+    def cancel(self):
+        """Cancel the search (registered callbacks propagate the cancellation to worker processes)."""
+        with self.__lock:
+            self.__event.set()
+            callbackL = list(self.__callbackL)
+        for callback in callbackL:
+            callback()
+
+    def isCancelled(self):
+        return self.__event.is_set()
+
+    def addCallback(self, callback):
+        """Register a function called on cancellation (called at once if the token is already cancelled)."""
+        with self.__lock:
+            self.__callbackL.append(callback)
+            cancelled = self.__event.is_set()
+        if cancelled:
+            callback()
+
+    def removeCallback(self, callback):
+        with self.__lock:
+            if callback in self.__callbackL:
+                self.__callbackL.remove(callback)
+
+    def setStopReason(self, stopReason):
+        """Record the reason the search stopped early (the first reason recorded is kept)."""
+        with self.__lock:
+            if stopReason and self.__stopReason is None:
+                self.__stopReason = stopReason
+
+    def getStopReason(self):
+        return self.__stopReason
+
+    def isPartial(self):
+        return self.__stopReason is not None
+
 
 class OeSubStructSearchWorker(object):
     """A skeleton class that implements the interface expected by the multiprocessing
     for substructure search --
     """
 
-    def __init__(self, oeQueryMol, oeMolDb, matchOpts="graph-relaxed", **kwargs):
+    def __init__(self, oeQueryMol, oeMolDb, matchOpts="graph-relaxed", prepMolCache=None, **kwargs):
         self.__oeMolDb = oeMolDb
         self.__oeQueryMol = oeQueryMol
         self.__matchOpts = matchOpts
+        self.__prepMolCache = prepMolCache if prepMolCache is not None and prepMolCache.hasMatchOpts(matchOpts, oeQueryMol) else None
+        # decoded targets (copied and prepared for each search) in the absence of search ready targets
+        self.__decodedMolCache = prepMolCache if prepMolCache is not None and prepMolCache.hasDecoded() else None
         self.__atomexpr, self.__bondexpr = OeCommonUtils.getAtomBondExprOpts(matchOpts)
-        #
-        _ = kwargs
+        # search limits - maximum hits, deadline (time.time()) and shared cancellation flags (the search is
+        # cancelled when cancelA[cancelSlot] == cancelId).  Hits are counted per chunk, or across chunks
+        # with a shared hit counter (multiprocessing.Value) updated as each chunk completes.
+        self.__maxHits = kwargs.get("maxHits", None)
+        self.__hitCount = kwargs.get("hitCount", None)
+        self.__deadline = kwargs.get("deadline", None)
+        self.__cancelA = kwargs.get("cancelA", None)
+        self.__cancelSlot = kwargs.get("cancelSlot", 0)
+        self.__cancelId = kwargs.get("cancelId", 1)
 
     def subStructureSearch(self, dataList, procName, optionsD, workingDir):
         """Search index"""
@@ -54,7 +162,8 @@ class OeSubStructSearchWorker(object):
         sL = []
         # sucessList,resultList,diagList=workerFunc(runList=nextList,procName, optionsD, workingDir)
         try:
-            retStatus, successList, sL = self.__subStructureSearch(self.__oeQueryMol, dataList, reverseFlag=False)
+            retStatus, successList, sL, stopReason = self.__subStructureSearch(self.__oeQueryMol, dataList, reverseFlag=False)
+            diagList = [stopReason] if stopReason else []
             logger.debug("%s status %r found %d search candidates from %d definitions ", procName, retStatus, len(successList), len(dataList))
         except Exception as e:
             logger.exception("Failing %s for %d data items %s", procName, len(dataList), str(e))
@@ -73,54 +182,351 @@ class OeSubStructSearchWorker(object):
             matchOpts (str, optional): graph match criteria type (graph-strict|graph-relaxed|graph-relaxed-stereo). Defaults to "graph-relaxed".
 
         Returns:
-            [type]: [description]
+            (bool, list, list, str): status, matching indices, scores and the reason the search stopped early (or None)
         """
         hL = []
         sL = []
+        stopReason = None
         retStatus = True
         try:
             ss = oechem.OESubSearch(oeQueryMol, self.__atomexpr, self.__bondexpr)
             if not ss.IsValid():
                 retStatus = False
                 logger.error("Unable to initialize substructure search!")
-                return retStatus, hL, sL
+                return retStatus, hL, sL, stopReason
             #
             for idx in idxList:
-                mol = oechem.OEGraphMol()
-                if not self.__oeMolDb.GetMolecule(mol, idx):
-                    ccId = self.__oeMolDb.GetTitle(idx)
-                    logger.error("Unable to read molecule %r at index %r", ccId, idx)
-                    continue
-                oechem.OEPrepareSearch(mol, ss)
+                cancelled = self.__cancelA is not None and self.__cancelA[self.__cancelSlot] == self.__cancelId
+                numHits = len(hL) + (self.__hitCount.value if self.__hitCount is not None else 0)
+                stopReason = getStopReason(numHits, maxHits=self.__maxHits, deadline=self.__deadline, cancelled=cancelled)
+                if stopReason:
+                    break
+                mol = self.__prepMolCache.getMol(idx, self.__matchOpts) if self.__prepMolCache else None
+                if mol is None:
+                    decodedMol = self.__decodedMolCache.getDecodedMol(idx) if self.__decodedMolCache else None
+                    mol = oechem.OEGraphMol(decodedMol) if decodedMol is not None else oechem.OEGraphMol()
+                    if decodedMol is None and not self.__oeMolDb.GetMolecule(mol, idx):
+                        ccId = self.__oeMolDb.GetTitle(idx)
+                        logger.error("Unable to read molecule %r at index %r", ccId, idx)
+                        continue
+                    oechem.OEPrepareSearch(mol, ss)
                 if ss.SingleMatch(mol) != reverseFlag:
                     score = float(oeQueryMol.NumAtoms()) / float(mol.NumAtoms())
                     hL.append(idx)
                     sL.append(score)
+            if self.__hitCount is not None and hL:
+                with self.__hitCount.get_lock():
+                    self.__hitCount.value += len(hL)
             retStatus = True
         except Exception as e:
             retStatus = False
             logger.exception("Failing with %s", str(e))
         #
-        return retStatus, hL, sL
+        return retStatus, hL, sL, stopReason
+
+
+# molecule database opened once in each worker process of the persistent search pool
+# and decoded and search ready targets (prepMolCache) inherited from the parent process by forked workers
+_poolStateD = {}
+
+
+def _initPoolWorker(oeMolDbFilePath, cancelA=None, barrier=None):
+    """Open the molecule database in a persistent search pool worker process."""
+    _poolStateD["cancelA"] = cancelA
+    _poolStateD["barrier"] = barrier
+    _poolStateD["oeMolDb"] = OeIoUtils(quietFlag=True).loadOeBinaryDatabaseAndIndex(oeMolDbFilePath)
+
+
+def _pingPoolWorker():
+    """Return the number of molecules in the database held by a search pool worker process."""
+    return _poolStateD["oeMolDb"].NumMols()
+
+
+def _getPoolWorkerMemory(timeout):
+    """Return the process id and memory (see getProcessMemory()) of a search pool worker process.  Workers wait
+    at the pool barrier so that each worker answers exactly one of the requests submitted together.
+    """
+    try:
+        _poolStateD["barrier"].wait(timeout)
+    except Exception as e:
+        logger.warning("Search pool worker %d memory barrier failing with %s", os.getpid(), str(e))
+    return os.getpid(), getProcessMemory()
+
+
+def _searchPoolChunk(queryS, matchOpts, idxList, maxHits=None, deadline=None, cancelSlot=0, cancelId=0):
+    """Match the (OE binary serialized) query molecule to a chunk of molecule database indices in a search pool worker process."""
+    oeQueryMol = OeIoUtils(quietFlag=True).deserializeOe(queryS)[0]
+    rWorker = OeSubStructSearchWorker(
+        oeQueryMol,
+        _poolStateD["oeMolDb"],
+        matchOpts=matchOpts,
+        prepMolCache=_poolStateD.get("prepMolCache", None),
+        maxHits=maxHits,
+        deadline=deadline,
+        cancelA=_poolStateD.get("cancelA", None),
+        cancelSlot=cancelSlot,
+        cancelId=cancelId,
+    )
+    _, idxL, scoreL, diagL = rWorker.subStructureSearch(idxList, "pool-%d" % os.getpid(), {}, None)
+    return idxL, scoreL, diagL[0] if diagL else None
+
+
+class OeSubStructSearchPool(object):
+    """Persistent pool of substructure search worker processes.  Each worker opens the molecule database once
+    and queries are passed to the workers as OE binary serialized molecules with chunks of candidate indices.  Each query is assigned a slot in a shared array of
+    cancellation flags through which the parent process stops the running chunks of the query.
+    """
+
+    def __init__(self, oeMolDbFilePath, numProc=2, prepMolCache=None, startMethod=None):
+        """Start the worker processes and open the molecule database in each.
+
+        Workers are started with an explicit start method.  Forked workers inherit the state of the parent process
+        (including locks held by other threads), so a pool using fork should be started before the process runs
+        threads (e.g. by OeSubStructSearchUtils.startPool() on reload).  Decoded and search ready targets reach the
+        workers only by fork, and the cyclic garbage collector is frozen across the fork so that collections in the workers do not
+        write to (and copy) the inherited pages.
+
+        Args:
+            oeMolDbFilePath (str): OE molecule database file path
+            numProc (int, optional): number of worker processes. Defaults to 2.
+            prepMolCache (obj, optional): decoded and search ready targets (OePreparedMolCache) shared with workers
+                                          started by fork (copy-on-write). Defaults to None.
+            startMethod (str, optional): worker start method (fork|forkserver|spawn). Defaults to None (fork with
+                                         search ready targets and otherwise forkserver where available or spawn).
+
+        Raises:
+            ValueError: search ready targets with a start method other than fork (or fork unavailable)
+        """
+        startTime = time.time()
+        self.__numProc = max(1, numProc)
+        if not startMethod:
+            startMethod = "fork" if prepMolCache is not None else "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        if prepMolCache is not None and (startMethod != "fork" or "fork" not in multiprocessing.get_all_start_methods()):
+            raise ValueError("Search ready targets (prepMolCache) require fork started search pool workers (start method %r)" % startMethod)
+        self.__startMethod = startMethod
+        mpContext = multiprocessing.get_context(startMethod)
+        _poolStateD["prepMolCache"] = prepMolCache
+        # cancellation flags (slot query id % size holds the id of a cancelled query)
+        self.__cancelA = mpContext.RawArray("q", 256)
+        self.__barrier = mpContext.Barrier(self.__numProc)
+        self.__queryIdIt = itertools.count(1)
+        self.__executor = ProcessPoolExecutor(
+            max_workers=self.__numProc, mp_context=mpContext, initializer=_initPoolWorker, initargs=(oeMolDbFilePath, self.__cancelA, self.__barrier)
+        )
+        # forked workers are all started with the first submission
+        if startMethod == "fork":
+            gc.freeze()
+        try:
+            numMolL = [future.result() for future in [self.__executor.submit(_pingPoolWorker) for _ in range(self.__numProc)]]
+        finally:
+            if startMethod == "fork":
+                gc.unfreeze()
+        logger.info(
+            "Started substructure search pool with %d workers (%s) (%d molecules) (%.4f seconds)", self.__numProc, startMethod, max(numMolL), time.time() - startTime
+        )
+
+    def getNumProc(self):
+        return self.__numProc
+
+    def getStartMethod(self):
+        return self.__startMethod
+
+    def getWorkerMemory(self, timeout=30.0):
+        """Return the memory of each worker process (resident memory and, where available, the proportional and
+        private memory showing the pages shared with the parent process).
+
+        Args:
+            timeout (float, optional): seconds to wait for all workers. Defaults to 30.0.
+
+        Returns:
+            (dict): {<worker pid>: {"rssBytes": <int>, "pssBytes": <int or None>, "privateBytes": <int or None>}, ...}
+        """
+        try:
+            futureL = [self.__executor.submit(_getPoolWorkerMemory, timeout) for _ in range(self.__numProc)]
+            return dict(future.result() for future in futureL)
+        finally:
+            if self.__barrier.broken:
+                self.__barrier.reset()
+
+    def search(self, oeQueryMol, idxList, matchOpts="graph-relaxed", chunksPerProc=4, maxHits=None, deadline=None, cancelToken=None):
+        """Perform a graph match for the input query molecule on the input molecule database indices.
+
+        Chunk results are collected in input order.  When the collected matches reach maxHits, or a chunk stops
+        early, the remaining chunks are cancelled (running chunks stop at the next candidate) and their results
+        discarded, so a limited search returns the first maxHits matches in input order.
+
+        Args:
+            oeQueryMol (object): query molecule (OeGraphMol)
+            idxList (list): molecule database indices
+            matchOpts (str, optional): graph match criteria type (graph-strict|graph-relaxed|graph-relaxed-stereo). Defaults to "graph-relaxed".
+            chunksPerProc (int, optional): number of index chunks submitted per worker process. Defaults to 4.
+            maxHits (int, optional): maximum number of matches. Defaults to None (no limit).
+            deadline (float, optional): stop time (time.time()). Defaults to None (no limit).
+            cancelToken (obj, optional): cancellation token (SearchCancelToken). Defaults to None.
+
+        Returns:
+            (list, list, str): matching molecule database indices and scores (fraction of the candidate atoms matched) in input order,
+                               and the reason the search stopped early (cancelled|timeout|maxHits) or None
+        """
+        queryId = next(self.__queryIdIt)
+        cancelSlot = queryId % len(self.__cancelA)
+
+        def cancelWorkers():
+            self.__cancelA[cancelSlot] = queryId
+
+        if cancelToken:
+            cancelToken.addCallback(cancelWorkers)
+        try:
+            queryS = OeIoUtils(quietFlag=True).serializeOe(oeQueryMol)
+            chunkSize = max(1, math.ceil(len(idxList) / (self.__numProc * chunksPerProc)))
+            futureL = [
+                self.__executor.submit(_searchPoolChunk, queryS, matchOpts, idxList[ii : ii + chunkSize], maxHits, deadline, cancelSlot, queryId)
+                for ii in range(0, len(idxList), chunkSize)
+            ]
+            idxL = []
+            scoreL = []
+            stopReason = None
+            for ii, future in enumerate(futureL):
+                if stopReason and future.cancel():
+                    continue
+                tIdxL, tScoreL, tStopReason = future.result()
+                if stopReason:
+                    continue
+                idxL.extend(tIdxL)
+                scoreL.extend(tScoreL)
+                if tStopReason or (maxHits and len(idxL) >= maxHits and ii < len(futureL) - 1):
+                    stopReason = tStopReason if tStopReason else "maxHits"
+                    cancelWorkers()
+            if maxHits and len(idxL) > maxHits:
+                idxL, scoreL = idxL[:maxHits], scoreL[:maxHits]
+            return idxL, scoreL, stopReason
+        finally:
+            if cancelToken:
+                cancelToken.removeCallback(cancelWorkers)
+
+    def close(self):
+        """Stop the worker processes."""
+        self.__executor.shutdown(wait=True)
 
 
 class OeSubStructSearchUtils(object):
     """Utilities to manage OE specific substructure search operations (exhaustive and formula/feature prefiltered)"""
 
-    def __init__(self, oemP, screenType=None, numProc=2, chunkSize=10, verbose=False):
+    def __init__(self, oemP, screenType=None, numProc=2, chunkSize=10, verbose=False, usePool=True, prepMolCache=None, mpStartMethod=None):
+        """Utilities to manage OE specific substructure search operations.
+
+        Args:
+            oemP (obj): molecule provider (e.g. OeSearchMoleculeProvider())
+            screenType (str, optional): screened substructure search database type (SMARTS|MOLECULE|MDL) loaded for
+                                        searchSubStructureScreened(). Defaults to None.
+            numProc (int, optional): number of threads used by the screened substructure search. Defaults to 2.
+            chunkSize (int, optional): chunk size of per-query multi-process searches (usePool=False). Defaults to 10.
+            verbose (bool, optional): verbose logging. Defaults to False.
+            usePool (bool, optional): run multi-process searches on a persistent worker pool (started by startPool()
+                                      or with the first such search and stopped by close()). Defaults to True.
+            prepMolCache (obj, optional): search ready targets (OePreparedMolCache) for graph matching. Defaults to None.
+            mpStartMethod (str, optional): persistent pool worker start method (fork|forkserver|spawn). Defaults to None
+                                           (fork where available).  Fork started workers share the decoded targets
+                                           of the molecule database (copy-on-write) with the parent process, while
+                                           workers started otherwise decode the database records of each query.
+        """
         startTime = time.time()
         self.__verbose = verbose
         self.__oeMolDb, self.__oeMolDbTitleD = oemP.getOeMolDatabase()
+        self.__oeMolDbFilePath = oemP.getOeMolDatabaseFilePath() if usePool else None
+        self.__pool = None
+        self.__prepMolCache = prepMolCache
+        # decoded (and any search ready) targets shared with the fork started pool workers
+        self.__poolMolCache = None
+        self.__mpStartMethod = mpStartMethod
         self.__idxTitleD = {v: k for k, v in self.__oeMolDbTitleD.items()}
         self.__numProc = numProc
         self.__chunkSize = chunkSize
+        # (formula index, numpy array mapping formula index rows to OE molecule database indices)
+        self.__dbIdxMapT = (None, None)
+        self.__dbSizeT = (None, None)
         #
+        self.__screenType = None
+        self.__ssDb = None
         if screenType:
-            self.__ssDb = oemP.getSubSearchDb(screenType=screenType, numProc=numProc, forceRefresh=True)
+            ssDb = oemP.getSubSearchDb(screenType=screenType, numProc=numProc, forceRefresh=True)
+            if ssDb and ssDb.NumMolecules():
+                self.__ssDb = ssDb
+                self.__screenType = screenType
+            else:
+                logger.warning("No %r screened substructure search database available", screenType)
         endTime = time.time()
         logger.info("Loaded %d definitions (%.4f seconds)", self.__oeMolDb.NumMols(), endTime - startTime)
         logger.debug("self.__oeMolDbTitleD %s", list(self.__oeMolDbTitleD.items())[:5])
 
+    def getScreenType(self):
+        """Return the screen type of the loaded screened substructure search database (or None)."""
+        return self.__screenType
+
+    def close(self):
+        """Stop the persistent search pool worker processes."""
+        if self.__pool:
+            self.__pool.close()
+            self.__pool = None
+
+    def startPool(self, numProc=None):
+        """Start the persistent search pool worker processes (e.g. on reload before the process runs threads).
+
+        Args:
+            numProc (int, optional): number of worker processes. Defaults to None (numProc of the search utilities).
+
+        Returns:
+            bool: True for success or False otherwise
+        """
+        try:
+            if not self.__oeMolDbFilePath:
+                return False
+            return self.__getPool(numProc if numProc else self.__numProc) is not None
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+        return False
+
+    def getPoolStatus(self):
+        """Return the start method, number of workers, shared target families (see OePreparedMolCache.getStatus())
+        and the memory of each worker (see OeSubStructSearchPool.getWorkerMemory()) of the persistent search pool.
+
+        Returns:
+            (dict): {"startMethod": <str>, "numProc": <int>, "targets": {<family>: {...}, ...}, "workers": {<pid>: {...}, ...}}
+                    or an empty dictionary if the pool is not running
+        """
+        try:
+            if not self.__pool:
+                return {}
+            return {
+                "startMethod": self.__pool.getStartMethod(),
+                "numProc": self.__pool.getNumProc(),
+                "targets": self.__poolMolCache.getStatus() if self.__poolMolCache else {},
+                "workers": self.__pool.getWorkerMemory(),
+            }
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+        return {}
+
+    def __getPool(self, numProc):
+        """Return the persistent search pool (restarted for a change in the number of processes).  Pools started by
+        fork share the decoded molecule database targets built here in the parent process.
+        """
+        if self.__pool and self.__pool.getNumProc() != numProc:
+            self.close()
+        if not self.__pool:
+            startMethod = self.__mpStartMethod if self.__mpStartMethod else "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+            if startMethod == "fork":
+                if self.__poolMolCache is None:
+                    molCache = self.__prepMolCache if self.__prepMolCache is not None else OePreparedMolCache(self.__oeMolDb)
+                    if molCache.prepareDecoded():
+                        self.__poolMolCache = molCache
+                prepMolCache = self.__poolMolCache if self.__poolMolCache is not None else self.__prepMolCache
+            else:
+                logger.info("Search pool workers (%s) decode the molecule database targets for each query", startMethod)
+                prepMolCache = self.__prepMolCache
+            self.__pool = OeSubStructSearchPool(self.__oeMolDbFilePath, numProc=numProc, prepMolCache=prepMolCache, startMethod=startMethod)
+        return self.__pool
+
     def testCache(self):
         """Check for existence of data dependencies and non-zero content counts
 
@@ -135,26 +541,24 @@ class OeSubStructSearchUtils(object):
         logger.info("Return status %r", ok)
         return ok
 
-    def prefilterIndex(self, oeQueryMol, idxP, matchOpts="relaxed"):
-        """Filter the full search index base on minimum chemical formula an feature criteria.
+    def getQueryCriteria(self, oeQueryMol, matchOpts):
+        """Return the element count, feature count and structural key prefilter criteria for the input query molecule.
 
         Args:
-            oeQueryMol (object): search target moleculed (OEMol)
-            idxP (object): instance ChemCompSearchIndexProvider()
-            matchOpts (str, optional): search criteria options. Defaults to "default".
+            oeQueryMol (object): query molecule OeGraphMol or OeQmol
+            matchOpts (str): search criteria options (e.g. sub-struct-graph-relaxed)
 
         Returns:
-            (list): list of chemical component identifiers in the filtered search space
+            (dict, dict, str): element minimum counts, feature minimum counts and structural keys (or None)
         """
-        startTime = time.time()
         oemf = OeMoleculeFactory()
         oemf.setOeMol(oeQueryMol, "queryTarget")
         typeCountD = oemf.getElementCounts(useSymbol=True)
-        # ccIdL1 = idxP.filterMinimumMolecularFormula(typeCountD)
-        #
         featureCountD = oemf.getFeatureCounts()
+        # Query molecules (e.g. from SMARTS) may carry atom and bond expressions not captured by path keys
+        ssKeys = None if isinstance(oeQueryMol, oechem.OEQMolBase) else oemf.getSubStructKeys()
         # Adjust filter according to search options
-        if matchOpts in matchOpts in ["relaxed", "graph-relaxed", "simple", "sub-struct-graph-relaxed"]:
+        if matchOpts in ["relaxed", "graph-relaxed", "simple", "sub-struct-graph-relaxed"]:
             for ky in ["rings_ar", "at_ar", "at_ch"]:
                 featureCountD.pop(ky, None)
         elif matchOpts in ["relaxed-stereo", "graph-relaxed-stereo", "sub-struct-graph-relaxed-stereo"]:
@@ -162,19 +566,276 @@ class OeSubStructSearchUtils(object):
                 featureCountD.pop(ky, None)
         elif matchOpts in ["default", "strict", "graph-strict", "graph-default", "sub-struct-graph-strict"]:
             pass
-        ccIdL = idxP.filterMinimumFormulaAndFeatures(typeCountD, featureCountD)
-        logger.info("Pre-filtering results for formula+feature %d (%.4f seconds)", len(ccIdL), time.time() - startTime)
+        return typeCountD, featureCountD, ssKeys
+
+    def prefilterIndex(self, oeQueryMol, idxP, matchOpts="relaxed", partitionD=None):
+        """Filter the full search index base on minimum chemical formula an feature criteria.
+
+        Args:
+            oeQueryMol (object): search target moleculed (OEMol)
+            idxP (object): instance ChemCompSearchIndexProvider()
+            matchOpts (str, optional): search criteria options. Defaults to "default".
+            partitionD (dict, optional): partition filter (e.g. {"source": "CCD", "status": "REL"}). Defaults to None.
+
+        Returns:
+            (list): list of chemical component identifiers in the filtered search space
+        """
+        startTime = time.time()
+        typeCountD, featureCountD, ssKeys = self.getQueryCriteria(oeQueryMol, matchOpts)
+        ccIdL = idxP.filterMinimumFormulaAndFeatures(typeCountD, featureCountD, ssKeys=ssKeys, partitionD=partitionD)
+        logger.info("Pre-filtering results for formula+feature+keys %d (%.4f seconds)", len(ccIdL), time.time() - startTime)
         return ccIdL
 
-    def searchSubStructure(self, oeQueryMol, idxList=None, ccIdList=None, reverseFlag=False, matchOpts="graph-relaxed", numProc=1):
+    def prefilterDbIndex(self, oeQueryMol, idxP, matchOpts="relaxed", partitionD=None, queryCriteria=None):
+        """Filter the full search index base on minimum chemical formula an feature criteria returning
+        OE molecule database indices suitable for input to searchSubStructure(idxList=...).
+
+        The filter is evaluated as vectorized comparisons over the columnar formula index of the
+        input provider (including the structural key subset test when the index carries ss-keys)
+        and the selected rows are mapped directly to molecule database indices.
+
+        Args:
+            oeQueryMol (object): search target moleculed (OEMol)
+            idxP (object): instance ChemCompSearchIndexProvider()
+            matchOpts (str, optional): search criteria options. Defaults to "default".
+            partitionD (dict, optional): partition filter (e.g. {"source": "CCD", "status": "REL"}). Defaults to None.
+            queryCriteria (tuple, optional): query criteria from getQueryCriteria() (computed if not provided). Defaults to None.
+
+        Returns:
+            (list): list of OE molecule database indices (ascending) in the filtered search space
+        """
+        startTime = time.time()
+        typeCountD, featureCountD, ssKeys = queryCriteria if queryCriteria else self.getQueryCriteria(oeQueryMol, matchOpts)
+        if not typeCountD or not featureCountD:
+            typeCountD = featureCountD = None
+        dbIdxL = self.filterDbIndex(idxP, typeCountD, featureCountD, ssKeys=ssKeys, partitionD=partitionD)
+        logger.info("Pre-filtering results for formula+feature+keys %d (%.4f seconds)", len(dbIdxL), time.time() - startTime)
+        return dbIdxL
+
+    def partitionDbIndex(self, idxP, partitionD):
+        """Return the OE molecule database indices (ascending) of the definitions in the input index partition.
+
+        Args:
+            idxP (object): instance ChemCompSearchIndexProvider()
+            partitionD (dict): partition filter (e.g. {"source": "CCD", "status": "REL"})
+
+        Returns:
+            (list): list of OE molecule database indices
+        """
+        return self.filterDbIndex(idxP, None, None, partitionD=partitionD)
+
+    def filterDbIndex(self, idxP, typeCountD, featureCountD=None, ssKeys=None, partitionD=None):
+        """Return the OE molecule database indices (ascending) of the definitions selected by the input minimum
+        element, feature and structural key criteria (see ChemCompFormulaIndex.filterMinimum()).
+
+        Args:
+            idxP (object): instance ChemCompSearchIndexProvider()
+            typeCountD (dict): element minimum counts (or None)
+            featureCountD (dict, optional): feature minimum counts. Defaults to None.
+            ssKeys (str, optional): structural key bitset (hexadecimal string). Defaults to None.
+            partitionD (dict, optional): partition filter (e.g. {"source": "CCD", "status": "REL"}). Defaults to None.
+
+        Returns:
+            (list): list of OE molecule database indices
+        """
+        fIdx = idxP.getFormulaIndex()
+        dbIdxA = self.__getDbIndexMap(fIdx)[fIdx.filterMinimum(typeCountD, featureCountD, ssKeys=ssKeys, partitionD=partitionD)]
+        return np.sort(dbIdxA[dbIdxA >= 0]).tolist()
+
+    def __getDbIndexMap(self, fIdx):
+        """Return the (cached) array mapping formula index rows to molecule database indices (-1 if not loaded)."""
+        if self.__dbIdxMapT[0] is not fIdx:
+            idxA = np.array([self.__oeMolDbTitleD.get(searchCcId, -1) for searchCcId in fIdx.getIdList()], dtype=np.int64)
+            self.__dbIdxMapT = (fIdx, idxA)
+        return self.__dbIdxMapT[1]
+
+    def __getDbHeavyAtomCounts(self, fIdx):
+        """Return the (cached) formula index heavy atom counts by molecule database index (-1 if not indexed)."""
+        if self.__dbSizeT[0] is not fIdx:
+            dbIdxA = self.__getDbIndexMap(fIdx)
+            keepA = dbIdxA >= 0
+            sizeA = np.full(self.__oeMolDb.GetMaxMolIdx(), -1, dtype=np.int64)
+            sizeA[dbIdxA[keepA]] = fIdx.getHeavyAtomCounts()[keepA]
+            self.__dbSizeT = (fIdx, sizeA)
+        return self.__dbSizeT[1]
+
+    def orderDbIndex(self, idxList, idxP):
+        """Return the input molecule database indices in order of increasing heavy atom count (ties in index order).
+
+        Smaller candidates are more fully covered by a query substructure, so this order approximates the
+        order of decreasing substructure match score.  Indices absent from the formula index are placed last.
+
+        Args:
+            idxList (list): OE molecule database indices
+            idxP (object): instance ChemCompSearchIndexProvider()
+
+        Returns:
+            (list): ordered OE molecule database indices
+        """
+        sizeA = self.__getDbHeavyAtomCounts(idxP.getFormulaIndex())
+        idxA = np.asarray(idxList, dtype=np.int64)
+        keyA = np.where(sizeA[idxA] >= 0, sizeA[idxA], np.iinfo(np.int32).max)
+        return idxA[np.lexsort((idxA, keyA))].tolist()
+
+    def iterSubStructure(self, oeQueryMol, idxP=None, idxList=None, ccIdList=None, matchOpts="graph-relaxed", limit=None, offset=0, cursor=None):
+        """Yield a page of graph matches for the input query molecule.  With an index provider the candidates are
+        tested in order of increasing heavy atom count (approximately decreasing match score) and otherwise in input
+        order.  Matching stops when the page is complete, and a cursor resumes with the candidate following the last
+        match of the previous page, so paging through a broad hit list costs only the pages requested.  Molecules
+        are read from the molecule database when the oeMol of a result is first accessed.
+
+        Args:
+            oeQueryMol (object): query molecule OeGraphMol or OeQmol
+            idxP (object, optional): instance ChemCompSearchIndexProvider() providing candidate sizes. Defaults to None.
+            idxList (list, optional): candidate molecule database indices (e.g. from prefilterDbIndex()). Defaults to None (all).
+            ccIdList (list, optional): candidate search identifiers used in place of idxList. Defaults to None.
+            matchOpts (str, optional): graph match criteria type (graph-strict|graph-relaxed|graph-relaxed-stereo). Defaults to "graph-relaxed".
+            limit (int, optional): maximum number of results. Defaults to None (all).
+            offset (int, optional): number of leading matches skipped. Defaults to 0.
+            cursor (tuple, optional): cursor of the last result of the previous page (LazyMatchResults.getCursor()) used in place of offset. Defaults to None.
+
+        Yields:
+            (LazyMatchResults): graph match results (fpScore is the fraction of the candidate atoms matched by the query)
+        """
+        try:
+            if ccIdList:
+                idxList = [self.__oeMolDbTitleD[ccId] for ccId in ccIdList if ccId in self.__oeMolDbTitleD]
+                if not idxList:
+                    return
+            searchType = "prefilterd-substructure" if idxList else "exhaustive-substructure"
+            candL = list(idxList) if idxList else list(range(self.__oeMolDb.GetMaxMolIdx()))
+            if idxP:
+                candL = self.orderDbIndex(candL, idxP)
+            matchIt = iterGraphMatches(self.__oeMolDb, oeQueryMol, candL, matchOpts=matchOpts, offset=offset, cursor=cursor, prepMolCache=self.__prepMolCache)
+            for pos, idx, score in itertools.islice(matchIt, limit):
+                yield LazyMatchResults(ccId=self.__oeMolDb.GetTitle(idx), searchType=searchType, matchOpts=matchOpts, fpScore=score, oeIdx=idx).setSource(self.__oeMolDb, (pos, idx))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+
+    def searchSubStructure(self, oeQueryMol, idxList=None, ccIdList=None, reverseFlag=False, matchOpts="graph-relaxed", numProc=1, maxHits=None, timeoutSeconds=None, cancelToken=None):
+        """Perform a graph match for the input query molecule on the binary database of molecules (optionally
+        restricted to the input candidates).
+
+        The hit limit, time budget and cancellation token are honoured by each worker at every candidate.  Single
+        process and persistent pool searches return the first maxHits matches in candidate order; per-query
+        multi-process searches (usePool=False or query molecules) return maxHits of the matches found.  The reason
+        a search stops early is recorded on the cancellation token (see SearchCancelToken.isPartial()).
+
+        Args:
+            oeQueryMol (object): query molecule OeGraphMol or OeQmol
+            idxList (list, optional): candidate molecule database indices. Defaults to None (all).
+            ccIdList (list, optional): candidate search identifiers used in place of idxList. Defaults to None.
+            reverseFlag (bool, optional): return non-matching candidates (single process searches). Defaults to False.
+            matchOpts (str, optional): graph match criteria type (graph-strict|graph-relaxed|graph-relaxed-stereo). Defaults to "graph-relaxed".
+            numProc (int, optional): number of processes. Defaults to 1.
+            maxHits (int, optional): maximum number of matches. Defaults to None (no limit).
+            timeoutSeconds (float, optional): search time budget in seconds. Defaults to None (no limit).
+            cancelToken (obj, optional): cancellation token (SearchCancelToken) recording whether results are partial. Defaults to None.
+
+        Returns:
+            (bool, list): status, graph match results of type (MatchResults)
+        """
+        deadline = time.time() + timeoutSeconds if timeoutSeconds else None
         if ccIdList:
             idxList = [self.__oeMolDbTitleD[ccId] for ccId in ccIdList if ccId in self.__oeMolDbTitleD]
         if numProc == 1:
-            return self.__searchSubStructure(oeQueryMol, idxList=idxList, reverseFlag=reverseFlag, matchOpts=matchOpts)
+            retStatus, hL, stopReason = self.__searchSubStructure(
+                oeQueryMol, idxList=idxList, reverseFlag=reverseFlag, matchOpts=matchOpts, maxHits=maxHits, deadline=deadline, cancelToken=cancelToken
+            )
         else:
-            return self.__searchSubStructureMulti(oeQueryMol, idxList=idxList, matchOpts=matchOpts, numProc=numProc, maxChunkSize=self.__chunkSize)
+            retStatus, hL, stopReason = self.__searchSubStructureMulti(
+                oeQueryMol, idxList=idxList, matchOpts=matchOpts, numProc=numProc, maxChunkSize=self.__chunkSize, maxHits=maxHits, deadline=deadline, cancelToken=cancelToken
+            )
+        if stopReason:
+            logger.info("Substructure search stopped (%s) with %d partial results", stopReason, len(hL))
+            if cancelToken:
+                cancelToken.setStopReason(stopReason)
+        return retStatus, hL
 
-    def __searchSubStructureMulti(self, oeQueryMol, idxList, matchOpts="graph-relaxed", numProc=2, maxChunkSize=10):
+    def searchSubStructureScreened(self, oeQueryMol, matchOpts="graph-relaxed", idxList=None, maxHits=None, cancelToken=None, idxP=None):
+        """Perform a screened substructure search (OESubSearchDatabase) for the input query molecule.
+
+        Query molecules are built with the atom and bond expressions of the match options and searched with the
+        multi-threaded OE screened search (numProc threads).  Matches are mapped to molecule database indices through
+        their titles and optionally restricted to the input candidates (e.g. from partitionDbIndex()).  The OE search
+        is not interruptible, so cancellation is honoured only before the search starts.  Match scores use the heavy atom
+        counts of the formula index (idxP) so matched molecules are read from the molecule database only for definitions
+        absent from the index.
+
+        Args:
+            oeQueryMol (object): query molecule OeGraphMol or OeQmol
+            matchOpts (str, optional): graph match criteria type (graph-strict|graph-relaxed|graph-relaxed-stereo). Defaults to "graph-relaxed".
+            idxList (list, optional): restrict matches to these molecule database indices. Defaults to None (all).
+            maxHits (int, optional): maximum number of matches. Defaults to None (no limit).
+            cancelToken (obj, optional): cancellation token (SearchCancelToken) recording whether results are partial. Defaults to None.
+            idxP (object, optional): instance ChemCompSearchIndexProvider() providing candidate sizes. Defaults to None.
+
+        Returns:
+            (bool, list): status, graph match results of type (MatchResults) with searchType "screened-substructure"
+        """
+        hL = []
+        retStatus = False
+        stopReason = None
+        startTime = time.time()
+        try:
+            if not self.__ssDb:
+                logger.error("No screened substructure search database loaded")
+                return retStatus, hL
+            if cancelToken and cancelToken.isCancelled():
+                cancelToken.setStopReason("cancelled")
+                return True, hL
+            if isinstance(oeQueryMol, oechem.OEQMolBase):
+                oeQMol = oeQueryMol
+            else:
+                atomexpr, bondexpr = OeCommonUtils.getAtomBondExprOpts(matchOpts)
+                oeQMol = oechem.OEQMol(oeQueryMol)
+                oeQMol.BuildExpressions(atomexpr, bondexpr)
+            # with a candidate restriction the hit limit is applied to the filtered matches
+            query = oechem.OESubSearchQuery(oeQMol, maxHits if maxHits and idxList is None else 0)
+            result = oechem.OESubSearchResult()
+            status = self.__ssDb.Search(result, query)
+            statusText = oechem.OESubSearchStatusToName(status)
+            if statusText.upper() != "FINISHED":
+                logger.error("Screened search failing with status %r", statusText)
+                return retStatus, hL
+            #
+            candS = set(idxList) if idxList is not None else None
+            sizeA = self.__getDbHeavyAtomCounts(idxP.getFormulaIndex()) if idxP else None
+            for index in result.GetMatchIndices():
+                ccId = self.__ssDb.GetTitle(index)
+                idx = self.__oeMolDbTitleD.get(ccId, None)
+                if idx is None or (candS is not None and idx not in candS):
+                    continue
+                if maxHits and len(hL) >= maxHits:
+                    stopReason = "maxHits"
+                    break
+                numAtoms = int(sizeA[idx]) if sizeA is not None else -1
+                if numAtoms < 0:
+                    mol = oechem.OEGraphMol()
+                    if not self.__oeMolDb.GetMolecule(mol, idx):
+                        logger.error("Unable to read molecule %r at index %r", ccId, idx)
+                        continue
+                    numAtoms = mol.NumAtoms()
+                score = float(oeQueryMol.NumAtoms()) / float(max(1, numAtoms))
+                hL.append(MatchResults(ccId=ccId, searchType="screened-substructure", matchOpts=matchOpts, screenType=self.__screenType, fpScore=score, oeIdx=idx))
+            if maxHits and result.NumTotalMatches() > result.NumMatches():
+                stopReason = "maxHits"
+            if stopReason and cancelToken:
+                cancelToken.setStopReason(stopReason)
+            logger.info(
+                "Screened substructure search returns %d (targets %d screened %d searched %d) (%.4f seconds)",
+                len(hL),
+                result.NumTargets(),
+                result.NumScreened(),
+                result.NumSearched(),
+                time.time() - startTime,
+            )
+            retStatus = True
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+        return retStatus, hL
+
+    def __searchSubStructureMulti(self, oeQueryMol, idxList, matchOpts="graph-relaxed", numProc=2, maxChunkSize=10, maxHits=None, deadline=None, cancelToken=None):
         #
         try:
             startTime = time.time()
@@ -184,12 +845,46 @@ class OeSubStructSearchUtils(object):
             idxList = idxList if idxList else list(range(self.__oeMolDb.GetMaxMolIdx()))
             #
             hL = []
-            rWorker = OeSubStructSearchWorker(oeQueryMol, self.__oeMolDb, matchOpts=matchOpts)
-            mpu = MultiProcUtil(verbose=True)
-            optD = {"maxChunkSize": maxChunkSize}
-            mpu.setOptions(optD)
-            mpu.set(workerObj=rWorker, workerMethod="subStructureSearch")
-            _, _, resultList, _ = mpu.runMulti(dataList=idxList, numProc=numProc, numResults=2, chunkSize=maxChunkSize)
+            stopReason = None
+            # query molecules (e.g. from SMARTS) are not serialized to the persistent pool workers
+            if self.__oeMolDbFilePath and not isinstance(oeQueryMol, oechem.OEQMolBase):
+                idxL, scoreL, stopReason = self.__getPool(numProc).search(oeQueryMol, idxList, matchOpts=matchOpts, maxHits=maxHits, deadline=deadline, cancelToken=cancelToken)
+                resultList = [idxL, scoreL]
+            else:
+                # cancellation flag and hit counter shared with the worker processes (inherited on start)
+                cancelA = multiprocessing.RawArray("q", 1)
+                hitCount = multiprocessing.Value("q", 0) if maxHits else None
+
+                def cancelWorkers():
+                    cancelA[0] = 1
+
+                rWorker = OeSubStructSearchWorker(
+                    oeQueryMol,
+                    self.__oeMolDb,
+                    matchOpts=matchOpts,
+                    prepMolCache=self.__prepMolCache,
+                    maxHits=maxHits,
+                    hitCount=hitCount,
+                    deadline=deadline,
+                    cancelA=cancelA,
+                    cancelSlot=0,
+                    cancelId=1,
+                )
+                mpu = MultiProcUtil(verbose=True)
+                optD = {"maxChunkSize": maxChunkSize}
+                mpu.setOptions(optD)
+                mpu.set(workerObj=rWorker, workerMethod="subStructureSearch")
+                if cancelToken:
+                    cancelToken.addCallback(cancelWorkers)
+                try:
+                    _, _, resultList, diagList = mpu.runMulti(dataList=idxList, numProc=numProc, numResults=2, chunkSize=maxChunkSize)
+                finally:
+                    if cancelToken:
+                        cancelToken.removeCallback(cancelWorkers)
+                stopReason = next((reason for reason in STOP_REASONS if reason in diagList), None)
+                if maxHits and len(resultList[0]) > maxHits:
+                    resultList = [resultList[0][:maxHits], resultList[1][:maxHits]]
+                    stopReason = stopReason if stopReason else "maxHits"
             logger.debug("Multi-proc result length %d/%d", len(resultList[0]), len(resultList[1]))
             for idx, score in zip(resultList[0], resultList[1]):
                 ccId = self.__oeMolDb.GetTitle(idx)
@@ -197,11 +892,13 @@ class OeSubStructSearchUtils(object):
             retStatus = True
         except Exception as e:
             logger.exception("Failing with %s", str(e))
+            # discard a (possibly broken) worker pool
+            self.close()
             retStatus = False
         logger.info("Substructure search returns %d (%.4f seconds)", len(hL), time.time() - startTime)
-        return retStatus, hL
+        return retStatus, hL, stopReason
 
-    def __searchSubStructure(self, oeQueryMol, idxList=None, reverseFlag=False, matchOpts="graph-relaxed"):
+    def __searchSubStructure(self, oeQueryMol, idxList=None, reverseFlag=False, matchOpts="graph-relaxed", maxHits=None, deadline=None, cancelToken=None):
         """Perform a graph match for the input query molecule on the binary
         database of molecules.  The search optionally restricted to the input index
         list.   The sense of the search may be optionally reversed.
@@ -211,11 +908,15 @@ class OeSubStructSearchUtils(object):
             idxList ([type], optional): [description]. Defaults to None.
             reverseFlag (bool, optional): [description]. Defaults to False.
             matchOpts (str, optional): graph match criteria type (graph-strict|graph-relaxed|graph-relaxed-stereo). Defaults to "graph-relaxed".
+            maxHits (int, optional): maximum number of matches. Defaults to None (no limit).
+            deadline (float, optional): stop time (time.time()). Defaults to None (no limit).
+            cancelToken (obj, optional): cancellation token (SearchCancelToken). Defaults to None.
 
         Returns:
-            [type]: [description]
+            (bool, list, str): status, graph match results and the reason the search stopped early (or None)
         """
         hL = []
+        stopReason = None
         retStatus = True
         startTime = time.time()
         try:
@@ -225,20 +926,26 @@ class OeSubStructSearchUtils(object):
             if not ss.IsValid():
                 retStatus = False
                 logger.error("Unable to initialize substructure search!")
-                return retStatus, hL
+                return retStatus, hL, stopReason
             #
             searchType = "exhaustive-substructure"
             if idxList:
                 searchType = "prefilterd-substructure"
             idxIt = idxList if idxList else range(self.__oeMolDb.GetMaxMolIdx())
+            usePrep = self.__prepMolCache is not None and self.__prepMolCache.hasMatchOpts(matchOpts, oeQueryMol)
 
             for idx in idxIt:
-                mol = oechem.OEGraphMol()
+                stopReason = getStopReason(len(hL), maxHits=maxHits, deadline=deadline, cancelled=cancelToken is not None and cancelToken.isCancelled())
+                if stopReason:
+                    break
                 ccId = self.__oeMolDb.GetTitle(idx)
-                if not self.__oeMolDb.GetMolecule(mol, idx):
-                    logger.error("Unable to read molecule %r at index %r", ccId, idx)
-                    continue
-                oechem.OEPrepareSearch(mol, ss)
+                mol = self.__prepMolCache.getMol(idx, matchOpts) if usePrep else None
+                if mol is None:
+                    mol = oechem.OEGraphMol()
+                    if not self.__oeMolDb.GetMolecule(mol, idx):
+                        logger.error("Unable to read molecule %r at index %r", ccId, idx)
+                        continue
+                    oechem.OEPrepareSearch(mol, ss)
                 if ss.SingleMatch(mol) != reverseFlag:
                     score = float(oeQueryMol.NumAtoms()) / float(mol.NumAtoms())
                     # hL.append(MatchResults(ccId=ccId, oeMol=mol, searchType=searchType, matchOpts=matchOpts))
@@ -249,4 +956,4 @@ class OeSubStructSearchUtils(object):
             logger.exception("Failing with %s", str(e))
         #
         logger.info("Substructure search returns %d (%.4f seconds)", len(hL), time.time() - startTime)
-        return retStatus, hL
+        return retStatus, hL, stopReason
@@ -5,6 +5,7 @@
 # Update:
 #   2-Oct-2019 jdw adapted from PdbxChemCompPersist()
 #   7-Nov-2019 jdw add alternate charge and formula methods
+#  18-Oct-2026 jdw add source and index partition attribute methods
 ##
 """
 A collection of access and iterator classes supporting chemical component dictionary data.
@@ -196,6 +197,19 @@ class PdbxChemCompPersist(object):
     def getMissingIdealCoordinates(self):
         return self.__getAttribute("pdbx_ideal_coordinates_missing_flag")
 
+    def getSource(self):
+        """Return the definition source (BIRD for PRD_ identifiers and CCD otherwise)."""
+        tId = self.getId()
+        return "BIRD" if tId and tId.startswith("PRD_") else "CCD"
+
+    def getPartitionAttributes(self):
+        """Return the index partition attributes {"source": ..., "type": ..., "status": ...} (upper case, unassigned values omitted)."""
+        rD = {"source": self.getSource()}
+        for ky, tS in [("type", self.getType()), ("status", self.getReleaseStatus())]:
+            if tS and tS.strip() not in [".", "?"]:
+                rD[ky] = tS.strip().upper()
+        return rD
+
 
 class PdbxChemCompAtomPersist(object):
     """Accessor methods chemical component atom attributes."""
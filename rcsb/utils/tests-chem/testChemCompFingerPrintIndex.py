@@ -0,0 +1,171 @@
+##
+# File:    ChemCompFingerPrintIndexTests.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Update:
+#  18-Oct-2026 jdw add batch scoring test
+#  18-Oct-2026 jdw add write and memory-mapped load test
+#  18-Oct-2026 jdw add folded index and rescoring test
+#  18-Oct-2026 jdw add checksum check
+#  18-Oct-2026 jdw check batch scoring with chunks sized from the temporary memory budget
+#
+##
+"""
+Tests for the packed (NumPy) fingerprint index supporting Tanimoto similarity searches.
+
+"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "jwest@rcsb.rutgers.edu"
+__license__ = "Apache 2.0"
+
+import logging
+import os
+import time
+import unittest
+
+import numpy as np
+
+from rcsb.utils.chem import __version__
+from rcsb.utils.chem.ChemCompFingerPrintIndex import ChemCompFingerPrintIndex, popCount
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+
+
+class ChemCompFingerPrintIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.__startTime = time.time()
+        rng = np.random.default_rng(2026)
+        self.__numFp = 5000
+        self.__numWords = 16
+        densityA = rng.uniform(0.01, 0.3, size=(self.__numFp, 1))
+        bitA = rng.random((self.__numFp, self.__numWords * 64)) < densityA
+        self.__fpA = np.packbits(bitA, axis=1, bitorder="little").view(np.uint64)
+        self.__idxL = list(range(10, 10 + self.__numFp))
+        logger.debug("Running tests on version %s", __version__)
+        logger.info("Starting %s at %s", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        endTime = time.time()
+        logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def __scanScores(self, queryFp, minScore=None, maxResults=0, idxList=None):
+        """Reference implementation of the Tanimoto search (full scan)."""
+        interA = popCount(self.__fpA & queryFp)
+        unionA = int(popCount(queryFp)) + popCount(self.__fpA) - interA
+        scoreA = np.divide(interA, unionA, out=np.zeros(len(interA)), where=unionA > 0)
+        idxS = set(idxList) if idxList is not None else None
+        rL = [(idx, score) for idx, score in zip(self.__idxL, scoreA.tolist()) if score >= (minScore or 0.0) and (idxS is None or idx in idxS)]
+        rL.sort(key=lambda tup: (-tup[1], tup[0]))
+        return rL[:maxResults] if maxResults else rL
+
+    def testSortedScores(self):
+        """Test pruned Tanimoto searches against a reference scan."""
+        fpIdx = ChemCompFingerPrintIndex(self.__fpA, self.__idxL, fpType="TEST", blockSize=256)
+        self.assertEqual(len(fpIdx), self.__numFp)
+        self.assertEqual(fpIdx.getNumWords(), self.__numWords)
+        self.assertEqual(fpIdx.getBitCounts().tolist(), popCount(self.__fpA).tolist())
+        for ii, (minScore, maxResults) in enumerate([(None, 0), (0.3, 0), (0.5, 10), (0.8, 50), (None, 25), (0.0, 1)]):
+            queryFp = self.__fpA[ii * 101]
+            idxList = self.__idxL[::7] if ii % 2 else None
+            rL = fpIdx.getSortedScores(queryFp, minScore=minScore, maxResults=maxResults, idxList=idxList)
+            tL = self.__scanScores(queryFp, minScore=minScore, maxResults=maxResults, idxList=idxList)
+            self.assertEqual([tup[0] for tup in rL], [tup[0] for tup in tL])
+            self.assertTrue(np.allclose([tup[1] for tup in rL], [tup[1] for tup in tL]))
+            if idxList is None:
+                self.assertEqual(rL[0], (self.__idxL[ii * 101], 1.0))
+        #
+        self.assertEqual(fpIdx.getSortedScores(np.zeros(self.__numWords, dtype=np.uint64), minScore=0.1), [])
+        self.assertEqual(fpIdx.getSortedScores(self.__fpA[0], idxList=[]), [])
+
+    def testSortedScoresBatch(self):
+        """Test blocked (query x database) batch scoring against single query searches."""
+        fpIdx = ChemCompFingerPrintIndex(self.__fpA, self.__idxL)
+        queryFpA = self.__fpA[[3, 77, 500, 1200, 12, 13]]
+        # explicit chunk size, chunks of 50 fingerprints from the temporary memory budget and the default budget
+        chunkOptsL = [{"chunkSize": 700}, {"maxChunkBytes": len(queryFpA) * self.__numWords * 8 * 50}, {}]
+        for minScore, maxResults, idxList in [(None, 0, None), (0.4, 10, None), (0.6, 0, self.__idxL[::3]), (0.0, 5, None)]:
+            for chunkOptsD in chunkOptsL:
+                rLL = fpIdx.getSortedScoresBatch(queryFpA, minScore=minScore, maxResults=maxResults, idxList=idxList, **chunkOptsD)
+                self.assertEqual(len(rLL), len(queryFpA))
+                for queryFp, rL in zip(queryFpA, rLL):
+                    tL = fpIdx.getSortedScores(queryFp, minScore=minScore, maxResults=maxResults, idxList=idxList)
+                    self.assertEqual([tup[0] for tup in rL], [tup[0] for tup in tL])
+                    self.assertTrue(np.allclose([tup[1] for tup in rL], [tup[1] for tup in tL]))
+        self.assertEqual(fpIdx.getSortedScoresBatch(np.zeros((0, self.__numWords), dtype=np.uint64)), [])
+
+    def testWriteLoad(self):
+        """Test write and memory-mapped load of the packed fingerprint index."""
+        filePath = os.path.join(HERE, "test-output", "test-packed-fp-database-TEST.npy")
+        fpIdx = ChemCompFingerPrintIndex(self.__fpA, self.__idxL, fpType="TEST")
+        ok = fpIdx.write(filePath)
+        self.assertTrue(ok)
+        for mmapMode in ["r", None]:
+            fpIdxR = ChemCompFingerPrintIndex.load(filePath, fpType="TEST", mmapMode=mmapMode)
+            self.assertEqual(len(fpIdxR), len(fpIdx))
+            self.assertEqual(fpIdxR.getFpType(), "TEST")
+            self.assertEqual(fpIdxR.getBitCounts().tolist(), fpIdx.getBitCounts().tolist())
+            self.assertEqual(fpIdxR.getChecksum(), fpIdx.getChecksum())
+            for queryFp in self.__fpA[[5, 50, 500]]:
+                self.assertEqual(fpIdxR.getSortedScores(queryFp, minScore=0.3, maxResults=20), fpIdx.getSortedScores(queryFp, minScore=0.3, maxResults=20))
+        self.assertEqual(ChemCompFingerPrintIndex.load(os.path.join(HERE, "test-output", "missing-fp-database.npy")), None)
+
+    def testFoldedIndex(self):
+        """Test folded fingerprint screening with full length rescoring."""
+        fpIdx = ChemCompFingerPrintIndex(self.__fpA, self.__idxL, fpType="TEST")
+        foldA = ChemCompFingerPrintIndex.foldFingerPrints(self.__fpA, 4)
+        self.assertEqual(foldA.shape, (self.__numFp, 4))
+        self.assertEqual(foldA[0].tolist(), np.bitwise_or.reduce(self.__fpA[0].reshape(4, 4), axis=0).tolist())
+        self.assertTrue(np.all(popCount(foldA) <= popCount(self.__fpA)))
+        self.assertEqual(fpIdx.getFoldedIndex(100), None)
+        self.assertEqual(fpIdx.getFoldedIndex(self.__numWords * 64), None)
+        foldIdx = fpIdx.getFoldedIndex(256, chunkSize=999)
+        self.assertEqual(foldIdx.getNumWords(), 4)
+        self.assertEqual(foldIdx.getBitCounts().tolist(), popCount(foldA).tolist())
+        numFound = numMatches = 0
+        for ii in range(0, self.__numFp, 250):
+            queryFp = self.__fpA[ii]
+            tL = fpIdx.getSortedScores(queryFp, minScore=0.4, maxResults=20)
+            candL = foldIdx.getSortedScores(ChemCompFingerPrintIndex.foldFingerPrints(queryFp, 4), minScore=0.3, maxResults=160)
+            rL = fpIdx.rescore(queryFp, [idx for idx, _ in candL], minScore=0.4, maxResults=20)
+            self.assertEqual(rL[0], (self.__idxL[ii], 1.0))
+            self.assertTrue(set(rL).issubset(set(fpIdx.getSortedScores(queryFp, minScore=0.4))))
+            numMatches += len(tL)
+            numFound += len(set(rL) & set(tL))
+        logger.info("Folded screen recall %d/%d", numFound, numMatches)
+        self.assertGreaterEqual(numFound, 0.9 * numMatches)
+        self.assertEqual(fpIdx.rescore(self.__fpA[0], [self.__idxL[0], -1], minScore=0.5), [(self.__idxL[0], 1.0)])
+        self.assertEqual(fpIdx.rescore(self.__fpA[0], []), [])
+
+    def testPacking(self):
+        """Test fingerprint packing from hexadecimal strings and bit lists."""
+        wordA = ChemCompFingerPrintIndex.packHexString("ff01", 2)
+        self.assertEqual(wordA.dtype, np.uint64)
+        self.assertEqual(len(wordA), 2)
+        self.assertEqual(int(popCount(wordA)), 9)
+        self.assertEqual(int(popCount(ChemCompFingerPrintIndex.packHexString("ff01x", 2, numChars=4))), 9)
+        self.assertEqual(int(popCount(ChemCompFingerPrintIndex.packBits([0, 63, 64, 100], 2))), 4)
+        fpIdx = ChemCompFingerPrintIndex(np.zeros((0, 2), dtype=np.uint64))
+        self.assertEqual(fpIdx.getSortedScores(wordA), [])
+
+
+def fingerPrintIndexSuite():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(ChemCompFingerPrintIndexTests("testSortedScores"))
+    suiteSelect.addTest(ChemCompFingerPrintIndexTests("testSortedScoresBatch"))
+    suiteSelect.addTest(ChemCompFingerPrintIndexTests("testWriteLoad"))
+    suiteSelect.addTest(ChemCompFingerPrintIndexTests("testFoldedIndex"))
+    suiteSelect.addTest(ChemCompFingerPrintIndexTests("testPacking"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    mySuite = fingerPrintIndexSuite()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
@@ -0,0 +1,208 @@
+##
+# File:    ChemCompFormulaIndexTests.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Update:
+#  18-Oct-2026 jdw add feature count filter tests
+#  18-Oct-2026 jdw add structural key screen tests
+#  18-Oct-2026 jdw add partition filter tests
+#  18-Oct-2026 jdw add heavy atom count test
+#  18-Oct-2026 jdw add selectivity estimate tests
+#
+##
+"""
+Tests for the columnar (NumPy) element count index supporting formula searches.
+
+"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "jwest@rcsb.rutgers.edu"
+__license__ = "Apache 2.0"
+
+import logging
+import os
+import time
+import unittest
+
+from rcsb.utils.chem import __version__
+from rcsb.utils.chem.ChemCompFormulaIndex import ChemCompFormulaIndex
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+
+
+class ChemCompFormulaIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.__startTime = time.time()
+        self.__idxD = {
+            "BNZ": {"formula": "C6H6", "type-counts": {"C": 6, "H": 6}, "feature-counts": {"rings": 1, "rings_ar": 1, "at_ar": 6, "bnd_sng": 9, "bnd_dbl": 3}},
+            "ALA": {"formula": "C3H7NO2", "type-counts": {"C": 3, "H": 7, "N": 1, "O": 2}, "feature-counts": {"at_ch": 1, "bnd_sng": 11, "bnd_dbl": 1}},
+            "GLY": {"formula": "C2H5NO2", "type-counts": {"C": 2, "H": 5, "N": 1, "O": 2}, "feature-counts": {"bnd_sng": 8, "bnd_dbl": 1}},
+            "CL": {"formula": "Cl-", "type-counts": {"CL": 1}},
+            "HOH": {"formula": "H2O", "type-counts": {"H": 2, "O": 1}},
+            "EMPTY": {"formula": "", "type-counts": {}},
+        }
+        logger.debug("Running tests on version %s", __version__)
+        logger.info("Starting %s at %s", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        endTime = time.time()
+        logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def __scanRange(self, typeRangeD, matchSubset=False):
+        """Reference implementation of the range query (full Python scan)."""
+        rL = []
+        queryTypeS = set(typeRangeD.keys())
+        for ccId, idxD in self.__idxD.items():
+            tD = idxD["type-counts"]
+            if not matchSubset and set(tD.keys()) != queryTypeS:
+                continue
+            if not queryTypeS.issubset(tD.keys()):
+                continue
+            if all(rangeD.get("min", tD[el]) <= tD[el] <= rangeD.get("max", tD[el]) for el, rangeD in typeRangeD.items()):
+                rL.append(ccId)
+        return rL
+
+    def testMatchRange(self):
+        """Test vectorized formula range queries against a reference scan."""
+        fIdx = ChemCompFormulaIndex(self.__idxD)
+        self.assertEqual(len(fIdx), len(self.__idxD))
+        for typeRangeD in [
+            {"C": {"min": 6, "max": 6}, "H": {"min": 6, "max": 6}},
+            {"C": {"min": 2, "max": 3}, "H": {"min": 5}, "N": {"max": 1}, "O": {"min": 2, "max": 2}},
+            {"C": {"min": 1}},
+            {"O": {"max": 1}},
+            {"CL": {"min": 1, "max": 1}},
+            {"XX": {"min": 1}},
+        ]:
+            for matchSubset in [True, False]:
+                rL = fIdx.getIds(fIdx.matchRange(typeRangeD, matchSubset=matchSubset))
+                self.assertEqual(rL, self.__scanRange(typeRangeD, matchSubset=matchSubset))
+        #
+        self.assertEqual(fIdx.getIds(fIdx.matchRange({"C": {"min": 6, "max": 6}, "H": {"min": 6, "max": 6}})), ["BNZ"])
+        self.assertEqual(fIdx.getIds(fIdx.matchRange({"C": {"min": 2}}, matchSubset=True)), ["BNZ", "ALA", "GLY"])
+        self.assertEqual(len(fIdx.matchRange({})), 0)
+
+    def testFilterMinimum(self):
+        """Test minimum element composition filter."""
+        fIdx = ChemCompFormulaIndex(self.__idxD)
+        self.assertEqual(fIdx.getIds(fIdx.filterMinimum({"C": 3, "O": 1})), ["ALA"])
+        self.assertEqual(fIdx.getIds(fIdx.filterMinimum({"O": 1})), ["ALA", "GLY", "HOH"])
+        self.assertEqual(len(fIdx.filterMinimum({"XX": 1})), 0)
+        self.assertEqual(len(fIdx.filterMinimum({})), len(self.__idxD))
+
+    def testFilterMinimumFeatures(self):
+        """Test minimum element composition and feature count filter."""
+        fIdx = ChemCompFormulaIndex(self.__idxD)
+        self.assertEqual(fIdx.getFeatureList(), ["at_ar", "at_ch", "bnd_dbl", "bnd_sng", "rings", "rings_ar"])
+        self.assertEqual(fIdx.getIds(fIdx.filterMinimum({"C": 2}, {"bnd_dbl": 1})), ["BNZ", "ALA", "GLY"])
+        self.assertEqual(fIdx.getIds(fIdx.filterMinimum({"C": 2}, {"bnd_sng": 9, "bnd_dbl": 1})), ["BNZ", "ALA"])
+        self.assertEqual(fIdx.getIds(fIdx.filterMinimum({"O": 1}, {"at_ch": 1})), ["ALA"])
+        self.assertEqual(fIdx.getIds(fIdx.filterMinimum({"C": 1}, {"rings_ar": 1, "at_ar": 6})), ["BNZ"])
+        self.assertEqual(len(fIdx.filterMinimum({"C": 1}, {"bnd_trp": 1})), 0)
+        self.assertEqual(len(fIdx.filterMinimum({"C": 1}, {"bnd_trp": 0})), 3)
+
+    def testFilterMinimumKeys(self):
+        """Test structural key bitset subset screen."""
+        idxD = {
+            "K1": {"type-counts": {"C": 2}, "ss-keys": "%016x%016x" % (0b1011, 1 << 63)},
+            "K2": {"type-counts": {"C": 2}, "ss-keys": "%016x%016x" % (0b0011, 0)},
+            "K3": {"type-counts": {"C": 2}},
+            "K4": {"type-counts": {"C": 2}, "ss-keys": "%016x%016x" % (0b1000, 1 << 63)},
+        }
+        fIdx = ChemCompFormulaIndex(idxD)
+        self.assertEqual(fIdx.getIds(fIdx.filterMinimum({"C": 1}, ssKeys="%016x%016x" % (0b0011, 0))), ["K1", "K2", "K3"])
+        self.assertEqual(fIdx.getIds(fIdx.filterMinimum({"C": 1}, ssKeys="%016x%016x" % (0b1000, 1 << 63))), ["K1", "K3", "K4"])
+        self.assertEqual(fIdx.getIds(fIdx.filterMinimum(None, ssKeys="%016x%016x" % (0b0100, 0))), ["K3"])
+        self.assertEqual(fIdx.getIds(fIdx.filterMinimum({"C": 1}, ssKeys="%016x%016x" % (0, 0))), ["K1", "K2", "K3", "K4"])
+        # incompatible key length - screen is skipped
+        self.assertEqual(len(fIdx.filterMinimum({"C": 1}, ssKeys="%016x" % 0b0100)), 4)
+        # index without keys - screen is skipped
+        fIdx = ChemCompFormulaIndex(self.__idxD)
+        self.assertEqual(len(fIdx.filterMinimum({}, ssKeys="%016x%016x" % (0b0100, 0))), len(self.__idxD))
+
+    def testPartitions(self):
+        """Test partition (source, type, status) filters."""
+        idxD = {
+            "ATP": {"type-counts": {"C": 10, "N": 5}, "source": "CCD", "type": "NON-POLYMER", "status": "REL"},
+            "ALA": {"type-counts": {"C": 3, "N": 1}, "source": "CCD", "type": "L-PEPTIDE LINKING", "status": "REL"},
+            "XXA": {"type-counts": {"C": 3, "N": 1}, "source": "CCD", "type": "NON-POLYMER", "status": "OBS"},
+            "PRD_000001": {"type-counts": {"C": 30, "N": 5}, "source": "BIRD", "type": "PEPTIDE-LIKE", "status": "REF_ONLY"},
+            "OLD": {"type-counts": {"C": 3, "N": 1}},
+        }
+        fIdx = ChemCompFormulaIndex(idxD)
+        self.assertEqual(fIdx.getPartitionIndex()["source"], {"BIRD": 1, "CCD": 3})
+        self.assertEqual(fIdx.getIds(fIdx.getPartitionRows({"source": "ccd"})), ["ATP", "ALA", "XXA"])
+        self.assertEqual(fIdx.getIds(fIdx.getPartitionRows({"source": "CCD", "status": "REL"})), ["ATP", "ALA"])
+        self.assertEqual(fIdx.getIds(fIdx.getPartitionRows({"type": ["NON-POLYMER", "PEPTIDE-LIKE"]})), ["ATP", "XXA", "PRD_000001"])
+        self.assertEqual(len(fIdx.getPartitionRows({})), len(idxD))
+        self.assertEqual(len(fIdx.getPartitionRows({"source": "XXX"})), 0)
+        self.assertEqual(len(fIdx.getPartitionRows({"unknown": "XXX"})), 0)
+        self.assertEqual(fIdx.getIds(fIdx.filterMinimum({"C": 3}, partitionD={"status": "REL"})), ["ATP", "ALA"])
+        self.assertEqual(fIdx.getIds(fIdx.matchRange({"C": {"min": 3, "max": 3}, "N": {"min": 1}}, partitionD={"source": "CCD"})), ["ALA", "XXA"])
+        self.assertEqual(fIdx.getIds(fIdx.matchRange({"C": {"min": 3, "max": 3}, "N": {"min": 1}})), ["ALA", "XXA", "OLD"])
+
+    def testHeavyAtomCounts(self):
+        """Test heavy (non-hydrogen) atom counts."""
+        fIdx = ChemCompFormulaIndex(self.__idxD)
+        self.assertEqual(fIdx.getHeavyAtomCounts().tolist(), [6, 6, 5, 1, 1, 0])
+        self.assertEqual(fIdx.getHeavyAtomCounts([4, 0]).tolist(), [1, 6])
+
+    def testEstimateMinimum(self):
+        """Test selectivity estimates of the minimum composition, feature and structural key filters."""
+        fIdx = ChemCompFormulaIndex(self.__idxD)
+        # single column estimates are exact
+        for typeCountD, featureCountD in [({"C": 3}, None), ({"O": 1}, None), ({"H": 6}, None), ({}, {"bnd_sng": 9}), ({"C": 1}, None)]:
+            self.assertAlmostEqual(fIdx.estimateMinimum(typeCountD, featureCountD), len(fIdx.filterMinimum(typeCountD, featureCountD)))
+        self.assertAlmostEqual(fIdx.estimateMinimum({}), len(self.__idxD))
+        self.assertEqual(fIdx.estimateMinimum({"XX": 1}), 0.0)
+        self.assertEqual(fIdx.estimateMinimum({"C": 1}, {"bnd_trp": 1}), 0.0)
+        # combined tests are no less selective than the most selective single test
+        est = fIdx.estimateMinimum({"C": 2, "O": 1}, {"bnd_dbl": 1})
+        self.assertGreater(est, 0.0)
+        self.assertLessEqual(est, min(fIdx.estimateMinimum({"C": 2}), fIdx.estimateMinimum({"O": 1}), fIdx.estimateMinimum({}, {"bnd_dbl": 1})))
+        #
+        idxD = {
+            "K1": {"type-counts": {"C": 2}, "ss-keys": "%016x%016x" % (0b1011, 1 << 63), "source": "CCD"},
+            "K2": {"type-counts": {"C": 2}, "ss-keys": "%016x%016x" % (0b0011, 0), "source": "CCD"},
+            "K3": {"type-counts": {"C": 4}, "ss-keys": "%016x%016x" % (0b1000, 0), "source": "BIRD"},
+            "K4": {"type-counts": {"C": 2}, "ss-keys": "%016x%016x" % (0b1000, 1 << 63), "source": "BIRD"},
+        }
+        fIdx = ChemCompFormulaIndex(idxD)
+        self.assertAlmostEqual(fIdx.estimateMinimum(None, ssKeys="%016x%016x" % (0, 1 << 63)), 2.0)
+        self.assertAlmostEqual(fIdx.estimateMinimum(None, ssKeys="%016x%016x" % (0b1000, 0)), 3.0)
+        # estimates are scaled by the partition size
+        self.assertAlmostEqual(fIdx.estimateMinimum(None, partitionD={"source": "BIRD"}), 2.0)
+        self.assertAlmostEqual(fIdx.estimateMinimum({"C": 4}, partitionD={"source": "CCD"}), 0.5)
+
+    def testManyElementTypes(self):
+        """Test element masks spanning more than a single 64-bit word."""
+        idxD = {"T%03d" % ii: {"type-counts": {"E%03d" % ii: 1, "E%03d" % (ii + 1): 2}} for ii in range(100)}
+        fIdx = ChemCompFormulaIndex(idxD)
+        self.assertEqual(len(fIdx.getElementList()), 101)
+        self.assertEqual(fIdx.getIds(fIdx.matchRange({"E070": {"min": 1, "max": 1}, "E071": {"min": 2}})), ["T070"])
+        self.assertEqual(fIdx.getIds(fIdx.matchRange({"E070": {"min": 1}}, matchSubset=True)), ["T069", "T070"])
+
+
+def formulaIndexSuite():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(ChemCompFormulaIndexTests("testMatchRange"))
+    suiteSelect.addTest(ChemCompFormulaIndexTests("testFilterMinimum"))
+    suiteSelect.addTest(ChemCompFormulaIndexTests("testFilterMinimumFeatures"))
+    suiteSelect.addTest(ChemCompFormulaIndexTests("testFilterMinimumKeys"))
+    suiteSelect.addTest(ChemCompFormulaIndexTests("testPartitions"))
+    suiteSelect.addTest(ChemCompFormulaIndexTests("testHeavyAtomCounts"))
+    suiteSelect.addTest(ChemCompFormulaIndexTests("testEstimateMinimum"))
+    suiteSelect.addTest(ChemCompFormulaIndexTests("testManyElementTypes"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    mySuite = formulaIndexSuite()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
@@ -114,6 +114,18 @@ class ChemCompIndexProviderTests(unittest.TestCase):
         logger.info("C formula subset matches (%d) (%.4f seconds)", len(rL), time.time() - startTime)
         self.assertGreaterEqual(len(rL), 10)
 
+    def testFormulaExactMatchConsistency(self):
+        """Test exact composition matches (element set index) agree with filtered subset matches  ..."""
+        ccidxP = self.__testBuildMoleculeCacheFiles(ccUrlTarget=self.__ccUrlTarget, birdUrlTarget=self.__birdUrlTarget, logSizes=False, useCache=True, ccFileNamePrefix="cc-abbrev")
+        ccidxD = ccidxP.getIndex()
+        for fQueryD in [{"C": {"min": 1, "max": 20}, "H": {"min": 1}, "O": {"max": 6}, "N": {"min": 0}}, {"C": {"min": 6, "max": 6}, "H": {"min": 6, "max": 6}}]:
+            startTime = time.time()
+            rL = ccidxP.matchMolecularFormulaRange(fQueryD, matchSubset=False)
+            logger.info("Exact formula matches (%d) (%.4f seconds)", len(rL), time.time() - startTime)
+            sL = ccidxP.matchMolecularFormulaRange(fQueryD, matchSubset=True)
+            tL = [t.ccId for t in sL if set(ccidxD[t.ccId]["type-counts"].keys()) == set(fQueryD.keys())]
+            self.assertEqual([t.ccId for t in rL], tL)
+
     def __resultContains(self, ccId, matchResultList):
         for matchResult in matchResultList:
             if ccId in matchResult.ccId:
@@ -160,6 +172,7 @@ def matchFormula():
     suiteSelect = unittest.TestSuite()
     suiteSelect.addTest(ChemCompIndexProviderTests("testFormulaMatch"))
     suiteSelect.addTest(ChemCompIndexProviderTests("testFormulaSubsetMatch"))
+    suiteSelect.addTest(ChemCompIndexProviderTests("testFormulaExactMatchConsistency"))
     suiteSelect.addTest(ChemCompIndexProviderTests("testFormulaStringMatch"))
     return suiteSelect
 
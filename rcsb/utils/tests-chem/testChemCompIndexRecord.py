@@ -0,0 +1,103 @@
+##
+# File:    ChemCompIndexRecordTests.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Update:
+#
+#
+##
+"""
+Tests for compact chemical component index records.
+
+"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "jwest@rcsb.rutgers.edu"
+__license__ = "Apache 2.0"
+
+import logging
+import os
+import pickle
+import time
+import unittest
+
+from rcsb.utils.chem import __version__
+from rcsb.utils.chem.ChemCompIndexRecord import ChemCompIndexRecordFactory
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+
+
+class ChemCompIndexRecordTests(unittest.TestCase):
+    def setUp(self):
+        self.__startTime = time.time()
+        self.__idxD = {
+            "ALA|a": {
+                "name": "ALA|a",
+                "build-type": "oe-iso-smiles",
+                "smiles": "C[C@@H](C(=O)O)N",
+                "formula": "C3H7NO2",
+                "fcharge": 0,
+                "type-counts": {"C": 3, "H": 7, "N": 1, "O": 2},
+                "program": "OpenEye",
+                "feature-counts": {"at_ch": 1, "bnd_sng": 11, "bnd_dbl": 1},
+            },
+            "GLY|b": {
+                "name": "GLY|b",
+                "build-type": "oe-iso-smiles",
+                "smiles": "C(C(=O)O)N",
+                "formula": "C2H5NO2",
+                "fcharge": 0,
+                "type-counts": {"C": 2, "H": 5, "N": 1, "O": 2},
+                "program": "OpenEye",
+                "feature-counts": {"bnd_sng": 8, "bnd_dbl": 1},
+            },
+        }
+        logger.debug("Running tests on version %s", __version__)
+        logger.info("Starting %s at %s", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        endTime = time.time()
+        logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def testRecordAccess(self):
+        """Test dictionary style access to compact index records."""
+        rD = ChemCompIndexRecordFactory().makeRecords(self.__idxD)
+        self.assertEqual(rD, self.__idxD)
+        rec = rD["ALA|a"]
+        self.assertEqual(rec["smiles"], "C[C@@H](C(=O)O)N")
+        self.assertEqual(rec["type-counts"]["H"], 7)
+        self.assertEqual(set(rec["type-counts"].keys()), {"C", "H", "N", "O"})
+        self.assertEqual(rec.get("inchi-key", None), None)
+        self.assertTrue("formula" in rec)
+        self.assertFalse("inchi-key" in rec)
+        self.assertFalse("S" in rec["type-counts"])
+        with self.assertRaises(KeyError):
+            _ = rec["type-counts"]["S"]
+        self.assertEqual(rec.toDict(), self.__idxD["ALA|a"])
+        self.assertEqual(pickle.loads(pickle.dumps(rec)), rec)
+
+    def testRecordSharing(self):
+        """Test sharing of attribute names and interned strings across records."""
+        rD = ChemCompIndexRecordFactory().makeRecords(self.__idxD)
+        self.assertTrue(list(rD["ALA|a"])[0] is list(rD["GLY|b"])[0])
+        self.assertTrue(rD["ALA|a"]["program"] is rD["GLY|b"]["program"])
+        self.assertTrue(list(rD["ALA|a"]["type-counts"])[2] is list(rD["GLY|b"]["type-counts"])[2])
+
+
+def indexRecordSuite():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(ChemCompIndexRecordTests("testRecordAccess"))
+    suiteSelect.addTest(ChemCompIndexRecordTests("testRecordSharing"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    mySuite = indexRecordSuite()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
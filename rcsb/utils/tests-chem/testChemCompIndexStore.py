@@ -0,0 +1,150 @@
+##
+# File:    ChemCompIndexStoreTests.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Update:
+#  18-Oct-2026 jdw add lazy mapping test
+#  18-Oct-2026 jdw add structural key (ss-keys) string column checks
+#  18-Oct-2026 jdw add partition attribute checks
+#  18-Oct-2026 jdw add record decoding (toDict(entryFactory=...)) checks
+#
+##
+"""
+Tests for the binary (memory-mapped) chemical component index store.
+
+"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "jwest@rcsb.rutgers.edu"
+__license__ = "Apache 2.0"
+
+import logging
+import os
+import time
+import unittest
+
+from rcsb.utils.chem import __version__
+from rcsb.utils.chem.ChemCompFormulaIndex import ChemCompFormulaIndex
+from rcsb.utils.chem.ChemCompIndexRecord import ChemCompIndexRecord, ChemCompIndexRecordFactory
+from rcsb.utils.chem.ChemCompIndexStore import ChemCompIndexStore, ChemCompIndexStoreMapping
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+
+
+class ChemCompIndexStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.__startTime = time.time()
+        self.__filePath = os.path.join(HERE, "test-output", "test-idx-store.bin")
+        self.__idxD = {
+            "BNZ": {
+                "formula": "C6H6",
+                "type-counts": {"C": 6, "H": 6},
+                "ambiguous": False,
+                "feature-counts": {"rings": 1, "rings_ar": 1, "at_ar": 6, "bnd_sng": 9, "bnd_dbl": 3},
+                "oe-iso-smiles": "c1ccccc1",
+                "ss-keys": "%016x" % 0b0110,
+                "source": "CCD",
+                "status": "REL",
+            },
+            "ALA": {
+                "formula": "C3H7NO2",
+                "type-counts": {"C": 3, "H": 7, "N": 1, "O": 2},
+                "ambiguous": False,
+                "feature-counts": {"at_ch": 1, "bnd_sng": 11, "bnd_dbl": 1},
+                "oe-iso-smiles": "C[C@@H](C(=O)O)N",
+                "inchikey": "QNAYBMKLOCPYGJ-REOHCLBHSA-N",
+                "ss-keys": "%016x" % 0b1011,
+                "source": "CCD",
+                "status": "OBS",
+            },
+            "CL": {"formula": "Cl-", "type-counts": {"CL": 1}, "ambiguous": True, "feature-counts": {}, "fcharge": -1},
+            "UNL": {"formula": "", "type-counts": {}, "ambiguous": True, "other": [1, "a", None]},
+        }
+        logger.debug("Running tests on version %s", __version__)
+        logger.info("Starting %s at %s", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        endTime = time.time()
+        logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def testStoreRoundTrip(self):
+        """Test write and memory-mapped read of a binary index store."""
+        ok = ChemCompIndexStore(self.__filePath).write(self.__idxD)
+        self.assertTrue(ok)
+        idxStore = ChemCompIndexStore(self.__filePath)
+        ok = idxStore.open()
+        self.assertTrue(ok)
+        self.assertEqual(len(idxStore), len(self.__idxD))
+        self.assertEqual(idxStore.getIdList(), list(self.__idxD.keys()))
+        self.assertEqual(idxStore.toDict(), self.__idxD)
+        recD = idxStore.toDict(entryFactory=ChemCompIndexRecordFactory().makeRecord)
+        self.assertEqual(list(recD.keys()), list(self.__idxD.keys()))
+        self.assertTrue(all(isinstance(rec, ChemCompIndexRecord) for rec in recD.values()))
+        self.assertEqual({ccId: rec.toDict() for ccId, rec in recD.items()}, self.__idxD)
+        for ccId, idxD in self.__idxD.items():
+            self.assertEqual(idxStore.getEntry(idxStore.getRow(ccId)), idxD)
+        self.assertEqual(idxStore.getRow("XXX"), None)
+        #
+        labelL, countA = idxStore.getCountColumn("type-counts")
+        self.assertEqual(labelL, ["C", "CL", "H", "N", "O"])
+        self.assertEqual(countA.shape, (4, 5))
+        self.assertEqual(countA[0].tolist(), [6, -1, 6, -1, -1])
+        self.assertEqual(idxStore.getCountColumn("formula"), (None, None))
+        self.assertEqual(idxStore.getStringColumn("ss-keys"), ["%016x" % 0b0110, "%016x" % 0b1011, None, None])
+        self.assertEqual(idxStore.getStringColumn("type-counts"), None)
+
+    def testStoreFormulaIndex(self):
+        """Test formula index construction from the stored count columns."""
+        ok = ChemCompIndexStore(self.__filePath).write(self.__idxD)
+        self.assertTrue(ok)
+        idxStore = ChemCompIndexStore(self.__filePath)
+        ok = idxStore.open()
+        self.assertTrue(ok)
+        fIdx1 = ChemCompFormulaIndex(indexStore=idxStore)
+        fIdx2 = ChemCompFormulaIndex(self.__idxD)
+        for typeCountD, featureCountD in [({"C": 1}, None), ({"C": 1}, {"bnd_dbl": 1}), ({"CL": 1}, None), ({"H": 7}, {"at_ch": 1})]:
+            self.assertEqual(fIdx1.getIds(fIdx1.filterMinimum(typeCountD, featureCountD)), fIdx2.getIds(fIdx2.filterMinimum(typeCountD, featureCountD)))
+        for ssKeys in ["%016x" % 0b0010, "%016x" % 0b1000]:
+            self.assertEqual(fIdx1.getIds(fIdx1.filterMinimum(None, ssKeys=ssKeys)), fIdx2.getIds(fIdx2.filterMinimum(None, ssKeys=ssKeys)))
+        self.assertEqual(fIdx1.getIds(fIdx1.filterMinimum({"C": 1}, ssKeys="%016x" % 0b1000)), ["ALA"])
+        self.assertEqual(fIdx1.getElementSetIndex(), fIdx2.getElementSetIndex())
+        self.assertEqual(fIdx1.getPartitionIndex(), fIdx2.getPartitionIndex())
+        self.assertEqual(fIdx1.getIds(fIdx1.getPartitionRows({"source": "CCD", "status": "REL"})), ["BNZ"])
+        self.assertEqual(fIdx1.getElementSetIndex()[frozenset()], ["UNL"])
+
+    def testStoreLazyMapping(self):
+        """Test on-demand decoding of index entries through the lazy mapping."""
+        ok = ChemCompIndexStore(self.__filePath).write(self.__idxD)
+        self.assertTrue(ok)
+        idxStore = ChemCompIndexStore(self.__filePath)
+        ok = idxStore.open()
+        self.assertTrue(ok)
+        lazyIdx = ChemCompIndexStoreMapping(idxStore, cacheSize=2)
+        self.assertEqual(len(lazyIdx), len(self.__idxD))
+        self.assertEqual(list(lazyIdx), list(self.__idxD.keys()))
+        self.assertTrue("ALA" in lazyIdx)
+        self.assertFalse("XXX" in lazyIdx)
+        self.assertEqual(lazyIdx["ALA"]["oe-iso-smiles"], "C[C@@H](C(=O)O)N")
+        self.assertTrue(lazyIdx["ALA"] is lazyIdx["ALA"])
+        self.assertEqual(lazyIdx.get("XXX", None), None)
+        self.assertEqual(dict(lazyIdx), self.__idxD)
+
+
+def indexStoreSuite():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(ChemCompIndexStoreTests("testStoreRoundTrip"))
+    suiteSelect.addTest(ChemCompIndexStoreTests("testStoreFormulaIndex"))
+    suiteSelect.addTest(ChemCompIndexStoreTests("testStoreLazyMapping"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    mySuite = indexStoreSuite()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
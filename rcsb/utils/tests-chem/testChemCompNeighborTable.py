@@ -0,0 +1,129 @@
+##
+# File:    ChemCompNeighborTableTests.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Update:
+#  18-Oct-2026 jdw add resume check for a changed fingerprint index
+#
+##
+"""
+Tests for the precomputed nearest neighbor table built by fingerprint similarity self join.
+
+"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "jwest@rcsb.rutgers.edu"
+__license__ = "Apache 2.0"
+
+import json
+import logging
+import os
+import shutil
+import time
+import unittest
+
+import numpy as np
+
+from rcsb.utils.chem import __version__
+from rcsb.utils.chem.ChemCompFingerPrintIndex import ChemCompFingerPrintIndex
+from rcsb.utils.chem.ChemCompNeighborTable import ChemCompNeighborTable, getPartDirPath
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+
+
+class ChemCompNeighborTableTests(unittest.TestCase):
+    def setUp(self):
+        self.__startTime = time.time()
+        rng = np.random.default_rng(2026)
+        self.__numFp = 1500
+        densityA = rng.uniform(0.02, 0.3, size=(self.__numFp, 1))
+        bitA = rng.random((self.__numFp, 8 * 64)) < densityA
+        fpA = np.packbits(bitA, axis=1, bitorder="little").view(np.uint64)
+        self.__fpIdx = ChemCompFingerPrintIndex(fpA, list(range(5, 5 + self.__numFp)), fpType="TEST")
+        self.__filePath = os.path.join(HERE, "test-output", "test-neighbor-table-TEST.npy")
+        shutil.rmtree(getPartDirPath(self.__filePath), ignore_errors=True)
+        logger.debug("Running tests on version %s", __version__)
+        logger.info("Starting %s at %s", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        endTime = time.time()
+        logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def testBuildNeighborTable(self):
+        """Test the neighbor table self join against single query searches."""
+        ok = ChemCompNeighborTable.build(self.__fpIdx, self.__filePath, maxNeighbors=20, minScore=0.2, numProc=3, blockSize=100)
+        self.assertTrue(ok)
+        self.assertFalse(os.path.exists(getPartDirPath(self.__filePath)))
+        for mmapMode in ["r", None]:
+            nbrTable = ChemCompNeighborTable.load(self.__filePath, mmapMode=mmapMode)
+            self.assertEqual(len(nbrTable), 5 + self.__numFp)
+            self.assertEqual(nbrTable.getMaxNeighbors(), 20)
+            self.assertEqual(nbrTable.getFpType(), "TEST")
+            for idx in [5, 17, 400, 1504]:
+                queryFp = self.__fpIdx.getFingerPrints([idx])[0]
+                for minScore, maxResults in [(0.2, 20), (0.4, 10), (None, 0)]:
+                    rL = nbrTable.getNeighbors(idx, minScore=minScore, maxResults=maxResults)
+                    tL = self.__fpIdx.getSortedScores(queryFp, minScore=minScore if minScore else 0.2, maxResults=maxResults if maxResults else 20)
+                    self.assertEqual(rL, tL)
+                self.assertEqual(nbrTable.getNeighbors(idx)[0], (idx, 1.0))
+            self.assertTrue(all(tup[0] in [5, 6, 7] for tup in nbrTable.getNeighbors(17, idxList=[5, 6, 7])))
+            self.assertEqual(nbrTable.getNeighbors(2), [])
+            self.assertEqual(nbrTable.getNeighbors(10000), [])
+
+    def testResumeNeighborTable(self):
+        """Test resuming an interrupted neighbor table build from the completed blocks."""
+        partDirPath = getPartDirPath(self.__filePath)
+        paramD = {"fpType": "TEST", "maxNeighbors": 5, "minScore": 0.0, "numRows": self.__numFp, "blockSize": 500, "checksum": self.__fpIdx.getChecksum()}
+        os.makedirs(partDirPath)
+        with open(os.path.join(partDirPath, "params.json"), "w", encoding="utf-8") as ofh:
+            json.dump(paramD, ofh)
+        # a completed (sentinel) first block is reused by the resumed build
+        idxL = self.__fpIdx.getIdList()[:500]
+        np.savez(os.path.join(partDirPath, "part-%010d.npz" % 0), idx=np.asarray(idxL), nbr=np.full((500, 5), 3, dtype=np.int32), score=np.full((500, 5), 0.5))
+        ok = ChemCompNeighborTable.build(self.__fpIdx, self.__filePath, maxNeighbors=5, numProc=2, blockSize=500)
+        self.assertTrue(ok)
+        nbrTable = ChemCompNeighborTable.load(self.__filePath)
+        self.assertEqual(nbrTable.getNeighbors(idxL[0]), [(3, 0.5)] * 5)
+        idx = self.__fpIdx.getIdList()[700]
+        self.assertEqual(nbrTable.getNeighbors(idx)[0], (idx, 1.0))
+        # a build with different parameters discards the completed blocks
+        os.makedirs(partDirPath)
+        with open(os.path.join(partDirPath, "params.json"), "w", encoding="utf-8") as ofh:
+            json.dump(paramD, ofh)
+        np.savez(os.path.join(partDirPath, "part-%010d.npz" % 0), idx=np.asarray(idxL), nbr=np.full((500, 5), 3, dtype=np.int32), score=np.full((500, 5), 0.5))
+        ok = ChemCompNeighborTable.build(self.__fpIdx, self.__filePath, maxNeighbors=5, numProc=2, blockSize=250)
+        self.assertTrue(ok)
+        nbrTable = ChemCompNeighborTable.load(self.__filePath)
+        self.assertEqual(nbrTable.getNeighbors(idxL[0])[0], (idxL[0], 1.0))
+        # a build of a changed fingerprint index with the same shape and parameters discards the completed blocks
+        os.makedirs(partDirPath)
+        with open(os.path.join(partDirPath, "params.json"), "w", encoding="utf-8") as ofh:
+            json.dump(paramD, ofh)
+        np.savez(os.path.join(partDirPath, "part-%010d.npz" % 0), idx=np.asarray(idxL), nbr=np.full((500, 5), 3, dtype=np.int32), score=np.full((500, 5), 0.5))
+        fpA = self.__fpIdx.getFingerPrints(self.__fpIdx.getIdList())
+        fpA[0] ^= np.uint64(1)
+        fpIdx = ChemCompFingerPrintIndex(fpA, self.__fpIdx.getIdList(), fpType="TEST")
+        self.assertNotEqual(fpIdx.getChecksum(), paramD["checksum"])
+        ok = ChemCompNeighborTable.build(fpIdx, self.__filePath, maxNeighbors=5, numProc=2, blockSize=500)
+        self.assertTrue(ok)
+        nbrTable = ChemCompNeighborTable.load(self.__filePath)
+        self.assertEqual(nbrTable.getNeighbors(idxL[0])[0], (idxL[0], 1.0))
+
+
+def neighborTableSuite():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(ChemCompNeighborTableTests("testBuildNeighborTable"))
+    suiteSelect.addTest(ChemCompNeighborTableTests("testResumeNeighborTable"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    mySuite = neighborTableSuite()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
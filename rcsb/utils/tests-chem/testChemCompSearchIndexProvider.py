@@ -5,7 +5,9 @@
 # Version: 0.001
 #
 # Update:
-#
+#  18-Oct-2026 jdw add InChIKey hash index test
+#  18-Oct-2026 jdw add SMILES (iso, can, tautomer) hash index test
+#  18-Oct-2026 jdw add tautomer canonical SMILES repeatability check
 #
 ##
 """
@@ -29,6 +31,8 @@ import unittest
 
 from rcsb.utils.chem import __version__
 from rcsb.utils.chem.ChemCompSearchIndexProvider import ChemCompSearchIndexProvider
+from rcsb.utils.chem.OeIoUtils import OeIoUtils
+from rcsb.utils.chem.OeMoleculeFactory import OeMoleculeFactory
 
 HERE = os.path.abspath(os.path.dirname(__file__))
 TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
@@ -141,6 +145,52 @@ class ChemCompSearchIndexProviderTests(unittest.TestCase):
         logger.info("C formula subset matches (%d) (%.4f seconds)", len(rL), time.time() - startTime)
         self.assertGreaterEqual(len(rL), 10)
 
+    def testInChIKeyMatch(self):
+        """Test InChIKey (full key and skeleton) hash index lookups  ..."""
+        ccsidxP = self.__testBuildSearchIndexCacheFiles(
+            ccUrlTarget=self.__ccUrlTarget, birdUrlTarget=self.__birdUrlTarget, logSizes=False, useCache=True, ccFileNamePrefix="cc-abbrev"
+        )
+        ccidxD = ccsidxP.getIndex()
+        for searchCcId, idxD in ccidxD.items():
+            rL = ccsidxP.matchInChIKey(idxD["inchi-key"])
+            self.assertIn(searchCcId, rL)
+            self.assertTrue(all(ccidxD[tId]["inchi-key"] == idxD["inchi-key"] for tId in rL))
+            sL = ccsidxP.matchInChIKey(idxD["inchi-key"], skeleton=True)
+            self.assertTrue(set(rL).issubset(sL))
+            self.assertTrue(all(ccidxD[tId]["inchi-key"][:14] == idxD["inchi-key"][:14] for tId in sL))
+        self.assertEqual(ccsidxP.matchInChIKey("XXXXXXXXXXXXXX-XXXXXXXXXX-N"), [])
+        self.assertEqual(ccsidxP.matchInChIKey(None), [])
+
+    def testSmilesMatch(self):
+        """Test canonical isomeric, canonical and tautomer canonical SMILES hash index lookups  ..."""
+        ccsidxP = self.__testBuildSearchIndexCacheFiles(
+            ccUrlTarget=self.__ccUrlTarget, birdUrlTarget=self.__birdUrlTarget, logSizes=False, useCache=True, ccFileNamePrefix="cc-abbrev"
+        )
+        ccidxD = ccsidxP.getIndex()
+        numTautomer = 0
+        for searchCcId, idxD in ccidxD.items():
+            for smilesType, attributeName in ccsidxP.SMILES_INDEX_ATTRIBUTES.items():
+                if not idxD.get(attributeName, None):
+                    continue
+                numTautomer += 1 if smilesType == "tautomer" else 0
+                rL = ccsidxP.matchSmiles(idxD[attributeName], smilesType=smilesType)
+                self.assertIn(searchCcId, rL)
+                self.assertTrue(all(ccidxD[tId][attributeName] == idxD[attributeName] for tId in rL))
+        self.assertGreater(numTautomer, 0)
+        # the tautomer canonical key does not depend on the search time
+        oeioU = OeIoUtils()
+        tautomerIdL = [searchCcId for searchCcId, idxD in ccidxD.items() if idxD.get("tautomer-smiles", None)][:10]
+        for searchCcId in tautomerIdL:
+            oeMol = oeioU.descriptorToMol(ccidxD[searchCcId]["smiles"], "oe-iso-smiles", limitPerceptions=False, messageTag=searchCcId)
+            oemf = OeMoleculeFactory()
+            oemf.setOeMol(oeMol, searchCcId)
+            tautomerSmiles = oemf.getTautomerCanSMILES()
+            self.assertTrue(tautomerSmiles)
+            self.assertEqual(oemf.getTautomerCanSMILES(), tautomerSmiles)
+        self.assertEqual(ccsidxP.matchSmiles("XXXX", smilesType="can"), [])
+        self.assertEqual(ccsidxP.matchSmiles(None), [])
+        self.assertEqual(ccsidxP.matchSmiles("C", smilesType="unknown"), [])
+
     @unittest.skipIf(skipFlag, "Long test")
     def testFormulaSubsetMatchFull(self):
         """Test formula range match on the full index   ...
@@ -0,0 +1,117 @@
+##
+# File:    ChemCompSearchPlannerTests.py
+# Author:  J. Westbrook
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Update:
+#
+#
+##
+"""
+Tests for the cost-based substructure search planner.
+
+"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "jwest@rcsb.rutgers.edu"
+__license__ = "Apache 2.0"
+
+import logging
+import os
+import time
+import unittest
+
+from rcsb.utils.chem import __version__
+from rcsb.utils.chem.ChemCompFormulaIndex import ChemCompFormulaIndex
+from rcsb.utils.chem.ChemCompSearchPlanner import ChemCompSearchPlanner
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+
+
+class ChemCompSearchPlannerTests(unittest.TestCase):
+    def setUp(self):
+        self.__startTime = time.time()
+        # carbon rich definitions and a few rare nitrogen and sulfur containing definitions
+        self.__idxD = {}
+        for ii in range(2000):
+            tD = {"C": 1 + ii % 12, "H": 4}
+            if ii % 10 == 0:
+                tD["N"] = 1 + ii % 3
+            if ii % 500 == 0:
+                tD["S"] = 1
+            self.__idxD["T%04d" % ii] = {
+                "type-counts": tD,
+                "feature-counts": {"rings": ii % 3},
+                "ss-keys": "%016x" % ((1 << (ii % 8)) | 1),
+                "source": "BIRD" if ii % 4 == 0 else "CCD",
+            }
+        logger.debug("Running tests on version %s", __version__)
+        logger.info("Starting %s at %s", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        endTime = time.time()
+        logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def testPlanStrategies(self):
+        """Test the choice of search strategy for selective and unselective queries."""
+        fIdx = ChemCompFormulaIndex(self.__idxD)
+        planner = ChemCompSearchPlanner()
+        # selective query - the prefilter reduces the candidates to a handful of graph matches
+        qp = planner.plan(fIdx, {"C": 1, "S": 1}, {"rings": 0}, numProc=4)
+        self.assertEqual(qp.strategy, "prefilter")
+        self.assertEqual(qp.numProc, 1)
+        self.assertAlmostEqual(qp.estCandidates, len(fIdx.filterMinimum({"S": 1})), delta=1.0)
+        self.assertIn("exhaustive", qp.costD)
+        self.assertNotIn("screened", qp.costD)
+        # unselective query - the prefilter saves nothing over an exhaustive search
+        qp = planner.plan(fIdx, {"C": 1}, {"rings": 0}, numProc=4, strategyList=["exhaustive", "prefilter"])
+        self.assertEqual(qp.strategy, "exhaustive")
+        self.assertEqual(qp.numProc, 4)
+        self.assertAlmostEqual(qp.estCandidates, len(fIdx))
+        # unselective query with a screened database
+        qp = planner.plan(fIdx, {"C": 1}, {"rings": 0}, numProc=1, screened=True)
+        self.assertEqual(qp.strategy, "screened")
+        # structural key screen
+        qp = planner.plan(fIdx, {"C": 1}, {"rings": 0}, ssKeys="%016x" % (1 << 5), numProc=1, strategyList=["exhaustive", "keys"])
+        self.assertEqual(qp.strategy, "keys")
+        self.assertAlmostEqual(qp.estCandidates, len(fIdx.filterMinimum(None, ssKeys="%016x" % (1 << 5))))
+        # partition restricted search
+        qp = planner.plan(fIdx, {"C": 1}, {"rings": 0}, partitionD={"source": "BIRD"}, strategyList=["exhaustive"])
+        self.assertAlmostEqual(qp.estCandidates, len(fIdx.getPartitionRows({"source": "BIRD"})))
+        # prepared targets reduce the graph matching cost
+        qp1 = planner.plan(fIdx, {"C": 1}, {"rings": 0}, strategyList=["exhaustive"])
+        qp2 = planner.plan(fIdx, {"C": 1}, {"rings": 0}, prepared=True, strategyList=["exhaustive"])
+        self.assertLess(qp2.estSeconds, qp1.estSeconds)
+
+    def testPlanStats(self):
+        """Test the accumulated estimated and actual costs of executed plans."""
+        fIdx = ChemCompFormulaIndex(self.__idxD)
+        planner = ChemCompSearchPlanner(costD={"match": 1.0e-4})
+        self.assertEqual(planner.getCostModel()["match"], 1.0e-4)
+        qp1 = planner.plan(fIdx, {"C": 1, "S": 1}, {"rings": 0})
+        qp2 = planner.plan(fIdx, {"C": 1, "N": 1}, {"rings": 0})
+        planner.record(qp1, 0.001, numCandidates=4, searchId="query1")
+        planner.record(qp2, 0.01, searchId="query2")
+        sD = planner.getStats()
+        self.assertEqual(sD["prefilter"]["count"], 2)
+        self.assertAlmostEqual(sD["prefilter"]["seconds"], 0.011)
+        self.assertEqual(sD["prefilter"]["candidates"], 4)
+        self.assertAlmostEqual(sD["prefilter"]["estSeconds"], qp1.estSeconds + qp2.estSeconds)
+
+
+def searchPlannerSuite():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(ChemCompSearchPlannerTests("testPlanStrategies"))
+    suiteSelect.addTest(ChemCompSearchPlannerTests("testPlanStats"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    mySuite = searchPlannerSuite()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
@@ -5,7 +5,17 @@
 # Version: 0.001
 #
 # Update:
-#
+#  18-Oct-2026 jdw add formula result cache checks
+#  18-Oct-2026 jdw add partition filter checks
+#  18-Oct-2026 jdw add full search (forceFullSearch) check for InChIKey fast path
+#  18-Oct-2026 jdw add identity (canonical SMILES hash) match check
+#  18-Oct-2026 jdw add batch finger print search test
+#  18-Oct-2026 jdw add neighbor table identifier similarity test
+#  18-Oct-2026 jdw add prepared query molecule cache checks
+#  18-Oct-2026 jdw add substructure search hit limit and cancellation checks
+#  18-Oct-2026 jdw check planned searches with a time budget or cancellation token are interruptible
+#  18-Oct-2026 jdw check batch finger print results include all configured finger print types
+#  18-Oct-2026 jdw check new configurations select the planned substructure search engine
 #
 ##
 """
@@ -27,6 +37,7 @@ import unittest
 
 from rcsb.utils.chem import __version__
 from rcsb.utils.chem.ChemCompSearchWrapper import ChemCompSearchWrapper
+from rcsb.utils.chem.OeSubStructSearchUtils import SearchCancelToken
 from rcsb.utils.io.FileUtil import FileUtil
 from rcsb.utils.io.MarshalUtil import MarshalUtil
 
@@ -75,6 +86,9 @@ class OeSearchIndexUtilsTests(unittest.TestCase):
             birdUrlTarget = os.path.join(self.__dataPath, "prdcc-abbrev.cif") if not self.__testFlagFull else None
             ok = ccsw.setConfig(ccUrlTarget=ccUrlTarget, birdUrlTarget=birdUrlTarget)
             self.assertTrue(ok)
+            # new configurations select the planned (auto) substructure search engine
+            configD = self.__mU.doImport(os.path.join(self.__cachePath, "config", os.environ["CHEM_SEARCH_CC_PREFIX"] + "-config.json"), fmt="json")
+            self.assertEqual(configD["oesmpKwargs"]["ssEngine"], "auto")
         except Exception as e:
             logger.exception("Failing with %s", str(e))
             self.fail()
@@ -207,6 +221,22 @@ class OeSearchIndexUtilsTests(unittest.TestCase):
                         retStatus, ssL, fpL = ccsw.searchByDescriptor(ccD[buildType], buildType, matchOpts="graph-relaxed")
                         mOk = self.__resultContains(ccId, ssL)
                         self.assertTrue(mOk)
+                        if ii <= 10:
+                            # the full finger print and graph search pipeline also recovers the definition
+                            _, tssL, _ = ccsw.searchByDescriptor(ccD[buildType], buildType, matchOpts="graph-relaxed", forceFullSearch=True)
+                            self.assertTrue(self.__resultContains(ccId, tssL))
+                            # identity lookup ignoring stereo on the canonical SMILES hash index
+                            iStatus, iL = ccsw.matchByIdentity(ccD[buildType], buildType, identityType="can")
+                            self.assertEqual(iStatus, 0)
+                            self.assertTrue(all(t.searchType == "identity-can" for t in iL))
+                            if "smiles" in buildType:
+                                self.assertTrue(self.__resultContains(ccId, iL))
+                            # repeated queries reuse the cached prepared query molecule
+                            qD = ccsw.getQueryCacheStatus()
+                            _, tssL, tfpL = ccsw.searchByDescriptor(ccD[buildType], buildType, matchOpts="graph-relaxed")
+                            self.assertEqual(ccsw.getQueryCacheStatus()["hits"], qD["hits"] + 1)
+                            self.assertEqual([t.ccId for t in tssL], [t.ccId for t in ssL])
+                            self.assertEqual([t.ccId for t in tfpL], [t.ccId for t in fpL])
                         #
                         ssCcIdList = list(set([t.ccId.split("|")[0] for t in ssL]))
                         fpCcIdList = list(set([t.ccId.split("|")[0] for t in fpL]))
@@ -225,6 +255,70 @@ class OeSearchIndexUtilsTests(unittest.TestCase):
             logger.exception("Failing with %s", str(e))
             self.fail()
 
+    def testZoomFingerPrintSearchBatch(self):
+        """Test batch finger print search"""
+        try:
+            numMolsTest = 500
+            ccsw = ChemCompSearchWrapper()
+            ok = ccsw.readConfig()
+            self.assertTrue(ok)
+            ok = ccsw.updateChemCompIndex(useCache=True)
+            self.assertTrue(ok)
+            ccIdx = ccsw.getChemCompIndex()
+            ok = ccsw.reloadSearchDatabase()
+            self.assertTrue(ok)
+            #
+            queryList = [(ccId, ccD["oe-iso-smiles"], "oe-iso-smiles") for ccId, ccD in list(ccIdx.items())[:numMolsTest] if "oe-iso-smiles" in ccD]
+            startTime = time.time()
+            resultD = {}
+            for searchId, retStatus, fpL in ccsw.fingerPrintSearchBatch(queryList, numProc=4):
+                self.assertNotIn(searchId, resultD)
+                resultD[searchId] = (retStatus, fpL)
+            logger.info("Batch finger print search on %d queries (%.4f secs)", len(queryList), time.time() - startTime)
+            self.assertEqual(len(resultD), len(queryList))
+            numSelf = 0
+            fpTypeS = set()
+            for ccId, (retStatus, fpL) in resultD.items():
+                if retStatus == -100:
+                    continue
+                self.assertEqual(retStatus, 0)
+                self.assertEqual([t.fpScore for t in fpL], sorted([t.fpScore for t in fpL], reverse=True))
+                numSelf += 1 if self.__resultContains(ccId, fpL) else 0
+                fpTypeS.update([t.fpType for t in fpL])
+            self.assertGreaterEqual(numSelf, int(0.9 * len(queryList)))
+            # queries are returned with the matches of all configured finger print types (TREE and MACCS)
+            self.assertEqual(fpTypeS, {"TREE", "MACCS"})
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testZoomNeighborTableSearch(self):
+        """Test identifier similarity search answered from the precomputed neighbor tables"""
+        try:
+            numMolsTest = 50
+            ccsw = ChemCompSearchWrapper()
+            ok = ccsw.readConfig()
+            self.assertTrue(ok)
+            ok = ccsw.updateChemCompIndex(useCache=True)
+            self.assertTrue(ok)
+            ccIdx = ccsw.getChemCompIndex()
+            ok = ccsw.reloadSearchDatabase()
+            self.assertTrue(ok)
+            ok = ccsw.buildNeighborTables(numProc=4)
+            self.assertTrue(ok)
+            #
+            for ccId in list(ccIdx.keys())[:numMolsTest]:
+                retStatus, ssL, fpL = ccsw.matchByDescriptor(ccId, "IdentifierPdb", matchOpts="fingerprint-similarity")
+                if retStatus == -100:
+                    continue
+                self.assertEqual(retStatus, 0)
+                self.assertEqual(ssL, [])
+                self.assertTrue(self.__resultContains(ccId, fpL))
+                self.assertEqual([t.fpScore for t in fpL], sorted([t.fpScore for t in fpL], reverse=True))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
     def testZoomSubStructSearch(self):
         """Test substructure search"""
         try:
@@ -271,6 +365,42 @@ class OeSearchIndexUtilsTests(unittest.TestCase):
             logger.exception("Failing with %s", str(e))
             self.fail()
 
+    def testZoomSubStructSearchLimits(self):
+        """Test substructure search hit limits and cancellation (partial results status)"""
+        try:
+            ccsw = ChemCompSearchWrapper()
+            ok = ccsw.readConfig()
+            self.assertTrue(ok)
+            ok = ccsw.updateChemCompIndex(useCache=True)
+            self.assertTrue(ok)
+            ok = ccsw.updateSearchIndex(useCache=True)
+            self.assertTrue(ok)
+            ok = ccsw.reloadSearchDatabase()
+            self.assertTrue(ok)
+            #
+            retStatus, ssL, _ = ccsw.subStructSearchByDescriptor("c1ccccc1", "SMILES", matchOpts="sub-struct-graph-relaxed")
+            self.assertEqual(retStatus, 0)
+            self.assertGreater(len(ssL), 5)
+            retStatus, tL, _ = ccsw.subStructSearchByDescriptor("c1ccccc1", "SMILES", matchOpts="sub-struct-graph-relaxed", maxHits=5)
+            self.assertEqual(retStatus, 1)
+            self.assertEqual(len(tL), 5)
+            self.assertTrue(set([t.ccId for t in tL]).issubset([t.ccId for t in ssL]))
+            # planned searches with a time budget or cancellation token avoid the (uninterruptible) screened search
+            numScreened = ccsw.getSearchPlanStats().get("screened", {}).get("count", 0)
+            cancelToken = SearchCancelToken()
+            cancelToken.cancel()
+            retStatus, tL, _ = ccsw.subStructSearchByDescriptor("c1ccccc1", "SMILES", matchOpts="sub-struct-graph-relaxed", cancelToken=cancelToken)
+            self.assertEqual(retStatus, 1)
+            self.assertEqual(cancelToken.getStopReason(), "cancelled")
+            self.assertEqual(len(tL), 0)
+            retStatus, tL, _ = ccsw.subStructSearchByDescriptor("c1ccccc1", "SMILES", matchOpts="sub-struct-graph-relaxed", timeoutSeconds=60.0)
+            self.assertEqual(retStatus, 0)
+            self.assertEqual(len(tL), len(ssL))
+            self.assertEqual(ccsw.getSearchPlanStats().get("screened", {}).get("count", 0), numScreened)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
     def testZoomMatchFormula(self):
         """Test formula matching"""
         try:
@@ -302,6 +432,22 @@ class OeSearchIndexUtilsTests(unittest.TestCase):
                     mOk and retStatus == 0,
                     time.time() - startTime,
                 )
+            # repeated queries are answered from the formula result cache until the index is updated
+            cD = ccsw.getFormulaCacheStatus()
+            _, rL1 = ccsw.matchByFormula("C6H6")
+            _, rL2 = ccsw.matchByFormula("C6H6")
+            self.assertEqual(rL1, rL2)
+            self.assertEqual(ccsw.getFormulaCacheStatus()["hits"], cD["hits"] + 1)
+            ok = ccsw.updateChemCompIndex(useCache=True)
+            self.assertTrue(ok)
+            _, rL3 = ccsw.matchByFormula("C6H6")
+            self.assertEqual(rL1, rL3)
+            # partition filters are applied before the formula scan
+            _, rL4 = ccsw.matchByFormula("C6H6", partitionD={"source": "CCD"})
+            self.assertEqual(rL1, rL4)
+            _, rL5 = ccsw.matchByFormula("C6H6", partitionD={"source": "BIRD"})
+            self.assertEqual(rL5, [])
+            self.assertEqual(ccsw.getFormulaCacheStatus()["misses"], cD["misses"] + 2)
         except Exception as e:
             logger.exception("Failing with %s", str(e))
             self.fail()
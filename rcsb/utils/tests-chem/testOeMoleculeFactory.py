@@ -5,7 +5,7 @@
 # Version: 0.001
 #
 # Updates:
-#
+#  18-Oct-2026 jdw check structural keys (ss-keys) in related molecular forms
 ##
 """
 A collection of tests of OeMolecularFactory to compare assigned and computed features.
@@ -80,6 +80,8 @@ class OeMolecularFactoryTests(unittest.TestCase):
                 self.assertEqual(tId, ccId)
                 smiD = oemf.buildRelated(limitPerceptions=False)
                 logger.info("%s related molecular forms %d", ccId, len(smiD))
+                for vD in smiD.values():
+                    self.assertEqual(len(vD["ss-keys"]), 128)
                 # logger.debug("%s related molecular forms %r", ccId, smiD)
 
                 # ----
@@ -5,7 +5,7 @@
 # Version: 0.001
 #
 # Update:
-#
+#  18-Oct-2026 jdw check MACCS fingerprints are stored and loaded as packed databases
 #
 ##
 """
@@ -26,6 +26,7 @@ import unittest
 
 
 from rcsb.utils.chem import __version__
+from rcsb.utils.chem.ChemCompFingerPrintIndex import ChemCompFingerPrintIndex
 from rcsb.utils.chem.OeMoleculeProvider import OeMoleculeProvider
 
 HERE = os.path.abspath(os.path.dirname(__file__))
@@ -166,6 +167,11 @@ class OeMoleculeProviderTests(unittest.TestCase):
             fpDb = oemp.getFingerPrintDb(fpType="TREE")
             logger.debug("fpType %r length %d", fpType, fpDb.NumFingerPrints())
             self.assertGreaterEqual(fpDb.NumFingerPrints(), minNumFp)
+        # types unsupported by the OE fast fingerprint database are stored and loaded as packed databases
+        if "MACCS" in fpTypeList:
+            fpDb = oemp.getFingerPrintDb(fpType="MACCS")
+            self.assertTrue(isinstance(fpDb, ChemCompFingerPrintIndex))
+            self.assertGreaterEqual(fpDb.NumFingerPrints(), minNumFp)
         #
         ccId = "004"
         oeMol = oemp.getMol(ccId)
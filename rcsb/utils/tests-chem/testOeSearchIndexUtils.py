@@ -5,7 +5,11 @@
 # Version: 0.001
 #
 # Update:
-#
+#  18-Oct-2026 jdw add packed fingerprint engine comparison test
+#  18-Oct-2026 jdw add folded fingerprint screen recall test
+#  18-Oct-2026 jdw add paged search generator test
+#  18-Oct-2026 jdw add fingerprint scoring failure status check
+#  18-Oct-2026 jdw add sequential and concurrent fingerprint scoring latency comparison
 #
 ##
 """
@@ -189,6 +193,123 @@ class OeSearchIndexUtilsTests(unittest.TestCase):
         """Fingerprint scores. (abbreviated)"""
         return self.__fingerPrintScores(self.__numMols, **self.__myKwargs)
 
+    def testFingerPrintEnginesAbbrev(self):
+        """Compare fingerprint scores from the OE and the packed (NumPy) fingerprint engines. (abbreviated)"""
+        numMols = 200
+        maxFpResults = self.__myKwargs.get("maxFpResults", 50)
+        fpTypeCuttoffList = [("TREE", 0.6), ("PATH", 0.6), ("MACCS", 0.9), ("CIRCULAR", 0.6)]
+        oesmP, ccIdxD = self.__getSearchDataProviders(**self.__myKwargs)
+        oesU = OeSearchUtils(oesmP, fpTypeList=[tup[0] for tup in fpTypeCuttoffList])
+        oesPackedU = OeSearchUtils(oesmP, fpTypeList=[tup[0] for tup in fpTypeCuttoffList], fpEngine="packed")
+        oeioU = OeIoUtils()
+        timeD = {"oe": 0.0, "packed": 0.0}
+        for ccId, ccD in list(ccIdxD.items())[:numMols]:
+            oeMol = oeioU.descriptorToMol(ccD["oe-iso-smiles"], "oe-iso-smiles", limitPerceptions=False, messageTag=ccId)
+            if not oeMol:
+                continue
+            for fpType, minFpScore in fpTypeCuttoffList:
+                startTime = time.time()
+                ok1, mL1 = oesU.getFingerPrintScores(oeMol, fpType, minFpScore, maxFpResults)
+                timeD["oe"] += time.time() - startTime
+                startTime = time.time()
+                ok2, mL2 = oesPackedU.getFingerPrintScores(oeMol, fpType, minFpScore, maxFpResults)
+                timeD["packed"] += time.time() - startTime
+                self.assertTrue(ok1 and ok2)
+                # compare scores above the score of the last (possibly tied) result
+                minScore = min([t.fpScore for t in mL1] + [t.fpScore for t in mL2]) if len(mL1) >= maxFpResults else 0.0
+                sD1 = {t.ccId: round(t.fpScore, 4) for t in mL1 if t.fpScore > minScore + 1.0e-4}
+                sD2 = {t.ccId: round(t.fpScore, 4) for t in mL2 if t.fpScore > minScore + 1.0e-4}
+                self.assertEqual(sD1, sD2)
+        logger.info("Fingerprint scores on %d molecules (oe %.4f packed %.4f seconds)", numMols, timeD["oe"], timeD["packed"])
+
+    def testSubStructureAndFingerPrintConcurrencyAbbrev(self):
+        """Compare sequential and concurrent (worker thread) fingerprint scoring latency of combined substructure and fingerprint searches. (abbreviated)"""
+        numMols = 100
+        maxFpResults = self.__myKwargs.get("maxFpResults", 50)
+        fpTypeCuttoffList = [("TREE", 0.6), ("PATH", 0.6), ("MACCS", 0.9), ("CIRCULAR", 0.6)]
+        oesmP, ccIdxD = self.__getSearchDataProviders(**self.__myKwargs)
+        oeioU = OeIoUtils()
+        oeMolL = [oeioU.descriptorToMol(ccD["oe-iso-smiles"], "oe-iso-smiles", limitPerceptions=False, messageTag=ccId) for ccId, ccD in list(ccIdxD.items())[:numMols]]
+        oeMolL = [oeMol for oeMol in oeMolL if oeMol]
+        for oeMol in oeMolL:
+            oeioU.addFingerPrints(oeMol, [tup[0] for tup in fpTypeCuttoffList])
+        for fpEngine in ["oe", "packed"]:
+            oesU = OeSearchUtils(oesmP, fpTypeList=[tup[0] for tup in fpTypeCuttoffList], fpEngine=fpEngine)
+            timeD = {"sequential": 0.0, "concurrent": 0.0}
+            for oeMol in oeMolL:
+                startTime = time.time()
+                ok1, ssL1, fpL1 = oesU.searchSubStructureAndFingerPrint(oeMol, fpTypeCuttoffList, maxFpResults, matchOpts="graph-relaxed", concurrentFp=False)
+                timeD["sequential"] += time.time() - startTime
+                startTime = time.time()
+                ok2, ssL2, fpL2 = oesU.searchSubStructureAndFingerPrint(oeMol, fpTypeCuttoffList, maxFpResults, matchOpts="graph-relaxed", concurrentFp=True)
+                timeD["concurrent"] += time.time() - startTime
+                self.assertTrue(ok1 and ok2)
+                self.assertEqual(sorted([t.ccId for t in ssL1]), sorted([t.ccId for t in ssL2]))
+                self.assertEqual({(t.ccId, t.fpType, round(t.fpScore, 4)) for t in fpL1}, {(t.ccId, t.fpType, round(t.fpScore, 4)) for t in fpL2})
+            logger.info(
+                "Substructure and fingerprint search (%s engine) on %d molecules (sequential %.4f concurrent %.4f seconds)",
+                fpEngine,
+                len(oeMolL),
+                timeD["sequential"],
+                timeD["concurrent"],
+            )
+
+    def testFoldedFingerPrintScreenAbbrev(self):
+        """Recall of the two-stage folded fingerprint screen with respect to single stage scoring. (abbreviated)"""
+        numMols = 200
+        maxFpResults = self.__myKwargs.get("maxFpResults", 50)
+        fpTypeCuttoffList = [("TREE", 0.6), ("PATH", 0.6)]
+        oesmP, ccIdxD = self.__getSearchDataProviders(**self.__myKwargs)
+        oeioU = OeIoUtils()
+        oeMolL = [oeioU.descriptorToMol(ccD["oe-iso-smiles"], "oe-iso-smiles", limitPerceptions=False, messageTag=ccId) for ccId, ccD in list(ccIdxD.items())[:numMols]]
+        oeMolL = [oeMol for oeMol in oeMolL if oeMol]
+        for foldBits in [512, 1024]:
+            oesU = OeSearchUtils(oesmP, fpTypeList=[tup[0] for tup in fpTypeCuttoffList], fpEngine="packed", fpFoldBits=foldBits)
+            for fpType, minFpScore in fpTypeCuttoffList:
+                rD = oesU.getFoldedScreenRecall(oeMolL, fpType, minFpScore, maxFpResults)
+                logger.info("Fold %d bits %r", foldBits, rD)
+                self.assertEqual(rD["queries"], len(oeMolL))
+                self.assertGreaterEqual(rD["recall"], 0.95)
+                # self matches are always retained
+                ok, mL = oesU.getFingerPrintScores(oeMolL[0], fpType, minFpScore, maxFpResults)
+                self.assertTrue(ok)
+                self.assertAlmostEqual(mL[0].fpScore, 1.0)
+
+    def testPagedSearchAbbrev(self):
+        """Paged finger print and substructure search generators. (abbreviated)"""
+        oesmP, ccIdxD = self.__getSearchDataProviders(**self.__myKwargs)
+        oesU = OeSearchUtils(oesmP, fpTypeList=["TREE"])
+        oeioU = OeIoUtils()
+        ccId, ccD = list(ccIdxD.items())[0]
+        oeMol = oeioU.descriptorToMol(ccD["oe-iso-smiles"], "oe-iso-smiles", limitPerceptions=False, messageTag=ccId)
+        self.assertTrue(oeMol)
+        fpL = list(oesU.iterFingerPrints(oeMol, "TREE", minFpScore=0.1))
+        self.assertGreater(len(fpL), 4)
+        self.assertEqual([t.fpScore for t in fpL], sorted([t.fpScore for t in fpL], reverse=True))
+        pageL = list(oesU.iterFingerPrints(oeMol, "TREE", minFpScore=0.1, limit=2))
+        pageL += list(oesU.iterFingerPrints(oeMol, "TREE", minFpScore=0.1, limit=2, cursor=pageL[-1].getCursor()))
+        self.assertEqual(pageL, fpL[:4])
+        self.assertEqual(list(oesU.iterFingerPrints(oeMol, "TREE", minFpScore=0.1, limit=2, offset=2)), fpL[2:4])
+        # scoring failures are raised by the generator and reported as a failure status by the search
+        with self.assertRaises(Exception):
+            list(oesU.iterFingerPrints(oeMol, "TREE", minFpScore="0.1"))
+        ok, mL = oesU.searchFingerPrints(oeMol, "TREE", minFpScore="0.1")
+        self.assertFalse(ok)
+        self.assertEqual(mL, [])
+        # molecules are read on first access
+        self.assertEqual(pageL[0].oeMol.NumAtoms(), oesmP.getMol(pageL[0].ccId).NumAtoms())
+        #
+        qMol = oeioU.descriptorToMol("c1ccccc1", "oe-smiles", limitPerceptions=False, messageTag="benzene")
+        ok, ssL = oesU.searchSubStructure(qMol, matchOpts="graph-relaxed")
+        self.assertTrue(ok)
+        hL = list(oesU.iterSubStructure(qMol, matchOpts="graph-relaxed"))
+        self.assertEqual([t.ccId for t in hL], [t.ccId for t in ssL])
+        pageL = list(oesU.iterSubStructure(qMol, matchOpts="graph-relaxed", limit=3))
+        pageL += list(oesU.iterSubStructure(qMol, matchOpts="graph-relaxed", limit=3, cursor=pageL[-1].getCursor()))
+        self.assertEqual([t.ccId for t in pageL], [t.ccId for t in hL[:6]])
+        self.assertEqual([t.ccId for t in oesU.iterSubStructure(qMol, matchOpts="graph-relaxed", limit=3, offset=3)], [t.ccId for t in hL[3:6]])
+        self.assertTrue(pageL[0].oeMol.NumAtoms() >= qMol.NumAtoms())
+
     @unittest.skipIf(skipFlag, "Long troubleshooting test")
     def testFingerPrintScoresFull(self):
         """Fingerprint scores. (full)"""
@@ -474,6 +595,7 @@ def subStructureSearch():
     suiteSelect = unittest.TestSuite()
     suiteSelect.addTest(OeSearchIndexUtilsTests("testSubStructureSearchExhaustiveAbbrev"))
     suiteSelect.addTest(OeSearchIndexUtilsTests("testSubStructureSearchWithFpAbbrev"))
+    suiteSelect.addTest(OeSearchIndexUtilsTests("testSubStructureAndFingerPrintConcurrencyAbbrev"))
     suiteSelect.addTest(OeSearchIndexUtilsTests("testSubStructureSearchScreenedAbbrev"))
     # suiteSelect.addTest(OeSearchIndexUtilsTests("testSubStructureSearchScreenedFiltered"))
     return suiteSelect
@@ -483,6 +605,9 @@ def fingerprintSearch():
     suiteSelect = unittest.TestSuite()
     suiteSelect.addTest(OeSearchIndexUtilsTests("testFingerPrintSearchAbbrev"))
     suiteSelect.addTest(OeSearchIndexUtilsTests("testFingerPrintScoresAbbrev"))
+    suiteSelect.addTest(OeSearchIndexUtilsTests("testFingerPrintEnginesAbbrev"))
+    suiteSelect.addTest(OeSearchIndexUtilsTests("testFoldedFingerPrintScreenAbbrev"))
+    suiteSelect.addTest(OeSearchIndexUtilsTests("testPagedSearchAbbrev"))
     return suiteSelect
 
 
@@ -5,7 +5,7 @@
 # Version: 0.001
 #
 # Update:
-#
+#  18-Oct-2026 jdw check stored packed fingerprint databases for types unsupported by the fast database
 #
 ##
 """
@@ -28,6 +28,7 @@ import unittest
 
 
 from rcsb.utils.chem import __version__
+from rcsb.utils.chem.ChemCompFingerPrintIndex import ChemCompFingerPrintIndex
 from rcsb.utils.chem.OeSearchMoleculeProvider import OeSearchMoleculeProvider
 
 HERE = os.path.abspath(os.path.dirname(__file__))
@@ -128,6 +129,11 @@ class OeSearchMoleculeProviderTests(unittest.TestCase):
             fpDb = oesmp.getFingerPrintDb(fpType="TREE")
             logger.debug("fpType %r length %d", fpType, fpDb.NumFingerPrints())
             self.assertGreaterEqual(fpDb.NumFingerPrints(), minNumFp)
+        # types unsupported by the OE fast fingerprint database are stored and loaded as packed databases
+        if "MACCS" in fpTypeList:
+            fpDb = oesmp.getFingerPrintDb(fpType="MACCS")
+            self.assertTrue(isinstance(fpDb, ChemCompFingerPrintIndex))
+            self.assertGreaterEqual(fpDb.NumFingerPrints(), minNumFp)
         #
         ccId = "004"
         oeMol = oesmp.getMol(ccId)
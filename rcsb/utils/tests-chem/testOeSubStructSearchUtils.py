@@ -5,7 +5,15 @@
 # Version: 0.001
 #
 # Update:
-#
+#  18-Oct-2026 jdw add database index prefilter checks
+#  18-Oct-2026 jdw add persistent worker pool test
+#  18-Oct-2026 jdw add search ready target benchmark
+#  18-Oct-2026 jdw add hit limit, time budget and cancellation checks
+#  18-Oct-2026 jdw add screened substructure search engine benchmark (full CCD with useFull)
+#  18-Oct-2026 jdw add search pool start method checks
+#  18-Oct-2026 jdw add search ready target equivalence checks for all match option families
+#  18-Oct-2026 jdw check screened search scores from formula index heavy atom counts
+#  18-Oct-2026 jdw check the decoded targets shared with fork started pool workers and the worker memory
 #
 ##
 """
@@ -27,10 +35,12 @@ from rcsb.utils.chem import __version__
 from rcsb.utils.chem.ChemCompIndexProvider import ChemCompIndexProvider
 from rcsb.utils.chem.ChemCompSearchIndexProvider import ChemCompSearchIndexProvider
 from rcsb.utils.chem.OeDepictAlign import OeDepictMCSAlignPage
+from rcsb.utils.chem.OeIoUtils import OeIoUtils
 from rcsb.utils.chem.OeMoleculeFactory import OeMoleculeFactory
 from rcsb.utils.chem.OeMoleculeProvider import OeMoleculeProvider
+from rcsb.utils.chem.OePreparedMolCache import OePreparedMolCache
 from rcsb.utils.chem.OeSearchMoleculeProvider import OeSearchMoleculeProvider
-from rcsb.utils.chem.OeSubStructSearchUtils import OeSubStructSearchUtils
+from rcsb.utils.chem.OeSubStructSearchUtils import OeSubStructSearchPool, OeSubStructSearchUtils, SearchCancelToken
 
 HERE = os.path.abspath(os.path.dirname(__file__))
 TOPDIR = os.path.dirname(os.path.dirname(os.path.dirname(HERE)))
@@ -156,6 +166,227 @@ class OeSubStructSearchUtilsTests(unittest.TestCase):
             self.assertTrue(retStatus)
             self.assertTrue(self.__resultContains(ccId, mL))
             # ----
+            startTime = time.time()
+            idxL = oesU.prefilterDbIndex(oeMol, ccIdxP, matchOpts=matchOpts)
+            self.assertEqual(len(idxL), len(ccIdL))
+            retStatus, mL = oesU.searchSubStructure(oeMol, idxList=idxL, matchOpts=matchOpts, numProc=numProc)
+            logger.info("%s (db index prefilter) status %r result length %d in (%.4f seconds)", ccId, retStatus, len(mL), time.time() - startTime)
+            self.assertTrue(retStatus)
+            self.assertTrue(self.__resultContains(ccId, mL))
+
+    def testSubStructureSearchPool(self):
+        """Compare multi-process searches on the persistent worker pool with per-query worker processes."""
+        matchOpts = self.__myKwargs.get("matchOpts", "sub-struct-graph-relaxed")
+        numProc = 4
+        oemp = OeSearchMoleculeProvider(**self.__myKwargs)
+        ok = oemp.testCache()
+        self.assertTrue(ok)
+        oesU = OeSubStructSearchUtils(oemp)
+        oesNoPoolU = OeSubStructSearchUtils(oemp, usePool=False)
+        ccIdxP = ChemCompSearchIndexProvider(**self.__myKwargs)
+        ok = ccIdxP.testCache(minCount=self.__minCount)
+        self.assertTrue(ok)
+        timeD = {"pool": 0.0, "no-pool": 0.0}
+        for ccId in ["BNZ", "ALA", "ATP"]:
+            oeMol = oemp.getMol(ccId)
+            idxL = oesU.prefilterDbIndex(oeMol, ccIdxP, matchOpts=matchOpts)
+            startTime = time.time()
+            retStatus1, mL1 = oesU.searchSubStructure(oeMol, idxList=idxL, matchOpts=matchOpts, numProc=numProc)
+            timeD["pool"] += time.time() - startTime
+            startTime = time.time()
+            retStatus2, mL2 = oesNoPoolU.searchSubStructure(oeMol, idxList=idxL, matchOpts=matchOpts, numProc=numProc)
+            timeD["no-pool"] += time.time() - startTime
+            self.assertTrue(retStatus1 and retStatus2)
+            self.assertTrue(self.__resultContains(ccId, mL1))
+            self.assertEqual(sorted([t.ccId for t in mL1]), sorted([t.ccId for t in mL2]))
+        oesU.close()
+        logger.info("Multi-process search (pool %.4f per-query workers %.4f seconds)", timeD["pool"], timeD["no-pool"])
+        #
+        for mpStartMethod in ["fork", "spawn"]:
+            oesU = OeSubStructSearchUtils(oemp, mpStartMethod=mpStartMethod)
+            self.assertTrue(oesU.startPool(numProc))
+            oeMol = oemp.getMol("ATP")
+            idxL = oesU.prefilterDbIndex(oeMol, ccIdxP, matchOpts=matchOpts)
+            retStatus1, mL1 = oesU.searchSubStructure(oeMol, idxList=idxL, matchOpts=matchOpts, numProc=numProc)
+            retStatus2, mL2 = oesNoPoolU.searchSubStructure(oeMol, idxList=idxL, matchOpts=matchOpts, numProc=1)
+            self.assertTrue(retStatus1 and retStatus2)
+            self.assertEqual(sorted([t.ccId for t in mL1]), sorted([t.ccId for t in mL2]))
+            poolD = oesU.getPoolStatus()
+            logger.info("Search pool (%s) status %r", mpStartMethod, poolD)
+            self.assertEqual(poolD["startMethod"], mpStartMethod)
+            self.assertEqual(len(poolD["workers"]), numProc)
+            self.assertTrue(all(memD["rssBytes"] > 0 for memD in poolD["workers"].values()))
+            if mpStartMethod == "fork":
+                self.assertEqual(poolD["targets"]["decoded"]["count"], oemp.getOeMolDatabase()[0].NumMols())
+            else:
+                self.assertNotIn("decoded", poolD["targets"])
+            oesU.close()
+
+    def testSubStructureSearchLimits(self):
+        """Test hit limits, time budgets and cancellation of exhaustive single and multi-process searches."""
+        matchOpts = self.__myKwargs.get("matchOpts", "sub-struct-graph-relaxed")
+        oemp = OeSearchMoleculeProvider(**self.__myKwargs)
+        ok = oemp.testCache()
+        self.assertTrue(ok)
+        oesU = OeSubStructSearchUtils(oemp)
+        oesNoPoolU = OeSubStructSearchUtils(oemp, usePool=False)
+        oeMol = oemp.getMol("BNZ")
+        retStatus, mL = oesU.searchSubStructure(oeMol, matchOpts=matchOpts, numProc=1)
+        self.assertTrue(retStatus)
+        self.assertGreater(len(mL), 5)
+        for tU, numProc in [(oesU, 1), (oesU, 4), (oesNoPoolU, 4)]:
+            # complete search
+            cancelToken = SearchCancelToken()
+            retStatus, tL = tU.searchSubStructure(oeMol, matchOpts=matchOpts, numProc=numProc, cancelToken=cancelToken)
+            self.assertTrue(retStatus)
+            self.assertFalse(cancelToken.isPartial())
+            self.assertEqual(len(tL), len(mL))
+            # hit limit
+            cancelToken = SearchCancelToken()
+            retStatus, tL = tU.searchSubStructure(oeMol, matchOpts=matchOpts, numProc=numProc, maxHits=5, cancelToken=cancelToken)
+            self.assertTrue(retStatus)
+            self.assertEqual(len(tL), 5)
+            self.assertEqual(cancelToken.getStopReason(), "maxHits")
+            self.assertTrue(set([t.ccId for t in tL]).issubset([t.ccId for t in mL]))
+            if tU is oesU:
+                self.assertEqual([t.ccId for t in tL], [t.ccId for t in mL[:5]])
+            # exhausted time budget
+            cancelToken = SearchCancelToken()
+            retStatus, tL = tU.searchSubStructure(oeMol, matchOpts=matchOpts, numProc=numProc, timeoutSeconds=1.0e-6, cancelToken=cancelToken)
+            self.assertTrue(retStatus)
+            self.assertEqual(cancelToken.getStopReason(), "timeout")
+            self.assertLess(len(tL), len(mL))
+            # cancelled before the search starts
+            cancelToken = SearchCancelToken()
+            cancelToken.cancel()
+            retStatus, tL = tU.searchSubStructure(oeMol, matchOpts=matchOpts, numProc=numProc, cancelToken=cancelToken)
+            self.assertTrue(retStatus)
+            self.assertEqual(cancelToken.getStopReason(), "cancelled")
+            self.assertEqual(len(tL), 0)
+        # the pool serves complete searches following cancelled searches
+        retStatus, tL = oesU.searchSubStructure(oeMol, matchOpts=matchOpts, numProc=4)
+        self.assertTrue(retStatus)
+        self.assertEqual(len(tL), len(mL))
+        oesU.close()
+
+    def testScreenedSearchBenchmark(self):
+        """Benchmark the screened substructure search engine against formula/feature prefiltered graph matching."""
+        matchOpts = self.__myKwargs.get("matchOpts", "sub-struct-graph-relaxed")
+        numQueries = 50
+        kwargs = dict(self.__myKwargs)
+        kwargs["screenTypeList"] = ["SMARTS"]
+        oemp = OeSearchMoleculeProvider(**kwargs)
+        ok = oemp.testCache()
+        self.assertTrue(ok)
+        ccIdxP = ChemCompSearchIndexProvider(**self.__myKwargs)
+        ok = ccIdxP.testCache(minCount=self.__minCount)
+        self.assertTrue(ok)
+        oesU = OeSubStructSearchUtils(oemp, screenType="SMARTS", numProc=self.__numProcSearch)
+        self.assertEqual(oesU.getScreenType(), "SMARTS")
+        oeMolDb, _ = oemp.getOeMolDatabase()
+        step = max(1, oeMolDb.GetMaxMolIdx() // numQueries)
+        ccIdL = [oeMolDb.GetTitle(idx) for idx in range(0, oeMolDb.GetMaxMolIdx(), step)][:numQueries]
+        timeD = {"prefilter": 0.0, "screened": 0.0}
+        countD = {"prefilter": 0, "screened": 0, "common": 0}
+        for ccId in ccIdL:
+            oeMol = oemp.getMol(ccId)
+            if not oeMol:
+                continue
+            startTime = time.time()
+            idxL = oesU.prefilterDbIndex(oeMol, ccIdxP, matchOpts=matchOpts)
+            retStatus1, mL1 = oesU.searchSubStructure(oeMol, idxList=idxL, matchOpts=matchOpts, numProc=self.__numProcSearch) if idxL else (True, [])
+            timeD["prefilter"] += time.time() - startTime
+            startTime = time.time()
+            retStatus2, mL2 = oesU.searchSubStructureScreened(oeMol, matchOpts=matchOpts)
+            timeD["screened"] += time.time() - startTime
+            self.assertTrue(retStatus1 and retStatus2)
+            self.assertTrue(self.__resultContains(ccId, mL1))
+            self.assertTrue(self.__resultContains(ccId, mL2))
+            countD["prefilter"] += len(mL1)
+            countD["screened"] += len(mL2)
+            countD["common"] += len(set([t.ccId for t in mL1]) & set([t.ccId for t in mL2]))
+            # scores from the formula index heavy atom counts match scores from the matched molecules
+            retStatus3, mL3 = oesU.searchSubStructureScreened(oeMol, matchOpts=matchOpts, idxP=ccIdxP)
+            self.assertTrue(retStatus3)
+            self.assertEqual([t.ccId for t in mL3], [t.ccId for t in mL2])
+            for t3, t2 in zip(mL3, mL2):
+                # isotopic hydrogens are atoms of the molecule but are not heavy atoms
+                if not set(ccIdxP.getIndexEntry(t3.ccId)["type-counts"]) & {"D", "T"}:
+                    self.assertAlmostEqual(t3.fpScore, t2.fpScore)
+        oesU.close()
+        logger.info(
+            "Substructure search of %d queries on %d molecules (prefilter %.4f screened %.4f seconds) matches %r",
+            len(ccIdL),
+            oeMolDb.NumMols(),
+            timeD["prefilter"],
+            timeD["screened"],
+            countD,
+        )
+
+    def testPreparedTargetBenchmark(self):
+        """Benchmark the per-candidate cost of exhaustive graph matching with and without search ready targets."""
+        matchOpts = self.__myKwargs.get("matchOpts", "sub-struct-graph-relaxed")
+        oemp = OeSearchMoleculeProvider(**self.__myKwargs)
+        ok = oemp.testCache()
+        self.assertTrue(ok)
+        oeMolDb, _ = oemp.getOeMolDatabase()
+        prepMolCache = OePreparedMolCache(oeMolDb, matchOptsList=[matchOpts])
+        self.assertTrue(prepMolCache.hasMatchOpts(matchOpts))
+        logger.info("Prepared targets %r", prepMolCache.getStatus())
+        oesU = OeSubStructSearchUtils(oemp)
+        oesPrepU = OeSubStructSearchUtils(oemp, prepMolCache=prepMolCache)
+        timeD = {"decode": 0.0, "prepared": 0.0}
+        numCandidates = 0
+        for ccId in ["BNZ", "ALA", "ATP", "GLY"]:
+            oeMol = oemp.getMol(ccId)
+            startTime = time.time()
+            retStatus1, mL1 = oesU.searchSubStructure(oeMol, matchOpts=matchOpts, numProc=1)
+            timeD["decode"] += time.time() - startTime
+            startTime = time.time()
+            retStatus2, mL2 = oesPrepU.searchSubStructure(oeMol, matchOpts=matchOpts, numProc=1)
+            timeD["prepared"] += time.time() - startTime
+            self.assertTrue(retStatus1 and retStatus2)
+            self.assertEqual([(t.ccId, t.fpScore) for t in mL1], [(t.ccId, t.fpScore) for t in mL2])
+            self.assertTrue(self.__resultContains(ccId, mL2))
+            numCandidates += oeMolDb.GetMaxMolIdx()
+        logger.info(
+            "Per-candidate graph match cost (decode and prepare %.2f prepared %.2f microseconds) for %d candidates",
+            10 ** 6 * timeD["decode"] / numCandidates,
+            10 ** 6 * timeD["prepared"] / numCandidates,
+            numCandidates,
+        )
+
+    def testPreparedTargetEquivalence(self):
+        """Test searches on search ready targets against freshly prepared targets for each match option family (including stereo queries)."""
+        oemp = OeSearchMoleculeProvider(**self.__myKwargs)
+        ok = oemp.testCache()
+        self.assertTrue(ok)
+        oeMolDb, _ = oemp.getOeMolDatabase()
+        matchOptsList = ["sub-struct-graph-strict", "sub-struct-graph-relaxed-stereo", "sub-struct-graph-relaxed"]
+        prepMolCache = OePreparedMolCache(oeMolDb, matchOptsList=matchOptsList)
+        statusD = prepMolCache.getStatus()
+        self.assertEqual(sorted(statusD.keys()), ["relaxed", "relaxed-stereo", "strict"])
+        self.assertTrue(all(tD["count"] == oeMolDb.NumMols() and tD["memoryBytes"] >= 0 for tD in statusD.values()))
+        oesU = OeSubStructSearchUtils(oemp)
+        oesPrepU = OeSubStructSearchUtils(oemp, prepMolCache=prepMolCache)
+        oeioU = OeIoUtils()
+        queryD = {ccId: oemp.getMol(ccId) for ccId in ["GLC", "MAN", "ALA"]}
+        # L- and D-alanine, alpha-D-glucopyranose and trans-2-butene
+        for smiles in ["C[C@@H](C(=O)O)N", "C[C@H](C(=O)O)N", "C([C@@H]1[C@H]([C@@H]([C@H]([C@H](O1)O)O)O)O)O", "C/C=C/C"]:
+            queryD[smiles] = oeioU.smilesToMol(smiles)
+        for matchOpts in matchOptsList:
+            for queryId, oeMol in queryD.items():
+                self.assertTrue(oeMol is not None)
+                retStatus1, mL1 = oesU.searchSubStructure(oeMol, matchOpts=matchOpts, numProc=1)
+                retStatus2, mL2 = oesPrepU.searchSubStructure(oeMol, matchOpts=matchOpts, numProc=1)
+                self.assertTrue(retStatus1 and retStatus2)
+                self.assertEqual([(t.ccId, t.fpScore) for t in mL1], [(t.ccId, t.fpScore) for t in mL2])
+                if queryId in ["GLC", "MAN"]:
+                    self.assertTrue(self.__resultContains(queryId, mL2))
+                logger.info("%s %s matches %d", matchOpts, queryId, len(mL2))
+        # search ready targets reach pool workers only by fork
+        with self.assertRaises(ValueError):
+            OeSubStructSearchPool(oemp.getOeMolDatabaseFilePath(), numProc=1, prepMolCache=prepMolCache, startMethod="spawn")
 
     @unittest.skipIf(not useFull, "Requires full data set")
     def testSubStructureSearchBaseSelected(self):
@@ -257,6 +488,11 @@ def exhaustiveSubStructureSearch():
     suiteSelect.addTest(OeSubStructSearchUtilsTests("testSubStructureSearchBase"))
     suiteSelect.addTest(OeSubStructSearchUtilsTests("testSubStructureSearchFromIndexBase"))
     suiteSelect.addTest(OeSubStructSearchUtilsTests("testSubStructureSearchFromIndexSelected"))
+    suiteSelect.addTest(OeSubStructSearchUtilsTests("testSubStructureSearchPool"))
+    suiteSelect.addTest(OeSubStructSearchUtilsTests("testSubStructureSearchLimits"))
+    suiteSelect.addTest(OeSubStructSearchUtilsTests("testPreparedTargetBenchmark"))
+    suiteSelect.addTest(OeSubStructSearchUtilsTests("testPreparedTargetEquivalence"))
+    suiteSelect.addTest(OeSubStructSearchUtilsTests("testScreenedSearchBenchmark"))
     return suiteSelect
 
 